@@ -0,0 +1,206 @@
+"""
+Stateless JWT authentication.
+
+simplejwt's ``JWTAuthentication`` loads the user row on every request. Tokens
+issued by ``AccountRefreshToken`` instead carry the claims permission checks
+need (role, organisation, status and the user's token version), and
+``StatelessJWTAuthentication`` builds the user from those claims. Each claim
+set is checked against a short-lived cached copy of the account state, so
+the database is only read when that copy is missing, or when it says the
+token was revoked or the account is inactive or locked (to confirm before
+rejecting). The copy lives in the ``ACCOUNT_STATE_CACHE`` cache, which must
+be shared between workers: a save clears it in every worker at once.
+
+Tokens without a ``token_version`` claim, issued before this scheme, are
+still accepted and authenticated the usual way.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from insurance.models import User
+
+ACCOUNT_CLAIMS = ('user_role', 'organisation_id', 'user_status', 'token_version')
+
+# Columns a claims-backed user is built with; the rest stay deferred
+STATE_FIELDS = (
+    'user_id', 'organisation_id', 'user_role', 'user_status',
+    'user_is_active', 'locked_till_date_time', 'token_version',
+)
+
+
+def _cache():
+    return caches[getattr(settings, 'ACCOUNT_STATE_CACHE', 'default')]
+
+
+def _state_key(user_id):
+    return f'account_state:{user_id}'
+
+
+def _state_timeout():
+    return getattr(settings, 'ACCOUNT_STATE_CACHE_TIMEOUT', 30)
+
+
+def load_account_state(user_id):
+    """
+    Read a user's account state from the database and cache it.
+
+    Returns:
+        dict: STATE_FIELDS values, or None if the user does not exist
+    """
+    state = User.objects.filter(user_id=user_id).values(*STATE_FIELDS).first()
+    if state is not None:
+        _cache().set(_state_key(user_id), state, _state_timeout())
+    return state
+
+
+def get_account_state(user_id):
+    """Cached account state of a user, read from the database on a miss."""
+    state = _cache().get(_state_key(user_id))
+    if state is None:
+        state = load_account_state(user_id)
+    return state
+
+
+def forget_account_state(user_id):
+    """Drop the cached state, e.g. after a queryset update() on users."""
+    _cache().delete(_state_key(user_id))
+
+
+def account_state_changed(sender, instance, **kwargs):
+    """post_save / post_delete receiver for User."""
+    forget_account_state(instance.pk)
+
+
+def account_claims(user):
+    """Claims embedded in tokens issued for ``user``."""
+    return {
+        'user_role': user.user_role,
+        'organisation_id': user.organisation_id,
+        'user_status': user.user_status,
+        'token_version': user.token_version,
+    }
+
+
+def check_account_state(state, claims):
+    """
+    Raise AuthenticationFailed if ``state`` no longer accepts ``claims``.
+    """
+    if state is None:
+        raise AuthenticationFailed('User not found', code='user_not_found')
+    if state['token_version'] != claims['token_version']:
+        raise AuthenticationFailed('Token has been revoked', code='token_revoked')
+    if not state['user_is_active'] or state['user_status'] != 'ACTIVE':
+        raise AuthenticationFailed('User account is inactive', code='user_inactive')
+    if state['locked_till_date_time'] and state['locked_till_date_time'] > timezone.now():
+        raise AuthenticationFailed('User account is temporarily locked', code='user_locked')
+    if (state['user_role'], state['organisation_id']) != (
+        claims['user_role'], claims['organisation_id']
+    ):
+        raise AuthenticationFailed(
+            'Account details changed, refresh the token', code='token_outdated'
+        )
+
+
+def validated_account_state(user_id, claims):
+    """
+    Account state accepting ``claims``, reading the database only when needed.
+
+    A cached state that would reject the claims is re-read before rejecting,
+    so a stale cache entry never locks a user out.
+    """
+    state = _cache().get(_state_key(user_id))
+    if state is not None:
+        try:
+            check_account_state(state, claims)
+            return state
+        except AuthenticationFailed:
+            pass
+    state = load_account_state(user_id)
+    check_account_state(state, claims)
+    return state
+
+
+def user_from_state(state):
+    """
+    User instance built from account state without a query.
+
+    Only STATE_FIELDS are set; other fields are deferred and load together
+    on first access (see ``User.refresh_from_db``).
+    """
+    return User.from_db(
+        DEFAULT_DB_ALIAS,
+        list(STATE_FIELDS),
+        [
+            state[field.attname]
+            for field in User._meta.concrete_fields
+            if field.attname in STATE_FIELDS
+        ],
+    )
+
+
+class AccountRefreshToken(RefreshToken):
+    """Refresh token whose access tokens carry the account claims."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim, value in account_claims(user).items():
+            token[claim] = value
+        return token
+
+
+def refresh_access_token(refresh):
+    """
+    New access token for a validated refresh token.
+
+    Account claims are taken from the current account state rather than the
+    refresh token, so role or organisation changes are picked up on refresh.
+
+    Raises:
+        AuthenticationFailed: If the refresh token was revoked or the account
+            is inactive or locked
+    """
+    access = refresh.access_token
+    if 'token_version' not in refresh:
+        return access
+
+    user_id = refresh[api_settings.USER_ID_CLAIM]
+    state = load_account_state(user_id)
+    check_account_state(state, {
+        'token_version': refresh['token_version'],
+        'user_role': state['user_role'] if state else None,
+        'organisation_id': state['organisation_id'] if state else None,
+    })
+    for claim in ACCOUNT_CLAIMS:
+        access[claim] = state[claim]
+    return access
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that builds the user from token claims.
+
+    Usage in settings:
+        'DEFAULT_AUTHENTICATION_CLASSES': [
+            'insurance.authentication.StatelessJWTAuthentication',
+        ]
+    """
+
+    def get_user(self, validated_token):
+        if 'token_version' not in validated_token:
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+            claims = {claim: validated_token[claim] for claim in ACCOUNT_CLAIMS}
+        except KeyError:
+            return super().get_user(validated_token)
+
+        state = validated_account_state(user_id, claims)
+        return user_from_state(state)
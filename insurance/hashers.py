@@ -0,0 +1,17 @@
+"""
+Password hasher with a configurable work factor.
+
+PBKDF2 iterations are read from ``PASSWORD_HASH_ITERATIONS`` so the login
+cost can be tuned per deployment (see ``manage.py benchmark_login``). The
+algorithm name is unchanged, so existing ``pbkdf2_sha256`` hashes keep
+verifying and are re-hashed at the new cost on the user's next login.
+"""
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class TunablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+
+    @property
+    def iterations(self):
+        return getattr(settings, 'PASSWORD_HASH_ITERATIONS', None) or PBKDF2PasswordHasher.iterations
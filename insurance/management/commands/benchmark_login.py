@@ -0,0 +1,100 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.test import APIRequestFactory
+
+from insurance.hashers import TunablePBKDF2PasswordHasher
+from insurance.views import LoginView
+
+
+class Command(BaseCommand):
+    help = (
+        'Measures password verification cost and login throughput per worker '
+        'to help choose PASSWORD_HASH_ITERATIONS'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            default='',
+            help='Comma-separated PBKDF2 iteration counts to compare '
+                 '(default: the configured count and a few alternatives)',
+        )
+        parser.add_argument(
+            '--runs',
+            type=int,
+            default=20,
+            help='Timed runs per measurement',
+        )
+        parser.add_argument(
+            '--username',
+            help='Also time full LoginView requests for this existing account '
+                 '(updates its last_login)',
+        )
+        parser.add_argument(
+            '--password',
+            help='Password of --username',
+        )
+
+    def handle(self, *args, **options):
+        runs = options['runs']
+        if runs < 1:
+            raise CommandError('--runs must be at least 1')
+
+        configured = TunablePBKDF2PasswordHasher().iterations
+        if options['iterations']:
+            try:
+                counts = [int(value) for value in options['iterations'].split(',')]
+            except ValueError:
+                raise CommandError('--iterations must be comma-separated integers')
+        else:
+            counts = sorted({
+                configured, PBKDF2PasswordHasher.iterations,
+                configured // 2, configured // 4,
+            })
+
+        self.stdout.write(
+            f'Configured iterations: {configured} '
+            f'(PASSWORD_HASH_ITERATIONS={getattr(settings, "PASSWORD_HASH_ITERATIONS", None)})'
+        )
+        self.stdout.write('Password verification (one login = one verify):')
+        for count in counts:
+            hasher = PBKDF2PasswordHasher()
+            hasher.iterations = count
+            encoded = hasher.encode('benchmark-password', hasher.salt())
+            elapsed = self._time(lambda: hasher.verify('benchmark-password', encoded), runs)
+            self._report(f'  {count:>9} iterations', elapsed)
+
+        if options['username']:
+            if not options['password']:
+                raise CommandError('--password is required with --username')
+            self._benchmark_view(options['username'], options['password'], runs)
+
+    def _benchmark_view(self, username, password, runs):
+        factory = APIRequestFactory()
+        view = LoginView.as_view()
+        payload = {'username': username, 'password': password}
+
+        def login():
+            response = view(factory.post('/api/v1/auth/login/', payload, format='json'))
+            if response.status_code != 200:
+                raise CommandError(f'Login failed with status {response.status_code}: {response.data}')
+
+        login()  # warm up, and re-hash the stored password if needed
+        self.stdout.write('Full login request (lookup, verify, save, tokens):')
+        self._report('  LoginView', self._time(login, runs))
+
+    @staticmethod
+    def _time(func, runs):
+        start = time.perf_counter()
+        for _ in range(runs):
+            func()
+        return (time.perf_counter() - start) / runs
+
+    def _report(self, label, seconds):
+        self.stdout.write(
+            f'{label}: {seconds * 1000:8.1f} ms, '
+            f'{1 / seconds:8.1f} logins/s per single-threaded worker'
+        )
@@ -0,0 +1,100 @@
+import io
+import json
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from insurance.parsers import ORJSONParser
+from insurance.renderers import ORJSONRenderer, orjson
+
+
+class Command(BaseCommand):
+    help = (
+        'Compares encode and decode time of the orjson renderer and parser '
+        'with DRF\'s JSONRenderer / JSONParser on a quotation-like payload'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=1000,
+            help='Records in the payload',
+        )
+        parser.add_argument(
+            '--runs',
+            type=int,
+            default=20,
+            help='Timed runs per measurement',
+        )
+
+    def handle(self, *args, **options):
+        rows, runs = options['rows'], options['runs']
+        if rows < 1 or runs < 1:
+            raise CommandError('--rows and --runs must be at least 1')
+        if orjson is None:
+            self.stdout.write('orjson is not installed; ORJSONRenderer falls back to JSONRenderer')
+
+        data = self._payload(rows)
+        body = JSONRenderer().render(data)
+        fast_body = ORJSONRenderer().render(data)
+        if json.loads(body) != json.loads(fast_body):
+            raise CommandError('ORJSONRenderer output differs from JSONRenderer')
+        self.stdout.write(f'Payload: {rows} records, {len(body)} bytes (outputs match)')
+
+        self.stdout.write('Encode:')
+        baseline = self._time(lambda: JSONRenderer().render(data), runs)
+        self._report('  JSONRenderer', baseline, baseline)
+        self._report('  ORJSONRenderer', self._time(lambda: ORJSONRenderer().render(data), runs), baseline)
+
+        self.stdout.write('Decode:')
+        baseline = self._time(lambda: JSONParser().parse(io.BytesIO(body)), runs)
+        self._report('  JSONParser', baseline, baseline)
+        self._report('  ORJSONParser', self._time(lambda: ORJSONParser().parse(io.BytesIO(body)), runs), baseline)
+
+    @staticmethod
+    def _payload(rows):
+        """
+        Paginated list of quotation-like records.
+
+        Mixes what serializers emit (decimal strings, formatted datetimes) with
+        native Decimal / datetime values and JSONField content.
+        """
+        now = timezone.now()
+        results = [
+            {
+                'quotation_id': index,
+                'farmer_name': f'Farmer {index}',
+                'farm_name': f'Farm {index}',
+                'product_name': 'Maize Multi-Peril',
+                'organisation_name': 'Kilimo Insurance',
+                'country_name': 'Kenya',
+                'premium_amount': f'{index * 3.5:.2f}',
+                'sum_insured': Decimal(index * 100) + Decimal('0.50'),
+                'status': 'WRITTEN',
+                'policy_number': f'POL-{now:%Y%m%d}-{index}',
+                'date_time_added': (now - timedelta(minutes=index)).strftime(
+                    settings.REST_FRAMEWORK.get('DATETIME_FORMAT', '%Y-%m-%d %H:%M:%S')
+                ),
+                'date_time_modified': now - timedelta(seconds=index),
+                'loss_details': {'cause': 'drought', 'affected_area': Decimal('1.25'), 'photos': [index]},
+            }
+            for index in range(1, rows + 1)
+        ]
+        return {'count': rows, 'next': None, 'previous': None, 'results': results}
+
+    @staticmethod
+    def _time(func, runs):
+        start = time.perf_counter()
+        for _ in range(runs):
+            func()
+        return (time.perf_counter() - start) / runs
+
+    def _report(self, label, seconds, baseline):
+        self.stdout.write(f'{label:<16} {seconds * 1000:8.2f} ms ({baseline / seconds:5.1f}x)')
@@ -0,0 +1,84 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.text import compress_string
+from rest_framework.renderers import JSONRenderer
+
+from insurance.renderers import ColumnarJSONRenderer, MessagePackRenderer, msgpack
+from insurance.views.sync import ENTITY_MAP
+
+
+class Command(BaseCommand):
+    help = (
+        'Compares payload size and encode time of the sync response formats '
+        '(JSON, columnar JSON, MessagePack), raw and gzip-compressed'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=500,
+            help='Records per entity in the sample payload',
+        )
+        parser.add_argument(
+            '--organisation',
+            type=int,
+            help='Take the records from this organisation (default: any)',
+        )
+        parser.add_argument(
+            '--runs',
+            type=int,
+            default=20,
+            help='Timed runs per format',
+        )
+
+    def handle(self, *args, **options):
+        if options['rows'] < 1 or options['runs'] < 1:
+            raise CommandError('--rows and --runs must be at least 1')
+
+        data = self._sample(options['rows'], options['organisation'])
+        counts = ', '.join(f'{len(rows)} {entity}' for entity, rows in data['server_updates'].items())
+        self.stdout.write(f'Sample sync payload: {counts}')
+
+        renderers = [JSONRenderer(), ColumnarJSONRenderer()]
+        if msgpack is not None:
+            renderers.append(MessagePackRenderer())
+        else:
+            self.stdout.write('msgpack is not installed, skipping MessagePack')
+
+        baseline = None
+        for renderer in renderers:
+            body = renderer.render(data)
+            compressed = compress_string(body)
+            seconds = self._time(lambda: renderer.render(data), options['runs'])
+            if baseline is None:
+                baseline = len(body)
+            self.stdout.write(
+                f'  {renderer.format:<9} {len(body):>10} bytes '
+                f'({len(body) / baseline:6.1%}), gzip {len(compressed):>9} bytes '
+                f'({len(compressed) / baseline:6.1%}), encode {seconds * 1000:8.2f} ms'
+            )
+
+    @staticmethod
+    def _sample(rows, organisation_id):
+        updates = {}
+        for entity, (model, serializer_class) in ENTITY_MAP.items():
+            queryset = model.objects.all()
+            if organisation_id is not None:
+                queryset = queryset.filter(**{model.sync_organisation: organisation_id})
+            if hasattr(serializer_class, 'setup_eager_loading'):
+                queryset = serializer_class.setup_eager_loading(queryset)
+            queryset = queryset.order_by(model._meta.pk.name)[:rows]
+            updates[entity] = serializer_class(queryset, many=True).data
+        return {
+            'server_updates': updates,
+            'deleted': {entity: [] for entity in ENTITY_MAP},
+        }
+
+    @staticmethod
+    def _time(func, runs):
+        start = time.perf_counter()
+        for _ in range(runs):
+            func()
+        return (time.perf_counter() - start) / runs
@@ -0,0 +1,59 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from insurance.utils.ingestion import (
+    DEFAULT_CHUNK_SIZE, INGEST_FORMATS, detect_format, ingest_weather
+)
+
+
+class Command(BaseCommand):
+    help = 'Bulk loads weather readings from an NDJSON or CSV file'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help='File to load, or - to read from standard input',
+        )
+        parser.add_argument(
+            '--format',
+            dest='ingest_format',
+            choices=INGEST_FORMATS,
+            help='Input format (detected from the file extension by default)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help='Rows validated and inserted per transaction',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        ingest_format = options['ingest_format'] or detect_format(path)
+        if ingest_format is None:
+            raise CommandError('Cannot detect the format, pass --format ndjson or --format csv')
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be a positive integer')
+
+        if path == '-':
+            result = ingest_weather(sys.stdin, ingest_format, options['chunk_size'])
+        else:
+            try:
+                with open(path, encoding='utf-8-sig', newline='') as lines:
+                    result = ingest_weather(lines, ingest_format, options['chunk_size'])
+            except OSError as e:
+                raise CommandError(f'Cannot read {path}: {e}')
+
+        for error in result['errors']:
+            self.stdout.write(self.style.WARNING(f"Row {error['row']}: {error['errors']}"))
+        if result['errors_truncated']:
+            self.stdout.write(self.style.WARNING('Further errors were not reported'))
+
+        if result.get('error'):
+            self.stdout.write(self.style.ERROR(f"Stopped early: {result['error']}"))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Received {result['received']} rows: "
+            f"{result['created']} created, {result['failed']} failed"
+        ))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from insurance.models import SyncOperation
+
+
+class Command(BaseCommand):
+    help = 'Deletes expired sync operation records kept for idempotent uploads'
+
+    def handle(self, *args, **options):
+        deleted = SyncOperation.objects.purge_expired()
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {deleted} expired sync operation(s)'
+        ))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from insurance.models import UploadSession
+from insurance.utils.uploads import discard_part
+
+
+class Command(BaseCommand):
+    help = 'Deletes expired upload sessions and the part files of unfinished ones'
+
+    def handle(self, *args, **options):
+        deleted = 0
+        for session in UploadSession.objects.expired().iterator():
+            if session.status == UploadSession.ACTIVE:
+                discard_part(session)
+            session.delete()
+            deleted += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {deleted} expired upload session(s)'
+        ))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from insurance.models import WeatherData, WeatherRollup
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the hourly, daily and monthly weather rollups from raw readings'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--location',
+            help='Only rebuild rollups for this location',
+        )
+
+    def handle(self, *args, **options):
+        location = options.get('location')
+        readings = WeatherData.objects.all()
+        rollups = WeatherRollup.objects.all()
+        if location:
+            readings = readings.filter(location=location)
+            rollups = rollups.filter(location=location)
+
+        self.stdout.write('Rebuilding weather rollups...')
+        with transaction.atomic():
+            rollups.delete()
+            scopes = WeatherRollup.objects.scopes_for_queryset(readings)
+            WeatherRollup.objects.rebuild(scopes)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {len(scopes)} location/type month(s) '
+            f'({rollups.count()} rollup rows)'
+        ))
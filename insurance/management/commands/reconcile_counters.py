@@ -0,0 +1,89 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from insurance.models import StatusCounter
+from insurance.models.counters import CounterLedgerMixin
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the status counter ledger from the source tables and reports drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report drift, do not correct the ledger',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        self.stdout.write('Reconciling status counters...')
+
+        with transaction.atomic():
+            expected = self._expected_totals()
+            recorded = {
+                (row.organisation_id, row.entity, row.status): [
+                    row.count, row.amount, row.approved_amount
+                ]
+                for row in StatusCounter.objects.select_for_update()
+            }
+
+            deltas = {}
+            for key in sorted(set(expected) | set(recorded), key=str):
+                want = expected.get(key, [0, Decimal('0'), Decimal('0')])
+                have = recorded.get(key, [0, Decimal('0'), Decimal('0')])
+                if want == have:
+                    continue
+
+                organisation_id, entity, status = key
+                self.stdout.write(self.style.WARNING(
+                    f'Drift in {entity} "{status}" for organisation {organisation_id}: '
+                    f'ledger count={have[0]} amount={have[1]} approved={have[2]}, '
+                    f'actual count={want[0]} amount={want[1]} approved={want[2]}'
+                ))
+                deltas[key] = [w - h for w, h in zip(want, have)]
+
+            if not dry_run:
+                StatusCounter.objects.apply(deltas)
+
+        if not deltas:
+            self.stdout.write(self.style.SUCCESS('Ledger is in sync'))
+        elif dry_run:
+            self.stdout.write(self.style.WARNING(
+                f'{len(deltas)} counter(s) drifted (dry run, nothing changed)'
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'Corrected {len(deltas)} counter(s)'
+            ))
+
+    def _expected_totals(self):
+        """Recompute every ledger row with one grouped query per entity."""
+        totals = defaultdict(lambda: [0, Decimal('0'), Decimal('0')])
+
+        for model in apps.get_app_config('insurance').get_models():
+            if not issubclass(model, CounterLedgerMixin):
+                continue
+
+            sums = {
+                f'total_{column}': Sum(field)
+                for column, field in model.ledger_amounts.items()
+            }
+            for entity, field in model.ledger_dimensions.items():
+                rows = model._base_manager.values(
+                    model.ledger_organisation, field
+                ).annotate(total_count=Count('pk'), **sums).order_by()
+
+                for row in rows:
+                    key = (row[model.ledger_organisation], entity, row[field] or '')
+                    total = totals[key]
+                    total[0] += row['total_count']
+                    total[1] += row.get('total_amount') or Decimal('0')
+                    total[2] += row.get('total_approved_amount') or Decimal('0')
+
+        return totals
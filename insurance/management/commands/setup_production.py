@@ -12,6 +12,11 @@ class Command(BaseCommand):
         self.stdout.write('Running migrations...')
         call_command('migrate', '--noinput')
         self.stdout.write(self.style.SUCCESS('✓ Migrations complete'))
+
+        # Table of the shared cache (when REDIS_URL is not set)
+        self.stdout.write('Creating cache table...')
+        call_command('createcachetable')
+        self.stdout.write(self.style.SUCCESS('✓ Cache table ready'))
         
         # Seed data
         try:
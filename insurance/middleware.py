@@ -1,6 +1,6 @@
 from django.utils.deprecation import MiddlewareMixin
 from django.http import JsonResponse
-from insurance.models import RoleType
+from insurance.permissions.cache import get_role_permissions
 
 
 class RolePermissionMiddleware(MiddlewareMixin):
@@ -14,14 +14,11 @@ class RolePermissionMiddleware(MiddlewareMixin):
             return None
         
         # Add role permissions to request for easy access
-        try:
-            role = RoleType.objects.get(
-                role_name=request.user.user_role,
-                role_status='ACTIVE'
-            )
-            request.user_permissions = role.permissions or {}
+        permissions = get_role_permissions(request.user.user_role)
+        if permissions is not None:
+            request.user_permissions = permissions
             request.is_superuser_role = (request.user.user_role == 'SUPERUSER')
-        except RoleType.DoesNotExist:
+        else:
             request.user_permissions = {}
             request.is_superuser_role = False
         
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-17 20:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('insurance', '0007_claimphoto_inspection_inspectionphoto'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatusCounter',
+            fields=[
+                ('counter_id', models.AutoField(primary_key=True, serialize=False)),
+                ('entity', models.CharField(choices=[('farmer', 'Farmer'), ('farmer_gender', 'Farmer by gender'), ('quotation', 'Quotation'), ('claim', 'Claim'), ('invoice', 'Invoice')], max_length=30)),
+                ('status', models.CharField(blank=True, max_length=30)),
+                ('count', models.BigIntegerField(default=0)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('approved_amount', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('date_time_modified', models.DateTimeField(auto_now=True)),
+                ('organisation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='insurance.organization')),
+            ],
+            options={
+                'db_table': 'status_counters',
+                'constraints': [models.UniqueConstraint(fields=('organisation', 'entity', 'status'), name='unique_status_counter')],
+            },
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.8 on 2026-10-17 20:50
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import TruncDay, TruncHour, TruncMonth
+
+
+def backfill_rollups(apps, schema_editor):
+    WeatherData = apps.get_model('insurance', 'WeatherData')
+    WeatherRollup = apps.get_model('insurance', 'WeatherRollup')
+
+    for granularity, trunc in (('HOUR', TruncHour), ('DAY', TruncDay), ('MONTH', TruncMonth)):
+        rows = WeatherData.objects.annotate(
+            period=trunc('recorded_at')
+        ).values('location', 'data_type', 'period').annotate(
+            count=Count('weather_id'),
+            total=Sum('value'),
+            low=Min('value'),
+            high=Max('value'),
+        ).order_by()
+
+        batch = []
+        for row in rows.iterator(chunk_size=2000):
+            batch.append(WeatherRollup(
+                granularity=granularity,
+                period_start=row['period'],
+                location=row['location'],
+                data_type=row['data_type'],
+                reading_count=row['count'],
+                value_sum=row['total'],
+                value_min=row['low'],
+                value_max=row['high'],
+            ))
+            if len(batch) >= 1000:
+                WeatherRollup.objects.bulk_create(batch)
+                batch = []
+        WeatherRollup.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('insurance', '0008_statuscounter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WeatherRollup',
+            fields=[
+                ('rollup_id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('granularity', models.CharField(choices=[('HOUR', 'Hourly'), ('DAY', 'Daily'), ('MONTH', 'Monthly')], max_length=10)),
+                ('period_start', models.DateTimeField()),
+                ('location', models.CharField(max_length=200)),
+                ('data_type', models.CharField(max_length=50)),
+                ('reading_count', models.IntegerField(default=0)),
+                ('value_sum', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('value_min', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('value_max', models.DecimalField(decimal_places=2, max_digits=10)),
+            ],
+            options={
+                'db_table': 'weather_rollups',
+                'indexes': [models.Index(fields=['granularity', 'period_start'], name='weather_rol_granula_6d642d_idx')],
+                'constraints': [models.UniqueConstraint(fields=('granularity', 'location', 'data_type', 'period_start'), name='unique_weather_rollup')],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-17 20:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('insurance', '0009_weatherrollup'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='claim',
+            index=models.Index(fields=['claim_date', 'claim_id'], name='claims_claim_d_25e799_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'created_at', 'notification_id'], name='notificatio_user_id_16dfb8_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.8 on 2026-10-17 21:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('insurance', '0010_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TableVersion',
+            fields=[
+                ('table_name', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('version', models.BigIntegerField(default=0)),
+                ('date_time_modified', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'table_versions',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-17 21:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('insurance', '0012_user_token_version'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='user_name',
+            field=models.CharField(db_index=True, max_length=200),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.8 on 2026-10-17 21:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('insurance', '0013_user_name_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncSequence',
+            fields=[
+                ('organisation', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to='insurance.organization')),
+                ('last_sequence', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'sync_sequences',
+            },
+        ),
+        migrations.CreateModel(
+            name='SyncChange',
+            fields=[
+                ('change_id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('sequence', models.BigIntegerField()),
+                ('entity', models.CharField(max_length=30)),
+                ('object_id', models.BigIntegerField()),
+                ('operation', models.CharField(choices=[('UPSERT', 'Insert or update'), ('DELETE', 'Delete')], max_length=10)),
+                ('date_time_added', models.DateTimeField(auto_now_add=True)),
+                ('organisation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='insurance.organization')),
+            ],
+            options={
+                'db_table': 'sync_changes',
+                'indexes': [models.Index(fields=['organisation', 'entity', 'object_id', 'sequence'], name='sync_change_object_idx')],
+                'constraints': [models.UniqueConstraint(fields=('organisation', 'sequence'), name='unique_sync_change_sequence')],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-17 21:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('insurance', '0014_sync_change_log'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncOperation',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('operation_id', models.UUIDField()),
+                ('entity', models.CharField(max_length=30)),
+                ('result', models.JSONField()),
+                ('date_time_added', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'sync_operations',
+                'constraints': [models.UniqueConstraint(fields=('user', 'operation_id'), name='unique_sync_operation')],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-10-17 21:19
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('insurance', '0015_sync_operations'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadSession',
+            fields=[
+                ('upload_id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('target', models.CharField(choices=[('claim', 'Claim photo'), ('inspection', 'Inspection photo')], max_length=20)),
+                ('object_id', models.IntegerField()),
+                ('file_size', models.BigIntegerField()),
+                ('received_size', models.BigIntegerField(default=0)),
+                ('content_type', models.CharField(blank=True, max_length=50)),
+                ('caption', models.CharField(blank=True, max_length=200)),
+                ('latitude', models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True)),
+                ('longitude', models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True)),
+                ('status', models.CharField(choices=[('ACTIVE', 'Active'), ('COMPLETED', 'Completed')], default='ACTIVE', max_length=20)),
+                ('photo_id', models.IntegerField(blank=True, null=True)),
+                ('date_time_added', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'upload_sessions',
+            },
+        ),
+    ]
@@ -23,7 +23,17 @@ from .claims import Claim, ClaimAssignment, LossAssessor
 from .financial import Subsidy, Invoice
 
 # Advisory models
-from .advisory import Advisory, WeatherData
+from .advisory import Advisory, WeatherData, WeatherRollup
+
+# Statistics models
+from .counters import StatusCounter
+
+# Change tracking models
+from .versions import TableVersion
+from .sync import SyncChange, SyncOperation, SyncSequence
+
+# Upload models
+from .uploads import UploadSession
 
 __all__ = [
     # Base
@@ -69,4 +79,17 @@ __all__ = [
     # Advisory
     'Advisory',
     'WeatherData',
+    'WeatherRollup',
+
+    # Statistics
+    'StatusCounter',
+
+    # Change tracking
+    'TableVersion',
+    'SyncChange',
+    'SyncSequence',
+    'SyncOperation',
+
+    # Uploads
+    'UploadSession',
 ]
\ No newline at end of file
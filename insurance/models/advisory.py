@@ -1,4 +1,10 @@
-from django.db import models
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, Max, Min, Q, Sum
+from django.db.models.functions import TruncHour, TruncMonth
+from django.utils import timezone
 
 
 class Advisory(models.Model):
@@ -47,4 +53,294 @@ class WeatherData(models.Model):
         ]
 
     def __str__(self):
-        return f"{self.location} - {self.data_type} - {self.value}"
\ No newline at end of file
+        return f"{self.location} - {self.data_type} - {self.value}"
+
+
+class WeatherRollupManager(models.Manager):
+    """Maintains and queries pre-aggregated weather readings"""
+
+    # Coarsest first, the order in which rollups are considered for a query
+    GRANULARITIES = ['MONTH', 'DAY', 'HOUR']
+
+    @staticmethod
+    def truncate(value, granularity):
+        """Start of the local-time period containing ``value``."""
+        value = timezone.localtime(value).replace(minute=0, second=0, microsecond=0)
+        if granularity in ('DAY', 'MONTH'):
+            value = value.replace(hour=0)
+        if granularity == 'MONTH':
+            value = value.replace(day=1)
+        return value
+
+    @staticmethod
+    def next_month(value):
+        return (value.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+    @staticmethod
+    def _merge(buckets, key, count, total, low, high):
+        bucket = buckets.get(key)
+        if bucket is None:
+            buckets[key] = [count, total, low, high]
+        else:
+            bucket[0] += count
+            bucket[1] += total
+            bucket[2] = min(bucket[2], low)
+            bucket[3] = max(bucket[3], high)
+
+    def add_readings(self, readings):
+        """
+        Fold newly inserted readings into every rollup granularity.
+
+        Args:
+            readings: Iterable of WeatherData instances (or objects with
+                location, data_type, value and recorded_at)
+        """
+        buckets = {}
+        for reading in readings:
+            value = reading.value
+            if not isinstance(value, Decimal):
+                value = Decimal(str(value))
+            for granularity in self.GRANULARITIES:
+                key = (
+                    granularity,
+                    self.truncate(reading.recorded_at, granularity),
+                    reading.location,
+                    reading.data_type,
+                )
+                self._merge(buckets, key, 1, value, value, value)
+
+        if not buckets:
+            return
+
+        for attempt in range(3):
+            try:
+                with transaction.atomic():
+                    self._apply_buckets(buckets)
+                return
+            except IntegrityError:
+                # A concurrent writer created one of the rows; merge again
+                if attempt == 2:
+                    raise
+
+    def _apply_buckets(self, buckets, batch_size=300):
+        keys = sorted(buckets, key=lambda k: (k[0], k[2], k[3], k[1]))
+        for offset in range(0, len(keys), batch_size):
+            batch = keys[offset:offset + batch_size]
+            existing = {
+                (row.granularity, row.period_start, row.location, row.data_type): row
+                for row in self.select_for_update().filter(
+                    granularity__in={key[0] for key in batch},
+                    location__in={key[2] for key in batch},
+                    data_type__in={key[3] for key in batch},
+                    period_start__gte=min(key[1] for key in batch),
+                    period_start__lte=max(key[1] for key in batch),
+                )
+            }
+
+            to_update, to_create = [], []
+            for key in batch:
+                count, total, low, high = buckets[key]
+                row = existing.get(key)
+                if row is None:
+                    to_create.append(self.model(
+                        granularity=key[0],
+                        period_start=key[1],
+                        location=key[2],
+                        data_type=key[3],
+                        reading_count=count,
+                        value_sum=total,
+                        value_min=low,
+                        value_max=high,
+                    ))
+                else:
+                    row.reading_count += count
+                    row.value_sum += total
+                    row.value_min = min(row.value_min, low)
+                    row.value_max = max(row.value_max, high)
+                    to_update.append(row)
+
+            if to_update:
+                self.bulk_update(
+                    to_update,
+                    ['reading_count', 'value_sum', 'value_min', 'value_max'],
+                    batch_size=batch_size,
+                )
+            if to_create:
+                self.bulk_create(to_create, batch_size=batch_size)
+
+    def scopes_for(self, readings):
+        """(location, data_type, month start) scopes touched by ``readings``."""
+        return {
+            (reading.location, reading.data_type, self.truncate(reading.recorded_at, 'MONTH'))
+            for reading in readings
+        }
+
+    def scopes_for_queryset(self, queryset):
+        """Same as ``scopes_for`` but computed in the database."""
+        return {
+            (location, data_type, self.truncate(month, 'MONTH'))
+            for location, data_type, month in queryset.annotate(
+                month=TruncMonth('recorded_at')
+            ).values_list('location', 'data_type', 'month').distinct().order_by()
+        }
+
+    def rebuild(self, scopes, batch_size=100):
+        """
+        Recompute the rollups of whole (location, data_type, month) scopes.
+
+        Used after deletes and updates, where min/max cannot be maintained
+        incrementally. Each batch of scopes is re-aggregated from the raw
+        readings with one hour-grouped query.
+        """
+        scopes = sorted(scopes)
+        with transaction.atomic():
+            for offset in range(0, len(scopes), batch_size):
+                raw_filter = Q()
+                rollup_filter = Q()
+                for location, data_type, month in scopes[offset:offset + batch_size]:
+                    window = (month, self.next_month(month))
+                    raw_filter |= Q(
+                        location=location, data_type=data_type,
+                        recorded_at__gte=window[0], recorded_at__lt=window[1],
+                    )
+                    rollup_filter |= Q(
+                        location=location, data_type=data_type,
+                        period_start__gte=window[0], period_start__lt=window[1],
+                    )
+
+                self.filter(rollup_filter).delete()
+                self.bulk_create(
+                    self._aggregate_raw(WeatherData.objects.filter(raw_filter)),
+                    batch_size=500,
+                )
+
+    def _aggregate_raw(self, queryset):
+        hours = queryset.annotate(
+            period=TruncHour('recorded_at')
+        ).values('location', 'data_type', 'period').annotate(
+            count=Count('weather_id'),
+            total=Sum('value'),
+            low=Min('value'),
+            high=Max('value'),
+        ).order_by()
+
+        buckets = {}
+        for row in hours.iterator(chunk_size=2000):
+            for granularity in self.GRANULARITIES:
+                key = (
+                    granularity,
+                    self.truncate(row['period'], granularity),
+                    row['location'],
+                    row['data_type'],
+                )
+                self._merge(
+                    buckets, key, row['count'], row['total'], row['low'], row['high']
+                )
+
+        return [
+            self.model(
+                granularity=key[0],
+                period_start=key[1],
+                location=key[2],
+                data_type=key[3],
+                reading_count=count,
+                value_sum=total,
+                value_min=low,
+                value_max=high,
+            )
+            for key, (count, total, low, high) in buckets.items()
+        ]
+
+    def next_period(self, value, granularity):
+        """Start of the period after the one starting at ``value``."""
+        if granularity == 'HOUR':
+            return value + timedelta(hours=1)
+        if granularity == 'DAY':
+            return self.truncate(value + timedelta(days=1), 'DAY')
+        return self.next_month(value)
+
+    def _segments(self, start, end, level=0):
+        """
+        Split [start, end) into (granularity, start, end) pieces.
+
+        The coarsest granularity covers the whole periods in the middle and
+        the leftover edges are split again one granularity finer.
+        """
+        granularity = self.GRANULARITIES[level]
+        if level == len(self.GRANULARITIES) - 1:
+            return [(granularity, start, end)]
+
+        inner_start = start
+        if start is not None and self.truncate(start, granularity) != start:
+            inner_start = self.next_period(self.truncate(start, granularity), granularity)
+        inner_end = end if end is None else self.truncate(end, granularity)
+        if inner_start is not None and inner_end is not None and inner_start >= inner_end:
+            return self._segments(start, end, level + 1)
+
+        segments = [(granularity, inner_start, inner_end)]
+        if start is not None and start < inner_start:
+            segments = self._segments(start, inner_start, level + 1) + segments
+        if end is not None and inner_end < end:
+            segments += self._segments(inner_end, end, level + 1)
+        return segments
+
+    def covering(self, start=None, end=None):
+        """
+        Rollups answering the half-open window [start, end), or None.
+
+        Whole months inside the window are read from MONTH rollups and the
+        days and hours left at either edge from DAY and HOUR rollups. Bounds
+        must fall on whole hours; None means the window must be aggregated
+        from raw readings.
+        """
+        if any(
+            bound is not None and self.truncate(bound, 'HOUR') != bound
+            for bound in (start, end)
+        ):
+            return None
+
+        periods = Q()
+        for granularity, lower, upper in self._segments(start, end):
+            period = Q(granularity=granularity)
+            if lower is not None:
+                period &= Q(period_start__gte=lower)
+            if upper is not None:
+                period &= Q(period_start__lt=upper)
+            periods |= period
+        return self.filter(periods)
+
+
+class WeatherRollup(models.Model):
+    """Hourly, daily and monthly aggregates of WeatherData per location and type"""
+    GRANULARITY_CHOICES = [
+        ('HOUR', 'Hourly'),
+        ('DAY', 'Daily'),
+        ('MONTH', 'Monthly'),
+    ]
+
+    rollup_id = models.BigAutoField(primary_key=True)
+    granularity = models.CharField(max_length=10, choices=GRANULARITY_CHOICES)
+    period_start = models.DateTimeField()
+    location = models.CharField(max_length=200)
+    data_type = models.CharField(max_length=50)
+    reading_count = models.IntegerField(default=0)
+    value_sum = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+    value_min = models.DecimalField(max_digits=10, decimal_places=2)
+    value_max = models.DecimalField(max_digits=10, decimal_places=2)
+
+    objects = WeatherRollupManager()
+
+    class Meta:
+        db_table = 'weather_rollups'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['granularity', 'location', 'data_type', 'period_start'],
+                name='unique_weather_rollup',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['granularity', 'period_start']),
+        ]
+
+    def __str__(self):
+        return f"{self.location} - {self.data_type} - {self.granularity} {self.period_start}"
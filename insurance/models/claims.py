@@ -1,5 +1,8 @@
 from django.db import models
 
+from .counters import CounterLedgerMixin
+from .sync import SyncChangeMixin
+
 
 class LossAssessor(models.Model):
     assessor_id = models.AutoField(primary_key=True)
@@ -15,7 +18,7 @@ class LossAssessor(models.Model):
         return self.user.user_name
 
 
-class Claim(models.Model):
+class Claim(SyncChangeMixin, CounterLedgerMixin, models.Model):
     claim_id = models.AutoField(primary_key=True)
     farmer = models.ForeignKey('Farmer', on_delete=models.PROTECT)
     quotation = models.ForeignKey('Quotation', on_delete=models.PROTECT)
@@ -28,8 +31,21 @@ class Claim(models.Model):
     approval_date = models.DateTimeField(null=True, blank=True)
     loss_details = models.JSONField(null=True, blank=True)
 
+    ledger_dimensions = {'claim': 'status'}
+    ledger_amounts = {
+        'amount': 'estimated_loss_amount',
+        'approved_amount': 'approved_amount',
+    }
+    ledger_organisation = 'farmer__organisation_id'
+
+    sync_entity = 'claims'
+    sync_organisation = 'farmer__organisation_id'
+
     class Meta:
         db_table = 'claims'
+        indexes = [
+            models.Index(fields=['claim_date', 'claim_id']),
+        ]
 
     def __str__(self):
         return self.claim_number
@@ -0,0 +1,286 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, Sum
+
+
+class StatusCounterManager(models.Manager):
+    def apply(self, deltas):
+        """
+        Add count/amount deltas to the ledger.
+
+        Args:
+            deltas: {(organisation_id, entity, status): [count, amount, approved_amount]}
+        """
+        for (organisation_id, entity, status), (count, amount, approved) in deltas.items():
+            if not (count or amount or approved):
+                continue
+
+            key = {
+                'organisation_id': organisation_id,
+                'entity': entity,
+                'status': status,
+            }
+            changes = {
+                'count': F('count') + count,
+                'amount': F('amount') + amount,
+                'approved_amount': F('approved_amount') + approved,
+            }
+            if self.filter(**key).update(**changes):
+                continue
+
+            try:
+                with transaction.atomic():
+                    self.create(
+                        count=count, amount=amount, approved_amount=approved, **key
+                    )
+            except IntegrityError:
+                # Another transaction created the row first
+                self.filter(**key).update(**changes)
+
+    def record(self, model, removed=(), added=()):
+        """
+        Move ledger rows from the ``removed`` states to the ``added`` states.
+
+        Each state is a dict keyed by ``model.ledger_lookups()``.
+        """
+        deltas = defaultdict(lambda: [0, Decimal('0'), Decimal('0')])
+
+        for sign, rows in ((-1, removed), (1, added)):
+            for row in rows:
+                amounts = model.ledger_amount_values(row)
+                for entity, field in model.ledger_dimensions.items():
+                    key = (row[model.ledger_organisation], entity, row[field] or '')
+                    delta = deltas[key]
+                    delta[0] += sign
+                    delta[1] += sign * amounts['amount']
+                    delta[2] += sign * amounts['approved_amount']
+
+        self.apply(deltas)
+
+    def totals(self, entities, organisation_id=None):
+        """
+        Read the ledger for one or more entities in a single query.
+
+        Returns:
+            dict: {entity: {status: {'count', 'amount', 'approved_amount'}}}
+        """
+        queryset = self.filter(entity__in=entities)
+        if organisation_id:
+            queryset = queryset.filter(organisation_id=organisation_id)
+
+        rows = queryset.values('entity', 'status').annotate(
+            total_count=Sum('count'),
+            total_amount=Sum('amount'),
+            total_approved=Sum('approved_amount'),
+        ).order_by()
+
+        result = {entity: {} for entity in entities}
+        for row in rows:
+            if not row['total_count']:
+                continue
+            result[row['entity']][row['status']] = {
+                'count': row['total_count'],
+                'amount': row['total_amount'] or Decimal('0'),
+                'approved_amount': row['total_approved'] or Decimal('0'),
+            }
+        return result
+
+
+class StatusCounter(models.Model):
+    """
+    Running totals per (organisation, entity, status).
+
+    Maintained by ``CounterLedgerMixin`` so that statistics endpoints can read
+    totals without scanning the underlying tables. ``status`` holds the value
+    of whichever field the entity is counted by (e.g. gender for
+    ``farmer_gender``).
+    """
+    ENTITY_CHOICES = [
+        ('farmer', 'Farmer'),
+        ('farmer_gender', 'Farmer by gender'),
+        ('quotation', 'Quotation'),
+        ('claim', 'Claim'),
+        ('invoice', 'Invoice'),
+    ]
+
+    counter_id = models.AutoField(primary_key=True)
+    organisation = models.ForeignKey('Organization', on_delete=models.CASCADE)
+    entity = models.CharField(max_length=30, choices=ENTITY_CHOICES)
+    status = models.CharField(max_length=30, blank=True)
+    count = models.BigIntegerField(default=0)
+    amount = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+    approved_amount = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+    date_time_modified = models.DateTimeField(auto_now=True)
+
+    objects = StatusCounterManager()
+
+    class Meta:
+        db_table = 'status_counters'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['organisation', 'entity', 'status'],
+                name='unique_status_counter',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.entity} {self.status}: {self.count}"
+
+
+class CounterLedgerMixin:
+    """
+    Keeps ``StatusCounter`` in step with inserts, status changes and deletes.
+
+    Subclasses declare:
+        ledger_dimensions: {entity: field} - the field each entity is counted by
+        ledger_amounts: {'amount' | 'approved_amount': field} - summed columns
+        ledger_organisation: lookup from the model to the organisation id
+        ledger_children: related managers of ledger models whose organisation
+            is derived from this row; their ledger rows follow it when it
+            moves to another organisation
+    """
+    ledger_dimensions = {}
+    ledger_amounts = {}
+    ledger_organisation = 'organisation_id'
+    ledger_children = ()
+
+    @classmethod
+    def ledger_local_field(cls):
+        """Attname on this model that determines the organisation."""
+        if '__' not in cls.ledger_organisation:
+            return cls.ledger_organisation
+        return cls._meta.get_field(cls.ledger_organisation.split('__')[0]).attname
+
+    @classmethod
+    def ledger_lookups(cls):
+        lookups = [cls.ledger_organisation, cls.ledger_local_field()]
+        lookups += list(cls.ledger_dimensions.values())
+        lookups += list(cls.ledger_amounts.values())
+        return list(dict.fromkeys(lookups))
+
+    @classmethod
+    def ledger_amount_values(cls, row):
+        amounts = {}
+        for column in ('amount', 'approved_amount'):
+            value = row.get(cls.ledger_amounts.get(column)) or Decimal('0')
+            if not isinstance(value, Decimal):
+                value = Decimal(str(value))
+            amounts[column] = value
+        return amounts
+
+    def _ledger_organisation_id(self, local_value, previous=None):
+        if previous and previous[self.ledger_local_field()] == local_value:
+            return previous[self.ledger_organisation]
+
+        relation, remainder = self.ledger_organisation.split('__', 1)
+        field = self._meta.get_field(relation)
+        if field.is_cached(self) and getattr(self, field.attname) == local_value:
+            return getattr(getattr(self, relation), remainder)
+        return field.related_model._base_manager.filter(
+            pk=local_value
+        ).values_list(remainder, flat=True).first()
+
+    def _ledger_row(self, previous=None, update_fields=None):
+        local = self.ledger_local_field()
+        row = {}
+        for lookup in self.ledger_lookups():
+            if lookup != local and lookup == self.ledger_organisation:
+                continue
+            if previous is not None and update_fields is not None and lookup not in update_fields:
+                row[lookup] = previous[lookup]
+            else:
+                row[lookup] = getattr(self, lookup)
+        if local != self.ledger_organisation:
+            row[self.ledger_organisation] = self._ledger_organisation_id(row[local], previous)
+        return row
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = {
+                self._meta.get_field(name).attname for name in update_fields
+            }
+
+        with transaction.atomic(savepoint=False):
+            previous = None
+            if not self._state.adding and self.pk is not None:
+                previous = type(self)._base_manager.select_for_update(
+                    of=('self',)
+                ).filter(pk=self.pk).values(*self.ledger_lookups()).first()
+
+            super().save(*args, **kwargs)
+
+            current = self._ledger_row(previous, update_fields)
+            StatusCounter.objects.record(
+                type(self),
+                removed=[previous] if previous else [],
+                added=[current],
+            )
+
+            if previous and previous[self.ledger_organisation] != current[self.ledger_organisation]:
+                self._move_ledger_children(previous[self.ledger_organisation])
+
+    def _move_ledger_children(self, previous_organisation_id):
+        for name in self.ledger_children:
+            manager = getattr(self, name)
+            model = manager.model
+            # Read after the save, so the rows already carry the new organisation
+            rows = list(
+                manager.select_for_update(of=('self',)).values(*model.ledger_lookups())
+            )
+            StatusCounter.objects.record(
+                model,
+                removed=[
+                    {**row, model.ledger_organisation: previous_organisation_id}
+                    for row in rows
+                ],
+                added=rows,
+            )
+
+
+def record_ledger_delete(sender, instance, **kwargs):
+    """post_delete receiver for models using ``CounterLedgerMixin``."""
+    StatusCounter.objects.record(sender, removed=[instance._ledger_row()])
+
+
+def update_with_ledger(queryset, **changes):
+    """
+    ``QuerySet.update()`` that also moves the affected rows in the ledger.
+
+    The matching rows are locked, updated and counted in one transaction.
+
+    Returns:
+        int: Number of rows updated
+
+    Raises:
+        ValueError: If ``changes`` would move rows to another organisation
+    """
+    model = queryset.model
+    lookups = model.ledger_lookups()
+    tracked = {
+        model._meta.get_field(name).attname: value
+        for name, value in changes.items()
+    }
+    if model.ledger_local_field() in tracked:
+        raise ValueError('update_with_ledger cannot change the organisation')
+
+    with transaction.atomic():
+        rows = list(
+            queryset.select_for_update(of=('self',)).values('pk', *lookups)
+        )
+        if not rows:
+            return 0
+
+        count = model._base_manager.filter(
+            pk__in=[row['pk'] for row in rows]
+        ).update(**changes)
+
+        added = [
+            {lookup: tracked.get(lookup, row[lookup]) for lookup in lookups}
+            for row in rows
+        ]
+        StatusCounter.objects.record(model, removed=rows, added=added)
+
+    return count
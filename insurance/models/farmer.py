@@ -1,7 +1,10 @@
 from django.db import models
 
+from .counters import CounterLedgerMixin
+from .sync import SyncChangeMixin
 
-class Farmer(models.Model):
+
+class Farmer(SyncChangeMixin, CounterLedgerMixin, models.Model):
     farmer_id = models.AutoField(primary_key=True)
     organisation = models.ForeignKey('Organization', on_delete=models.PROTECT)
     country = models.ForeignKey('Country', on_delete=models.PROTECT, null=True, blank=True)
@@ -16,6 +19,12 @@ class Farmer(models.Model):
     status = models.CharField(max_length=20, default='ACTIVE')
     date_time_added = models.DateTimeField(auto_now_add=True)
 
+    ledger_dimensions = {'farmer': 'status', 'farmer_gender': 'gender'}
+    ledger_children = ('quotation_set', 'claim_set')
+
+    sync_entity = 'farmers'
+    sync_children = ('farms', 'quotation_set', 'claim_set')
+
     class Meta:
         db_table = 'farmers'
 
@@ -23,7 +32,7 @@ class Farmer(models.Model):
         return f"{self.first_name} {self.last_name}"
 
 
-class Farm(models.Model):
+class Farm(SyncChangeMixin, models.Model):
     farm_id = models.AutoField(primary_key=True)
     farmer = models.ForeignKey(Farmer, on_delete=models.PROTECT, related_name='farms')
     farm_name = models.CharField(max_length=200)
@@ -35,6 +44,9 @@ class Farm(models.Model):
     status = models.CharField(max_length=20, default='ACTIVE')
     date_time_added = models.DateTimeField(auto_now_add=True)
 
+    sync_entity = 'farms'
+    sync_organisation = 'farmer__organisation_id'
+
     class Meta:
         db_table = 'farms'
 
@@ -1,5 +1,7 @@
 from django.db import models
 
+from .counters import CounterLedgerMixin
+
 
 class Subsidy(models.Model):
     subsidy_id = models.AutoField(primary_key=True)
@@ -17,7 +19,7 @@ class Subsidy(models.Model):
         return self.subsidy_name
 
 
-class Invoice(models.Model):
+class Invoice(CounterLedgerMixin, models.Model):
     invoice_id = models.AutoField(primary_key=True)
     organisation = models.ForeignKey('Organization', on_delete=models.PROTECT)
     subsidy = models.ForeignKey(Subsidy, on_delete=models.PROTECT)
@@ -29,6 +31,9 @@ class Invoice(models.Model):
     payment_reference = models.CharField(max_length=100, null=True, blank=True)
     date_time_added = models.DateTimeField(auto_now_add=True)
 
+    ledger_dimensions = {'invoice': 'status'}
+    ledger_amounts = {'amount': 'amount'}
+
     class Meta:
         db_table = 'invoices'
 
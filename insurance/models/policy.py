@@ -1,7 +1,10 @@
 from django.db import models
 
+from .counters import CounterLedgerMixin
+from .sync import SyncChangeMixin
 
-class Quotation(models.Model):
+
+class Quotation(SyncChangeMixin, CounterLedgerMixin, models.Model):
     quotation_id = models.AutoField(primary_key=True)
     farmer = models.ForeignKey('Farmer', on_delete=models.PROTECT)
     farm = models.ForeignKey('Farm', on_delete=models.PROTECT)
@@ -14,6 +17,13 @@ class Quotation(models.Model):
     payment_date = models.DateTimeField(null=True, blank=True)
     payment_reference = models.CharField(max_length=100, null=True, blank=True)
 
+    ledger_dimensions = {'quotation': 'status'}
+    ledger_amounts = {'amount': 'premium_amount'}
+    ledger_organisation = 'farmer__organisation_id'
+
+    sync_entity = 'quotations'
+    sync_organisation = 'farmer__organisation_id'
+
     class Meta:
         db_table = 'quotations'
 
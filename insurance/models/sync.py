@@ -0,0 +1,307 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, models, transaction
+from django.db.models import Exists, F, OuterRef
+from django.utils import timezone
+
+
+class SyncSequenceManager(models.Manager):
+    def allocate(self, organisation_id, count=1):
+        """
+        Reserve ``count`` sequence numbers for an organisation.
+
+        The organisation's row stays locked until the transaction commits, so
+        sequence numbers become visible in the order they were handed out and
+        a client holding sequence N never misses a change numbered below N.
+
+        Returns:
+            int: The last number reserved (the first is ``last - count + 1``)
+        """
+        changes = {'last_sequence': F('last_sequence') + count}
+        if not self.filter(organisation_id=organisation_id).update(**changes):
+            try:
+                with transaction.atomic():
+                    self.create(organisation_id=organisation_id, last_sequence=count)
+                    return count
+            except IntegrityError:
+                # Another transaction created the row first
+                self.filter(organisation_id=organisation_id).update(**changes)
+        return self.filter(organisation_id=organisation_id).values_list(
+            'last_sequence', flat=True
+        ).get()
+
+    def current(self, organisation_id):
+        """Last committed sequence number of an organisation (0 if none)."""
+        return self.filter(organisation_id=organisation_id).values_list(
+            'last_sequence', flat=True
+        ).first() or 0
+
+
+class SyncSequence(models.Model):
+    """Per-organisation counter numbering ``SyncChange`` rows."""
+    organisation = models.OneToOneField(
+        'Organization', on_delete=models.CASCADE, primary_key=True
+    )
+    last_sequence = models.BigIntegerField(default=0)
+
+    objects = SyncSequenceManager()
+
+    class Meta:
+        db_table = 'sync_sequences'
+
+    def __str__(self):
+        return f"{self.organisation_id}: {self.last_sequence}"
+
+
+class SyncChangeManager(models.Manager):
+    def record(self, model, changes):
+        """
+        Append change-log rows for one model.
+
+        Args:
+            model: Model class using ``SyncChangeMixin``
+            changes: List of (organisation_id, object_id, operation)
+        """
+        by_organisation = {}
+        for organisation_id, object_id, operation in changes:
+            if organisation_id is not None:
+                by_organisation.setdefault(organisation_id, []).append((object_id, operation))
+
+        rows = []
+        for organisation_id, entries in sorted(by_organisation.items()):
+            last = SyncSequence.objects.allocate(organisation_id, len(entries))
+            first = last - len(entries) + 1
+            rows.extend(
+                self.model(
+                    organisation_id=organisation_id,
+                    sequence=first + offset,
+                    entity=model.sync_entity,
+                    object_id=object_id,
+                    operation=operation,
+                )
+                for offset, (object_id, operation) in enumerate(entries)
+            )
+        self.bulk_create(rows)
+
+    def latest_since(self, organisation_id, since, until):
+        """
+        The newest change per object numbered in (since, until].
+
+        Older changes to an object that changed again in the window are
+        left out with a NOT EXISTS on a later change.
+        """
+        window = self.filter(
+            organisation_id=organisation_id,
+            sequence__gt=since,
+            sequence__lte=until,
+        )
+        newer = window.filter(
+            entity=OuterRef('entity'),
+            object_id=OuterRef('object_id'),
+            sequence__gt=OuterRef('sequence'),
+        )
+        return window.filter(~Exists(newer)).order_by('sequence')
+
+
+class SyncChange(models.Model):
+    """
+    Change log of the entities served by the sync endpoint.
+
+    One row per insert, update or delete, numbered by the organisation's
+    ``SyncSequence``. Clients pull every change after the last sequence they
+    saw; deletes are recorded as tombstones.
+    """
+    UPSERT = 'UPSERT'
+    DELETE = 'DELETE'
+    OPERATION_CHOICES = [
+        (UPSERT, 'Insert or update'),
+        (DELETE, 'Delete'),
+    ]
+
+    change_id = models.BigAutoField(primary_key=True)
+    organisation = models.ForeignKey('Organization', on_delete=models.CASCADE)
+    sequence = models.BigIntegerField()
+    entity = models.CharField(max_length=30)
+    object_id = models.BigIntegerField()
+    operation = models.CharField(max_length=10, choices=OPERATION_CHOICES)
+    date_time_added = models.DateTimeField(auto_now_add=True)
+
+    objects = SyncChangeManager()
+
+    class Meta:
+        db_table = 'sync_changes'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['organisation', 'sequence'],
+                name='unique_sync_change_sequence',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['organisation', 'entity', 'object_id', 'sequence'],
+                name='sync_change_object_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.entity} {self.object_id} {self.operation} #{self.sequence}"
+
+
+class SyncChangeMixin:
+    """
+    Logs every save and delete of the model to ``SyncChange``.
+
+    Subclasses declare:
+        sync_entity: Entity name used by the sync endpoint (e.g. 'farms')
+        sync_organisation: lookup from the model to the organisation id
+        sync_children: related managers of sync entities whose organisation
+            is derived from this row (e.g. a farmer's farms)
+
+    A save that moves the row to another organisation records a DELETE
+    under the old organisation and an UPSERT under the new one, for the row
+    and for every row of ``sync_children``.
+    """
+    sync_entity = None
+    sync_organisation = 'organisation_id'
+    sync_children = ()
+
+    def _sync_organisation_id(self):
+        if '__' not in self.sync_organisation:
+            return getattr(self, self.sync_organisation)
+
+        relation, remainder = self.sync_organisation.split('__', 1)
+        field = self._meta.get_field(relation)
+        local_value = getattr(self, field.attname)
+        if field.is_cached(self) and getattr(self, relation) is not None:
+            return getattr(getattr(self, relation), remainder)
+        return field.related_model._base_manager.filter(
+            pk=local_value
+        ).values_list(remainder, flat=True).first()
+
+    def _stored_sync_organisation_id(self):
+        return type(self)._base_manager.filter(pk=self.pk).values_list(
+            self.sync_organisation, flat=True
+        ).first()
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic(savepoint=False):
+            previous = None
+            if not self._state.adding and self.pk is not None:
+                previous = self._stored_sync_organisation_id()
+
+            super().save(*args, **kwargs)
+
+            organisation_id = self._sync_organisation_id()
+            if previous is not None and organisation_id != previous:
+                # update_fields may have left the stored organisation alone
+                organisation_id = self._stored_sync_organisation_id()
+            if previous is None or organisation_id == previous:
+                SyncChange.objects.record(
+                    type(self), [(organisation_id, self.pk, SyncChange.UPSERT)]
+                )
+                return
+
+            SyncChange.objects.record(type(self), [
+                (previous, self.pk, SyncChange.DELETE),
+                (organisation_id, self.pk, SyncChange.UPSERT),
+            ])
+            for name in self.sync_children:
+                manager = getattr(self, name)
+                ids = list(manager.values_list('pk', flat=True))
+                SyncChange.objects.record(
+                    manager.model,
+                    [(previous, object_id, SyncChange.DELETE) for object_id in ids]
+                    + [(organisation_id, object_id, SyncChange.UPSERT) for object_id in ids],
+                )
+
+
+def record_sync_delete(sender, instance, **kwargs):
+    """post_delete receiver for models using ``SyncChangeMixin``."""
+    SyncChange.objects.record(
+        sender, [(instance._sync_organisation_id(), instance.pk, SyncChange.DELETE)]
+    )
+
+
+class SyncOperationManager(models.Manager):
+    def applied(self, user, operation_ids):
+        """
+        Unexpired operations of ``user`` among ``operation_ids``.
+
+        Returns:
+            dict: {operation_id: stored result}
+        """
+        if not operation_ids:
+            return {}
+        return dict(
+            self.filter(
+                user=user,
+                operation_id__in=operation_ids,
+                expires_at__gt=timezone.now(),
+            ).values_list('operation_id', 'result')
+        )
+
+    def record(self, user, entity, results):
+        """
+        Store the results of newly applied operations.
+
+        Args:
+            results: {operation_id: JSON-serializable result}
+        """
+        if not results:
+            return
+        now = timezone.now()
+        # An expired row that was not purged yet would block the insert
+        self.filter(
+            user=user, operation_id__in=list(results), expires_at__lte=now
+        ).delete()
+        ttl = getattr(settings, 'SYNC_OPERATION_TTL', 7 * 24 * 60 * 60)
+        expires_at = now + timedelta(seconds=ttl)
+        self.bulk_create([
+            self.model(
+                user=user,
+                operation_id=operation_id,
+                entity=entity,
+                result=result,
+                expires_at=expires_at,
+            )
+            for operation_id, result in results.items()
+        ])
+
+    def purge_expired(self):
+        """Delete expired operations; returns the number removed."""
+        return self.filter(expires_at__lte=timezone.now()).delete()[0]
+
+
+class SyncOperation(models.Model):
+    """
+    Client operations already applied by the sync endpoint.
+
+    Each uploaded record may carry a client-generated ``operation_id``. The
+    first time it is applied its result is stored here in the same
+    transaction as the write; a retried upload gets the stored result back
+    instead of writing the record again. Rows expire after
+    ``SYNC_OPERATION_TTL`` seconds and are removed by
+    ``manage.py purge_sync_operations``.
+    """
+    id = models.BigAutoField(primary_key=True)
+    user = models.ForeignKey('User', on_delete=models.CASCADE)
+    operation_id = models.UUIDField()
+    entity = models.CharField(max_length=30)
+    result = models.JSONField()
+    date_time_added = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    objects = SyncOperationManager()
+
+    class Meta:
+        db_table = 'sync_operations'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'operation_id'],
+                name='unique_sync_operation',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.entity} {self.operation_id}"
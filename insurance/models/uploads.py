@@ -0,0 +1,61 @@
+import uuid
+
+from django.db import models
+from django.utils import timezone
+
+
+class UploadSessionManager(models.Manager):
+    def expired(self):
+        """Sessions past their expiry, finished or not."""
+        return self.filter(expires_at__lte=timezone.now())
+
+
+class UploadSession(models.Model):
+    """
+    A resumable photo upload.
+
+    The client creates a session for a claim or inspection, sends the file
+    as offset-addressed chunks (written straight into a part file on local
+    disk, see ``insurance.utils.uploads``) and finalizes it, which creates
+    the ClaimPhoto or InspectionPhoto. After a dropped connection the client
+    reads ``received_size`` and resumes from there. Sessions expire after
+    ``UPLOAD_SESSION_TTL`` seconds (completed ones are kept until then so
+    a retried finalize still gets its photo back) and are removed by
+    ``manage.py purge_upload_sessions``.
+    """
+    CLAIM = 'claim'
+    INSPECTION = 'inspection'
+    TARGET_CHOICES = [
+        (CLAIM, 'Claim photo'),
+        (INSPECTION, 'Inspection photo'),
+    ]
+
+    ACTIVE = 'ACTIVE'
+    COMPLETED = 'COMPLETED'
+    STATUS_CHOICES = [
+        (ACTIVE, 'Active'),
+        (COMPLETED, 'Completed'),
+    ]
+
+    upload_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey('User', on_delete=models.CASCADE, related_name='upload_sessions')
+    target = models.CharField(max_length=20, choices=TARGET_CHOICES)
+    object_id = models.IntegerField()
+    file_size = models.BigIntegerField()
+    received_size = models.BigIntegerField(default=0)
+    content_type = models.CharField(max_length=50, blank=True)
+    caption = models.CharField(max_length=200, blank=True)
+    latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=ACTIVE)
+    photo_id = models.IntegerField(null=True, blank=True)
+    date_time_added = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    objects = UploadSessionManager()
+
+    class Meta:
+        db_table = 'upload_sessions'
+
+    def __str__(self):
+        return f"{self.target} {self.object_id}: {self.received_size}/{self.file_size}"
@@ -39,7 +39,7 @@ class User(AbstractBaseUser, PermissionsMixin):
     organisation = models.ForeignKey('Organization', on_delete=models.PROTECT)
     country = models.ForeignKey('Country', on_delete=models.PROTECT, null=True, blank=True)
     user_role = models.CharField(max_length=50, default='API USER')
-    user_name = models.CharField(max_length=200)
+    user_name = models.CharField(max_length=200, db_index=True)
     user_email = models.EmailField(unique=True)
     user_phone_number = models.CharField(max_length=20, null=True, blank=True)
     user_status = models.CharField(max_length=20, default='ACTIVE')
@@ -52,6 +52,8 @@ class User(AbstractBaseUser, PermissionsMixin):
     user_is_active = models.BooleanField(default=True)
     first_name = models.CharField(max_length=100, null=True, blank=True)
     last_name = models.CharField(max_length=100, null=True, blank=True)
+    # Bumped to invalidate every JWT issued to the user
+    token_version = models.PositiveIntegerField(default=0)
 
     objects = UserManager()
 
@@ -73,6 +75,19 @@ class User(AbstractBaseUser, PermissionsMixin):
     def __str__(self):
         return self.user_name
 
+    def set_password(self, raw_password):
+        super().set_password(raw_password)
+        # A new password revokes tokens issued with the old one
+        self.token_version += 1
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        # Users built from token claims defer most columns; load them all on
+        # the first deferred access instead of one query per attribute
+        deferred = self.get_deferred_fields()
+        if fields is not None and deferred and set(fields) <= deferred:
+            fields = list(deferred)
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+
 
 class RoleType(models.Model):
     role_id = models.AutoField(primary_key=True)
@@ -119,6 +134,7 @@ class Notification(models.Model):
         indexes = [
             models.Index(fields=['user', 'is_read']),
             models.Index(fields=['created_at']),
+            models.Index(fields=['user', 'created_at', 'notification_id']),
         ]
 
     def __str__(self):
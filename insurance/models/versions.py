@@ -0,0 +1,54 @@
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+
+
+class TableVersionManager(models.Manager):
+    def bump(self, table_name):
+        """Record a change to ``table_name``."""
+        changes = {'version': F('version') + 1}
+        if self.filter(table_name=table_name).update(**changes):
+            return
+        try:
+            with transaction.atomic():
+                self.create(table_name=table_name, version=1)
+        except IntegrityError:
+            # Another transaction created the row first
+            self.filter(table_name=table_name).update(**changes)
+
+    def versions(self, table_names):
+        """
+        Current version of each table, 0 for tables never changed.
+
+        Returns:
+            dict: {table_name: version}
+        """
+        versions = dict.fromkeys(table_names, 0)
+        versions.update(
+            self.filter(table_name__in=table_names).values_list('table_name', 'version')
+        )
+        return versions
+
+
+class TableVersion(models.Model):
+    """
+    Change counter per table, bumped whenever a row is saved or deleted.
+
+    Lets cached representations of slowly changing tables be validated
+    without reading the tables themselves.
+    """
+    table_name = models.CharField(max_length=100, primary_key=True)
+    version = models.BigIntegerField(default=0)
+    date_time_modified = models.DateTimeField(auto_now=True)
+
+    objects = TableVersionManager()
+
+    class Meta:
+        db_table = 'table_versions'
+
+    def __str__(self):
+        return f"{self.table_name} v{self.version}"
+
+
+def bump_table_version(sender, **kwargs):
+    """post_save / post_delete receiver for versioned models."""
+    TableVersion.objects.bump(sender._meta.db_table)
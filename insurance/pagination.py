@@ -0,0 +1,153 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class OptionalCursorPagination(PageNumberPagination):
+    """
+    Page-number pagination by default, keyset pagination on request.
+
+    Clients opt in with ``?pagination=cursor`` and then follow the ``next`` /
+    ``previous`` links, which carry an opaque ``cursor`` parameter. Cursor
+    pages skip the ``COUNT(*)`` and ``OFFSET`` of page-number pagination, so
+    deep pages cost the same as the first one.
+
+    Pages are keyed on the view's ``cursor_ordering`` (a single non-null
+    field, e.g. ``'-claim_date'``, defaulting to ``'-pk'``) with the primary
+    key as a tiebreaker.
+    """
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+    cursor_page_size_query_param = 'page_size'
+    max_page_size = 1000
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = (
+            self.cursor_query_param in request.query_params
+            or request.query_params.get(self.mode_query_param) == 'cursor'
+        )
+        if not self.cursor_mode:
+            return super().paginate_queryset(queryset, request, view)
+        return self.paginate_cursor(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    # Keyset pagination
+
+    def get_cursor_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.cursor_page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def get_cursor_ordering(self, queryset, view):
+        ordering = getattr(view, 'cursor_ordering', None) or '-pk'
+        descending = ordering.startswith('-')
+        field_name = ordering.lstrip('-')
+        pk_name = queryset.model._meta.pk.name
+        if field_name == 'pk':
+            field_name = pk_name
+        return field_name, pk_name, descending
+
+    def encode_cursor(self, position, reverse):
+        payload = json.dumps({'p': position, 'r': int(reverse)}, separators=(',', ':'))
+        return urlsafe_b64encode(payload.encode('ascii')).decode('ascii')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            position, reverse = payload['p'], bool(payload['r'])
+            if not isinstance(position, list) or len(position) != 2:
+                raise ValueError
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def position_of(self, instance):
+        value = getattr(instance, self.field_name)
+        pk = getattr(instance, self.pk_name)
+        if hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        elif not isinstance(value, (int, str)):
+            value = str(value)
+        return [value, pk]
+
+    def paginate_cursor(self, queryset, request, view):
+        self.request = request
+        self.cursor_page_size = self.get_cursor_page_size(request)
+        self.field_name, self.pk_name, descending = self.get_cursor_ordering(queryset, view)
+        position, reverse = self.decode_cursor(request)
+
+        # A previous-page cursor scans against the ordering; the rows are
+        # put back in order afterwards
+        scan_descending = descending != reverse
+        prefix = '-' if scan_descending else ''
+        queryset = queryset.order_by(f'{prefix}{self.field_name}', f'{prefix}{self.pk_name}')
+
+        if position is not None:
+            model = queryset.model
+            try:
+                value = model._meta.get_field(self.field_name).to_python(position[0])
+                pk = model._meta.pk.to_python(position[1])
+            except ValidationError:
+                raise NotFound(self.invalid_cursor_message)
+            lookup = 'lt' if scan_descending else 'gt'
+            queryset = queryset.filter(
+                Q(**{f'{self.field_name}__{lookup}': value})
+                | Q(**{self.field_name: value, f'{self.pk_name}__{lookup}': pk})
+            )
+
+        rows = list(queryset[:self.cursor_page_size + 1])
+        has_more = len(rows) > self.cursor_page_size
+        rows = rows[:self.cursor_page_size]
+        if reverse:
+            rows.reverse()
+
+        self.page_rows = rows
+        if reverse:
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+        return rows
+
+    def get_next_link(self):
+        if not self.cursor_mode:
+            return super().get_next_link()
+        if not self.has_next or not self.page_rows:
+            return None
+        cursor = self.encode_cursor(self.position_of(self.page_rows[-1]), reverse=False)
+        return self._cursor_link(cursor)
+
+    def get_previous_link(self):
+        if not self.cursor_mode:
+            return super().get_previous_link()
+        if not self.has_previous or not self.page_rows:
+            return None
+        cursor = self.encode_cursor(self.position_of(self.page_rows[0]), reverse=True)
+        return self._cursor_link(cursor)
+
+    def _cursor_link(self, cursor):
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.mode_query_param)
+        return replace_query_param(url, self.cursor_query_param, cursor)
@@ -0,0 +1,29 @@
+"""
+Request parsers.
+
+``ORJSONParser`` is the default JSON parser. It decodes UTF-8 bodies with the
+optional ``orjson`` package and falls back to DRF's ``JSONParser`` when orjson
+is not installed or the body declares another charset.
+"""
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class ORJSONParser(JSONParser):
+    """JSONParser decoding with orjson; rejects NaN and Infinity like it."""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace('-', '') != 'utf8':
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -4,10 +4,13 @@ from .roles import (
     CanManageRoles,
     has_permission_for,
 )
+from .cache import get_role_permissions, invalidate_role_permissions
 
 __all__ = [
     'RoleBasedPermission',
     'CanManageUsers',
     'CanManageRoles',
     'has_permission_for',
+    'get_role_permissions',
+    'invalidate_role_permissions',
 ]
\ No newline at end of file
@@ -0,0 +1,146 @@
+"""
+Cached role permission lookups.
+
+Permission checks run several times per request (permission classes, the
+role middleware, ``has_permission_for`` in views), and each used to load the
+role from the database. Lookups now go through two tiers:
+
+- a small in-process LRU, so repeated checks in a worker cost a dict lookup
+- the Django cache (``ROLE_PERMISSION_CACHE['ALIAS']``), shared between
+  workers when a shared backend such as Redis or Memcached is configured
+
+Both tiers are keyed on a version number that is bumped whenever a role is
+saved or deleted, which invalidates every cached entry at once. Each worker
+keeps its copy of the version for ``LOCAL_TIMEOUT`` seconds, like its local
+entries, so a check that hits the LRU makes no cache round trip; other
+workers pick up a bump within that time. With the default per-process
+LocMemCache other workers cannot see the bump, so they serve their copy for
+at most ``ROLE_PERMISSION_CACHE['TIMEOUT']`` seconds.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from insurance.models import RoleType
+
+VERSION_KEY = 'role_permissions:version'
+
+DEFAULTS = {
+    'ALIAS': 'default',
+    'TIMEOUT': 60,
+    'LOCAL_TIMEOUT': 30,
+    'LOCAL_MAXSIZE': 256,
+}
+
+_MISSING = object()
+
+_local = OrderedDict()
+_local_lock = threading.Lock()
+_local_version = 0
+# (expires at, version) last read from the shared cache
+_shared_version = None
+
+
+def _option(name):
+    return getattr(settings, 'ROLE_PERMISSION_CACHE', {}).get(name, DEFAULTS[name])
+
+
+def _shared_cache():
+    alias = _option('ALIAS')
+    return caches[alias] if alias else None
+
+
+def _current_version():
+    global _shared_version
+
+    shared = _shared_cache()
+    if shared is None:
+        return _local_version
+
+    now = time.monotonic()
+    with _local_lock:
+        if _shared_version is not None and _shared_version[0] > now:
+            return _shared_version[1]
+    version = shared.get(VERSION_KEY, 0)
+    with _local_lock:
+        _shared_version = (now + _option('LOCAL_TIMEOUT'), version)
+    return version
+
+
+def _load(role_name):
+    """Permissions of the active role ``role_name``, or None if there is none."""
+    rows = list(
+        RoleType.objects.filter(role_name=role_name, role_status='ACTIVE')
+        .values_list('permissions', flat=True)[:1]
+    )
+    if not rows:
+        return None
+    return rows[0] or {}
+
+
+def get_role_permissions(role_name):
+    """
+    Permission dict of an active role, served from the cache when possible.
+
+    Args:
+        role_name: RoleType.role_name (the user's ``user_role``)
+
+    Returns:
+        dict: The role's permissions, or None if no active role has that name
+    """
+    version = _current_version()
+    key = (version, role_name)
+    now = time.monotonic()
+
+    with _local_lock:
+        entry = _local.get(key)
+        if entry is not None and entry[0] > now:
+            _local.move_to_end(key)
+            return entry[1]
+
+    shared = _shared_cache()
+    permissions = _MISSING
+    if shared is not None:
+        shared_key = f'role_permissions:{version}:{role_name}'
+        permissions = shared.get(shared_key, _MISSING)
+    if permissions is _MISSING:
+        permissions = _load(role_name)
+        if shared is not None:
+            shared.set(shared_key, permissions, _option('TIMEOUT'))
+
+    with _local_lock:
+        _local[key] = (now + _option('LOCAL_TIMEOUT'), permissions)
+        _local.move_to_end(key)
+        while len(_local) > _option('LOCAL_MAXSIZE'):
+            _local.popitem(last=False)
+
+    return permissions
+
+
+def invalidate_role_permissions():
+    """Drop every cached role by moving to a new version."""
+    global _local_version, _shared_version
+
+    shared = _shared_cache()
+    if shared is not None:
+        try:
+            shared.incr(VERSION_KEY)
+        except ValueError:
+            # First bump, or the key was evicted
+            if not shared.add(VERSION_KEY, 1, timeout=None):
+                shared.incr(VERSION_KEY)
+
+    with _local_lock:
+        _local_version += 1
+        _shared_version = None
+        _local.clear()
+
+
+def role_changed(sender, **kwargs):
+    """post_save / post_delete receiver for RoleType."""
+    # Bump once the change is visible, so no request re-caches the old row
+    transaction.on_commit(invalidate_role_permissions)
@@ -2,7 +2,7 @@
 Role-based permission classes for the insurance application
 """
 from rest_framework import permissions
-from insurance.models import RoleType
+from insurance.permissions.cache import get_role_permissions
 
 
 class RoleBasedPermission(permissions.BasePermission):
@@ -30,13 +30,8 @@ class RoleBasedPermission(permissions.BasePermission):
             return True
         
         # Get user's role permissions
-        try:
-            role = RoleType.objects.get(
-                role_name=request.user.user_role,
-                role_status='ACTIVE'
-            )
-            permissions_dict = role.permissions or {}
-        except RoleType.DoesNotExist:
+        permissions_dict = get_role_permissions(request.user.user_role)
+        if permissions_dict is None:
             return False
         
         # Check for "all" permission (full access)
@@ -79,27 +74,22 @@ class CanManageUsers(permissions.BasePermission):
             return hasattr(request.user, 'user_role') and request.user.user_role in ['ADMIN', 'MANAGER']
         
         # For write operations, check role permissions
-        try:
-            role = RoleType.objects.get(
-                role_name=request.user.user_role,
-                role_status='ACTIVE'
-            )
-            permissions_dict = role.permissions or {}
-            
-            action_map = {
-                'GET': 'read',
-                'POST': 'create',
-                'PUT': 'update',
-                'PATCH': 'update',
-                'DELETE': 'delete',
-            }
-            
-            required_action = action_map.get(request.method, 'read')
-            user_permissions = permissions_dict.get('users', [])
-            
-            return required_action in user_permissions
-        except RoleType.DoesNotExist:
+        permissions_dict = get_role_permissions(request.user.user_role)
+        if permissions_dict is None:
             return False
+        
+        action_map = {
+            'GET': 'read',
+            'POST': 'create',
+            'PUT': 'update',
+            'PATCH': 'update',
+            'DELETE': 'delete',
+        }
+        
+        required_action = action_map.get(request.method, 'read')
+        user_permissions = permissions_dict.get('users', [])
+        
+        return required_action in user_permissions
 
 
 class CanManageRoles(permissions.BasePermission):
@@ -120,27 +110,22 @@ class CanManageRoles(permissions.BasePermission):
             return hasattr(request.user, 'user_role') and request.user.user_role in ['ADMIN']
         
         # For write operations, check role permissions
-        try:
-            role = RoleType.objects.get(
-                role_name=request.user.user_role,
-                role_status='ACTIVE'
-            )
-            permissions_dict = role.permissions or {}
-            
-            action_map = {
-                'GET': 'read',
-                'POST': 'create',
-                'PUT': 'update',
-                'PATCH': 'update',
-                'DELETE': 'delete',
-            }
-            
-            required_action = action_map.get(request.method, 'read')
-            role_permissions = permissions_dict.get('roles', [])
-            
-            return required_action in role_permissions
-        except RoleType.DoesNotExist:
+        permissions_dict = get_role_permissions(request.user.user_role)
+        if permissions_dict is None:
             return False
+        
+        action_map = {
+            'GET': 'read',
+            'POST': 'create',
+            'PUT': 'update',
+            'PATCH': 'update',
+            'DELETE': 'delete',
+        }
+        
+        required_action = action_map.get(request.method, 'read')
+        role_permissions = permissions_dict.get('roles', [])
+        
+        return required_action in role_permissions
 
 
 def has_permission_for(user, resource, action):
@@ -161,17 +146,12 @@ def has_permission_for(user, resource, action):
     if hasattr(user, 'user_role') and user.user_role == 'SUPERUSER':
         return True
     
-    try:
-        role = RoleType.objects.get(
-            role_name=user.user_role,
-            role_status='ACTIVE'
-        )
-        permissions_dict = role.permissions or {}
-        
-        if permissions_dict.get('all'):
-            return True
-        
-        resource_permissions = permissions_dict.get(resource, [])
-        return action in resource_permissions
-    except RoleType.DoesNotExist:
-        return False
\ No newline at end of file
+    permissions_dict = get_role_permissions(user.user_role)
+    if permissions_dict is None:
+        return False
+    
+    if permissions_dict.get('all'):
+        return True
+    
+    resource_permissions = permissions_dict.get(resource, [])
+    return action in resource_permissions
\ No newline at end of file
@@ -0,0 +1,132 @@
+"""
+Response renderers.
+
+``ORJSONRenderer`` is the default JSON renderer. It encodes with the optional
+``orjson`` package and produces the same JSON as DRF's ``JSONRenderer``,
+which it falls back to when orjson is not installed.
+
+Field agents sync over 2G/3G, where the keys repeated in every record of a
+JSON list make up a large part of each response, so clients can also ask
+for a compact format:
+
+- ``application/vnd.insurance.columnar+json`` (``?format=columnar``): plain
+  JSON in which the record lists (a list body, a page's ``results``, the
+  sync ``server_updates`` per entity) become ``{"columns": [...],
+  "rows": [[...], ...]}``, so each key is sent once per list
+- ``application/msgpack`` (``?format=msgpack``): MessagePack, only offered
+  when the optional ``msgpack`` package is installed
+
+Responses in any format are gzip-compressed by ``GZipMiddleware`` when the
+client sends ``Accept-Encoding: gzip``.
+"""
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _table(records):
+    """
+    Columnar layout of a list of records, or the list unchanged.
+
+    Columns are the union of the records' keys in first-seen order; a record
+    without one of them gets null in that column. Field values are passed
+    through as they are. Empty lists and lists holding anything other than
+    objects are left as lists.
+    """
+    if not records or not all(isinstance(record, dict) for record in records):
+        return records
+    columns = list(dict.fromkeys(key for record in records for key in record))
+    return {
+        'columns': columns,
+        'rows': [[record.get(column) for column in columns] for record in records],
+    }
+
+
+def to_columnar(data):
+    """
+    Convert the record lists of a response body to the columnar layout.
+
+    Only a list body, a page's ``results`` and the per-entity lists of the
+    sync ``server_updates`` are converted, so a field value (JSONField
+    content, error details) never is.
+    """
+    if isinstance(data, (list, tuple)):
+        return _table(data)
+    if not isinstance(data, dict):
+        return data
+    converted = dict(data)
+    if isinstance(converted.get('results'), (list, tuple)):
+        converted['results'] = _table(converted['results'])
+    if isinstance(converted.get('server_updates'), dict):
+        converted['server_updates'] = {
+            entity: _table(records) if isinstance(records, (list, tuple)) else records
+            for entity, records in converted['server_updates'].items()
+        }
+    return converted
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer encoding with orjson.
+
+    Types orjson does not encode the way DRF does (Decimal, dates and times,
+    lazy strings...) are passed to DRF's ``JSONEncoder``, so the output is
+    the same as ``JSONRenderer``'s. Indented output (browsable API,
+    ``; indent=`` in Accept) and data orjson rejects, such as integers over
+    64 bits, are rendered by ``JSONRenderer``.
+    """
+    _encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self._encoder.default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Escaped like JSONRenderer does, for JSON embedded in JavaScript
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class ColumnarJSONRenderer(ORJSONRenderer):
+    """JSON with lists of objects sent as a keys header plus row arrays."""
+    media_type = 'application/vnd.insurance.columnar+json'
+    format = 'columnar'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return super().render(to_columnar(data), accepted_media_type, renderer_context)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    MessagePack encoding of the response data.
+
+    Values MessagePack has no type for (dates, decimals, UUIDs...) are
+    converted the way the JSON renderer converts them.
+    """
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=JSONEncoder().default, use_bin_type=True)
@@ -35,6 +35,9 @@ from .financial import SubsidySerializer, InvoiceSerializer
 # Advisory serializers
 from .advisory import AdvisorySerializer, WeatherDataSerializer
 
+# Upload serializers
+from .upload import UploadSessionSerializer
+
 __all__ = [
     # Auth
     'LoginSerializer',
@@ -83,4 +86,7 @@ __all__ = [
     # Advisory
     'AdvisorySerializer',
     'WeatherDataSerializer',
+
+    # Uploads
+    'UploadSessionSerializer',
 ]
\ No newline at end of file
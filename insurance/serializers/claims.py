@@ -4,6 +4,7 @@ from django.utils import timezone
 import json
 import logging
 from insurance.models import Claim, ClaimAssignment, LossAssessor, Farmer, Quotation
+from insurance.serializers.mixins import EagerLoadingMixin
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +21,7 @@ class LossAssessorSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class ClaimSerializer(serializers.ModelSerializer):
+class ClaimSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     farmer_name = serializers.SerializerMethodField()
     policy_number = serializers.CharField(
         source='quotation.policy_number',
@@ -34,6 +35,12 @@ class ClaimSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ('claim_id', 'claim_date', 'approval_date', 'claim_number')
 
+    select_related_fields = {
+        'farmer_name': 'farmer',
+        'policy_number': 'quotation',
+        'assessor_name': 'loss_assessor__user',
+    }
+
     def get_farmer_name(self, obj):
         """Return full farmer name"""
         if obj.farmer:
@@ -124,7 +131,7 @@ class ClaimSerializer(serializers.ModelSerializer):
         # Validate farmer matches quotation's farmer
         farmer = data.get('farmer')
         if farmer and quotation:
-            if farmer.farmer_id != quotation.farmer.farmer_id:
+            if farmer.farmer_id != quotation.farmer_id:
                 raise serializers.ValidationError({
                     'farmer': 'Selected farmer must match the quotation\'s farmer'
                 })
@@ -172,7 +179,7 @@ class ClaimSerializer(serializers.ModelSerializer):
         data = super().to_representation(instance)
 
         # Ensure loss_details is always a dict, never null
-        if data.get('loss_details') is None:
+        if 'loss_details' in self.fields and data.get('loss_details') is None:
             data['loss_details'] = {}
 
         return data
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from insurance.models import Farmer, Farm, NextOfKin, BankAccount
+from insurance.serializers.mixins import EagerLoadingMixin
 
 
 class NextOfKinSerializer(serializers.ModelSerializer):
@@ -20,7 +21,7 @@ class FarmSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class FarmerSerializer(serializers.ModelSerializer):
+class FarmerSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     organisation_name = serializers.CharField(
         source='organisation.organisation_name',
         read_only=True
@@ -32,4 +33,14 @@ class FarmerSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Farmer
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+
+    select_related_fields = {
+        'organisation_name': 'organisation',
+        'country_name': 'country',
+    }
+    prefetch_related_fields = {
+        'farms': 'farms',
+        'bank_accounts': 'bank_accounts',
+        'next_of_kin': 'next_of_kin',
+    }
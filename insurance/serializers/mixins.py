@@ -0,0 +1,182 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+
+class EagerLoadingMixin:
+    """
+    Declares which relations a serializer reads while rendering.
+
+    ``select_related_fields`` and ``prefetch_related_fields`` map output field
+    names to the relation path (or tuple of paths) that field needs. Views
+    call ``setup_eager_loading`` on their queryset so a page of objects costs
+    a fixed number of queries instead of one or more per row.
+    """
+    select_related_fields = {}
+    prefetch_related_fields = {}
+
+    @staticmethod
+    def _relation_paths(declared, fields=None):
+        paths = []
+        for name, relations in declared.items():
+            if fields is not None and name not in fields:
+                continue
+            if isinstance(relations, (str, Prefetch)):
+                relations = (relations,)
+            paths.extend(relations)
+        return list(dict.fromkeys(paths))
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, fields=None):
+        """
+        Apply the declared select/prefetch_related calls to ``queryset``.
+
+        Args:
+            queryset: Queryset of the serializer's model
+            fields: Output field names that will be rendered (default: all)
+        """
+        select = cls._relation_paths(cls.select_related_fields, fields)
+        prefetch = cls._relation_paths(cls.prefetch_related_fields, fields)
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset
+
+
+def _forward_hops(model, attrs):
+    """Leading ``attrs`` that are forward foreign keys / one-to-ones."""
+    hops = []
+    for attr in attrs:
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            break
+        if not (field.concrete and (field.many_to_one or field.one_to_one)):
+            break
+        hops.append(attr)
+        model = field.related_model
+    return hops
+
+
+def serializer_for_model(model):
+    """The first serializer exported by ``insurance.serializers`` for ``model``."""
+    from insurance import serializers as exported
+
+    for name in exported.__all__:
+        candidate = getattr(exported, name)
+        if (
+            isinstance(candidate, type)
+            and issubclass(candidate, serializers.ModelSerializer)
+            and getattr(candidate.Meta, 'model', None) is model
+        ):
+            return candidate
+    return None
+
+
+def expanded_field(serializer, name):
+    """
+    Nested read-only serializer replacing the primary key field ``name``.
+
+    Returns None when ``name`` is not a single foreign key or there is no
+    serializer for the related model.
+    """
+    field = serializer.fields.get(name)
+    if not isinstance(field, serializers.PrimaryKeyRelatedField):
+        return None
+    try:
+        model_field = serializer.Meta.model._meta.get_field(field.source)
+    except FieldDoesNotExist:
+        return None
+    if not (model_field.many_to_one or model_field.one_to_one):
+        return None
+
+    serializer_class = serializer_for_model(model_field.related_model)
+    if serializer_class is None:
+        return None
+    if field.source == name:
+        return serializer_class(read_only=True)
+    return serializer_class(source=field.source, read_only=True)
+
+
+def field_requirements(serializer, prefix=''):
+    """
+    Work out what the readable fields of ``serializer`` need from the database.
+
+    Declared ``select_related_fields``/``prefetch_related_fields`` are used
+    as given; other relations are traced from each field's ``source``.
+
+    Args:
+        serializer: Bound ModelSerializer, already trimmed to the fields to render
+        prefix: Lookup prefix when ``serializer`` is nested under a relation
+
+    Returns:
+        tuple: (select_related paths, prefetch_related lookups, columns) where
+        columns is the set of model fields to load with ``only()``, or None if
+        some field reads data that cannot be traced to a column (such as an
+        undeclared SerializerMethodField)
+    """
+    opts = serializer.Meta.model._meta
+    declared_select = getattr(serializer, 'select_related_fields', {})
+    declared_prefetch = getattr(serializer, 'prefetch_related_fields', {})
+
+    select, prefetch = [], []
+    columns = {opts.pk.name}
+    traceable = True
+
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+
+        if name in declared_select or name in declared_prefetch:
+            for path in EagerLoadingMixin._relation_paths(declared_select, [name]):
+                select.append(prefix + path)
+                columns.add(path.split('__')[0])
+            for lookup in EagerLoadingMixin._relation_paths(declared_prefetch, [name]):
+                path = lookup.prefetch_through if isinstance(lookup, Prefetch) else lookup
+                prefetch.append(lookup if not prefix and isinstance(lookup, Prefetch) else prefix + path)
+                first = path.split('__')[0]
+                if _forward_hops(serializer.Meta.model, [first]):
+                    columns.add(first)
+            continue
+
+        if field.source == '*' or isinstance(field, serializers.SerializerMethodField):
+            traceable = False
+            continue
+
+        attrs = field.source_attrs
+        try:
+            model_field = opts.get_field(attrs[0])
+        except FieldDoesNotExist:
+            traceable = False
+            continue
+        if model_field.concrete:
+            columns.add(attrs[0])
+
+        if isinstance(field, serializers.BaseSerializer):
+            many = isinstance(field, serializers.ListSerializer)
+            nested = field.child if many else field
+            path = prefix + '__'.join(attrs)
+            nested_select, nested_prefetch = [], []
+            if isinstance(nested, serializers.ModelSerializer):
+                nested_select, nested_prefetch, _ = field_requirements(nested, path + '__')
+            if not many and len(_forward_hops(serializer.Meta.model, attrs)) == len(attrs):
+                select.append(path)
+                select.extend(nested_select)
+                prefetch.extend(nested_prefetch)
+            else:
+                prefetch.append(path)
+                prefetch.extend(nested_select + nested_prefetch)
+            continue
+
+        if isinstance(field, serializers.ManyRelatedField):
+            prefetch.append(prefix + attrs[0])
+            continue
+
+        hops = _forward_hops(serializer.Meta.model, attrs[:-1])
+        if hops:
+            select.append(prefix + '__'.join(hops))
+
+    select = list(dict.fromkeys(select))
+    prefetch = list(dict.fromkeys(prefetch))
+    return select, prefetch, columns if traceable else None
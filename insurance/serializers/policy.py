@@ -1,9 +1,10 @@
 from rest_framework import serializers
 from django.utils import timezone
 from insurance.models import Quotation
+from insurance.serializers.mixins import EagerLoadingMixin
 
 
-class QuotationSerializer(serializers.ModelSerializer):
+class QuotationSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     farmer_name = serializers.SerializerMethodField()
     farm_name = serializers.CharField(source='farm.farm_name', read_only=True)
     product_name = serializers.CharField(
@@ -29,6 +30,12 @@ class QuotationSerializer(serializers.ModelSerializer):
         model = Quotation
         fields = '__all__'
 
+    select_related_fields = {
+        'farmer_name': 'farmer',
+        'farm_name': 'farm',
+        'product_name': 'insurance_product',
+    }
+
     def get_farmer_name(self, obj):
         """Return full farmer name"""
         return f"{obj.farmer.first_name} {obj.farmer.last_name}"
@@ -0,0 +1,37 @@
+from rest_framework import serializers
+
+from insurance.models import Claim, UploadSession
+from insurance.models.inspection import Inspection
+from insurance.utils.uploads import MAX_UPLOAD_SIZE
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    # Photo targets, scoped to the uploading user's organisation
+    TARGET_QUERYSETS = {
+        UploadSession.CLAIM: (Claim.objects, 'farmer__organisation_id'),
+        UploadSession.INSPECTION: (Inspection.objects, 'farm__farmer__organisation_id'),
+    }
+
+    class Meta:
+        model = UploadSession
+        exclude = ('user',)
+        read_only_fields = (
+            'upload_id', 'received_size', 'content_type', 'status',
+            'photo_id', 'date_time_added', 'expires_at',
+        )
+
+    def validate_file_size(self, value):
+        if value < 1 or value > MAX_UPLOAD_SIZE:
+            raise serializers.ValidationError(
+                f'File size must be between 1 and {MAX_UPLOAD_SIZE} bytes'
+            )
+        return value
+
+    def validate(self, data):
+        manager, organisation_lookup = self.TARGET_QUERYSETS[data['target']]
+        user = self.context['request'].user
+        if not manager.filter(
+            pk=data['object_id'], **{organisation_lookup: user.organisation_id}
+        ).exists():
+            raise serializers.ValidationError({'object_id': f'{data["target"].title()} not found'})
+        return data
@@ -0,0 +1,46 @@
+"""
+Signal wiring for the insurance app.
+
+Receivers are connected per model in ``InsuranceConfig.ready`` rather than
+globally, so models without listeners keep Django's fast-delete path.
+"""
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save
+
+from insurance.models.counters import CounterLedgerMixin, record_ledger_delete
+from insurance.models.sync import SyncChangeMixin, record_sync_delete
+from insurance.models.versions import bump_table_version
+from insurance.models.user import RoleType, User
+from insurance.permissions.cache import role_changed
+
+
+def connect_signals():
+    for model in apps.get_app_config('insurance').get_models():
+        if issubclass(model, CounterLedgerMixin):
+            post_delete.connect(
+                record_ledger_delete,
+                sender=model,
+                dispatch_uid=f'ledger_delete_{model._meta.label_lower}',
+            )
+        if issubclass(model, SyncChangeMixin):
+            post_delete.connect(
+                record_sync_delete,
+                sender=model,
+                dispatch_uid=f'sync_delete_{model._meta.label_lower}',
+            )
+
+    # Tables bundled in the reference-data endpoint carry a change version
+    from insurance.utils.reference import REFERENCE_MODELS
+    for model in REFERENCE_MODELS:
+        label = model._meta.label_lower
+        post_save.connect(bump_table_version, sender=model, dispatch_uid=f'version_save_{label}')
+        post_delete.connect(bump_table_version, sender=model, dispatch_uid=f'version_delete_{label}')
+
+    # Cached role permissions are dropped whenever a role changes
+    post_save.connect(role_changed, sender=RoleType, dispatch_uid='role_permissions_save')
+    post_delete.connect(role_changed, sender=RoleType, dispatch_uid='role_permissions_delete')
+
+    # Account state cached by the stateless JWT authentication
+    from insurance.authentication import account_state_changed
+    post_save.connect(account_state_changed, sender=User, dispatch_uid='account_state_save')
+    post_delete.connect(account_state_changed, sender=User, dispatch_uid='account_state_delete')
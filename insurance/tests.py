@@ -1,3 +1,615 @@
+import io
+import os
+import shutil
+import tempfile
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from insurance.models import (
+    Claim, Country, CoverType, Crop, Farm, Farmer, InsuranceProduct,
+    Organization, OrganizationType, ProductCategory, Quotation, Season,
+    StatusCounter, SyncChange, SyncOperation, UploadSession, User,
+)
+from insurance.models.inspection import ClaimPhoto
+from insurance.models.counters import update_with_ledger
+from insurance.utils import sync
+
+
+class OrganisationTestCase(TestCase):
+    """Two organisations, a product and a farmer with a farm and a written policy."""
+
+    @classmethod
+    def setUpTestData(cls):
+        country = Country.objects.create(country='Kenya', country_code='KE')
+        organisation_type = OrganizationType.objects.create(organisation_type='Insurer')
+        cls.organisation, cls.other_organisation = [
+            Organization.objects.create(
+                country=country, organisation_type=organisation_type,
+                organisation_code=code, organisation_name=code,
+                organisation_email=f'{code.lower()}@example.com',
+                organisation_msisdn='0700000000', organisation_contact='Admin',
+            )
+            for code in ('ORG1', 'ORG2')
+        ]
+        cls.user = User.objects.create_user(
+            'agent@example.com', 'agent', 'agent-password',
+            organisation=cls.organisation, user_role='SUPERUSER',
+        )
+
+        crop = Crop.objects.create(organisation=cls.organisation, crop='Maize')
+        season = Season.objects.create(organisation=cls.organisation, season='Long rains')
+        category = ProductCategory.objects.create(
+            cover_type=CoverType.objects.create(cover_type='Multi-peril'),
+            organisation=cls.organisation, product_category='Crop',
+        )
+        cls.product = InsuranceProduct.objects.create(
+            organisation=cls.organisation, product_category=category, season=season,
+            crop=crop, product_name='Maize cover',
+            average_premium_rate=Decimal('5'), sum_insured=Decimal('1000'),
+        )
+
+        cls.farmer = Farmer.objects.create(
+            organisation=cls.organisation, first_name='Jane', last_name='Doe',
+            id_number='1001', phone_number='0711000000', gender='F',
+        )
+        cls.other_farmer = Farmer.objects.create(
+            organisation=cls.other_organisation, first_name='John', last_name='Roe',
+            id_number='2001', phone_number='0722000000', gender='M',
+        )
+        cls.farm = Farm.objects.create(
+            farmer=cls.farmer, farm_name='Shamba', farm_size=2, unit_of_measure='ha',
+        )
+        cls.quotation = Quotation.objects.create(
+            farmer=cls.farmer, farm=cls.farm, insurance_product=cls.product,
+            premium_amount=Decimal('50'), sum_insured=Decimal('1000'),
+            status='WRITTEN', policy_number='POL-1',
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+
+class CounterLedgerTests(OrganisationTestCase):
+    """StatusCounter follows saves, deletes, bulk updates and organisation moves."""
+
+    def ledger(self, entity, organisation):
+        return {
+            status: (row['count'], row['amount'])
+            for status, row in StatusCounter.objects.totals([entity], organisation.pk)[entity].items()
+        }
+
+    def assertLedgerInSync(self):
+        out = io.StringIO()
+        call_command('reconcile_counters', dry_run=True, stdout=out)
+        self.assertIn('in sync', out.getvalue())
+
+    def new_claim(self, farmer=None, quotation=None, **fields):
+        return Claim.objects.create(
+            farmer=farmer or self.farmer, quotation=quotation or self.quotation,
+            estimated_loss_amount=Decimal('100'), **fields,
+        )
+
+    def test_save_and_delete(self):
+        claim = self.new_claim(claim_number='CLM-1')
+        self.assertEqual(self.ledger('claim', self.organisation), {'OPEN': (1, Decimal('100'))})
+
+        claim.status = 'APPROVED'
+        claim.estimated_loss_amount = Decimal('80')
+        claim.save()
+        self.assertEqual(self.ledger('claim', self.organisation), {'APPROVED': (1, Decimal('80'))})
+
+        claim.delete()
+        self.assertEqual(self.ledger('claim', self.organisation), {})
+        self.assertLedgerInSync()
+
+    def test_update_with_ledger(self):
+        for number in range(3):
+            self.new_claim(claim_number=f'CLM-{number}')
+
+        updated = update_with_ledger(
+            Claim.objects.filter(claim_number__in=['CLM-0', 'CLM-1']), status='REJECTED'
+        )
+
+        self.assertEqual(updated, 2)
+        self.assertEqual(self.ledger('claim', self.organisation), {
+            'OPEN': (1, Decimal('100')),
+            'REJECTED': (2, Decimal('200')),
+        })
+        with self.assertRaises(ValueError):
+            update_with_ledger(Claim.objects.all(), farmer=self.other_farmer)
+        self.assertLedgerInSync()
+
+    def test_farmer_changing_organisation_moves_its_policies_and_claims(self):
+        self.new_claim(claim_number='CLM-1')
+
+        self.farmer.organisation = self.other_organisation
+        self.farmer.save()
+
+        self.assertEqual(self.ledger('farmer', self.organisation), {})
+        self.assertEqual(self.ledger('quotation', self.organisation), {})
+        self.assertEqual(self.ledger('claim', self.organisation), {})
+        self.assertEqual(self.ledger('farmer', self.other_organisation), {'ACTIVE': (2, Decimal('0'))})
+        self.assertEqual(self.ledger('quotation', self.other_organisation), {'WRITTEN': (1, Decimal('50'))})
+        self.assertEqual(self.ledger('claim', self.other_organisation), {'OPEN': (1, Decimal('100'))})
+        self.assertLedgerInSync()
+
+
+class AccountTokenTests(OrganisationTestCase):
+    """Stateless JWTs stop working when the account changes."""
+
+    def setUp(self):
+        super().setUp()
+        response = APIClient().post('/api/v1/auth/login/', {
+            'username': 'agent@example.com', 'password': 'agent-password',
+        }, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.token_client = APIClient()
+        self.token_client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.json()['token']}")
+        self.refresh = response.json()['refresh']
+
+    def get(self):
+        return self.token_client.get('/api/v1/countries/')
+
+    def test_token_is_accepted_without_reading_the_user(self):
+        self.assertEqual(self.get().status_code, 200)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.get().status_code, 200)
+        self.assertFalse([query for query in queries if '"users"' in query['sql']])
+
+    def test_password_change_revokes_tokens(self):
+        self.user.set_password('new-agent-password')
+        self.user.save()
+
+        self.assertEqual(self.get().status_code, 401)
+        response = APIClient().post('/api/v1/auth/token/refresh/', {'refresh': self.refresh}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+    def test_inactive_account_is_rejected(self):
+        self.user.user_status = 'INACTIVE'
+        self.user.save()
+
+        self.assertEqual(self.get().status_code, 401)
+
+    def test_locked_account_is_rejected(self):
+        self.assertEqual(self.get().status_code, 200)
+        self.user.locked_till_date_time = timezone.now() + timedelta(minutes=5)
+        self.user.save()
+
+        self.assertEqual(self.get().status_code, 401)
+
+
+class LoginLockoutTests(OrganisationTestCase):
+    """Failed logins lock the account per the organisation's policy."""
+
+    def setUp(self):
+        super().setUp()
+        Organization.objects.filter(pk=self.organisation.pk).update(
+            failed_login_threshold=3, failed_login_backoff=10,
+        )
+
+    def login(self, username='agent@example.com', password='agent-password'):
+        return APIClient().post(
+            '/api/v1/auth/login/', {'username': username, 'password': password}, format='json'
+        )
+
+    def test_threshold_locks_for_the_backoff_period(self):
+        for _ in range(2):
+            self.assertEqual(self.login(password='wrong').status_code, 401)
+        started = timezone.now()
+        response = self.login(password='wrong')
+
+        self.assertEqual(response.status_code, 403)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.failed_logins, 0)
+        self.assertAlmostEqual(
+            self.user.locked_till_date_time, started + timedelta(minutes=10),
+            delta=timedelta(seconds=5),
+        )
+        with mock.patch('insurance.views.auth.check_password') as check_password:
+            self.assertEqual(self.login().status_code, 403)
+        check_password.assert_not_called()
+
+    def test_login_after_the_lock_expires_clears_it(self):
+        User.objects.filter(pk=self.user.pk).update(
+            failed_logins=2, locked_till_date_time=timezone.now() - timedelta(minutes=1),
+        )
+
+        self.assertEqual(self.login().status_code, 200)
+        self.user.refresh_from_db()
+        self.assertEqual((self.user.failed_logins, self.user.locked_till_date_time), (0, None))
+
+    def test_success_resets_the_count(self):
+        self.assertEqual(self.login(password='wrong').status_code, 401)
+        self.assertEqual(self.login().status_code, 200)
+        for _ in range(2):
+            self.assertEqual(self.login(password='wrong').status_code, 401)
+
+    def test_unknown_usernames_are_locked_too(self):
+        statuses = [self.login(username='ghost', password='wrong').status_code for _ in range(5)]
+
+        self.assertEqual(statuses, [401, 401, 401, 401, 403])
+        self.assertEqual(self.login(username='ghost').status_code, 403)
+
+
+class ReferenceDataTests(OrganisationTestCase):
+    """Conditional GET of the reference-data bundle."""
+
+    def setUp(self):
+        super().setUp()
+        # Bundles are cached under their ETag, which restarts with each test
+        cache.clear()
+
+    def test_etag_answers_304_until_a_table_changes(self):
+        response = self.client.get('/api/v1/reference_data/')
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertEqual([crop['crop'] for crop in response.json()['crops']], ['Maize'])
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/v1/reference_data/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        Crop.objects.create(organisation=self.organisation, crop='Beans')
+        response = self.client.get('/api/v1/reference_data/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual([crop['crop'] for crop in response.json()['crops']], ['Maize', 'Beans'])
+
+
+class SyncPullTests(OrganisationTestCase):
+    """Sync downloads driven by the SyncChange log."""
+
+    def pull(self, **body):
+        response = self.client.post('/api/v1/sync/', body, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    @staticmethod
+    def ids(updates, key):
+        return [row[key] for row in updates]
+
+    def test_first_pull_returns_everything_and_the_next_nothing(self):
+        first = self.pull(last_sync_sequence=0)
+
+        self.assertEqual(self.ids(first['server_updates']['farmers'], 'farmer_id'), [self.farmer.pk])
+        self.assertEqual(self.ids(first['server_updates']['farms'], 'farm_id'), [self.farm.pk])
+        self.assertEqual(
+            self.ids(first['server_updates']['quotations'], 'quotation_id'), [self.quotation.pk]
+        )
+        self.assertIsNone(first['continuation'])
+
+        second = self.pull(last_sync_sequence=first['sync_sequence'])
+        self.assertFalse(any(second['server_updates'].values()))
+        self.assertFalse(any(second['deleted'].values()))
+        self.assertEqual(second['sync_sequence'], first['sync_sequence'])
+
+    def test_delta_pull_returns_changes_and_tombstones(self):
+        since = self.pull(last_sync_sequence=0)['sync_sequence']
+        self.quotation.status = 'CANCELLED'
+        self.quotation.save()
+        self.quotation.save()
+        farm = Farm.objects.create(
+            farmer=self.farmer, farm_name='Plot', farm_size=1, unit_of_measure='ha',
+        )
+        farm_id = farm.pk
+        farm.delete()
+        self.other_farmer.last_name = 'Moved'
+        self.other_farmer.save()
+
+        delta = self.pull(last_sync_sequence=since)
+
+        self.assertEqual(
+            self.ids(delta['server_updates']['quotations'], 'quotation_id'), [self.quotation.pk]
+        )
+        self.assertEqual(delta['server_updates']['farms'], [])
+        self.assertEqual(delta['deleted']['farms'], [farm_id])
+        self.assertEqual(delta['server_updates']['farmers'], [])
+        self.assertGreater(delta['sync_sequence'], since)
+
+    def test_chunks_resume_from_the_continuation_token(self):
+        for number in range(4):
+            Farm.objects.create(
+                farmer=self.farmer, farm_name=f'Plot {number}', farm_size=1, unit_of_measure='ha',
+            )
+        full = self.pull(last_sync_sequence=0)
+
+        chunks = [self.pull(last_sync_sequence=0, max_rows=2)]
+        while chunks[-1]['continuation']:
+            chunks.append(self.pull(continuation=chunks[-1]['continuation'], max_rows=2))
+
+        self.assertEqual(len(chunks), 4)
+        for entity, rows in full['server_updates'].items():
+            self.assertEqual([row for chunk in chunks for row in chunk['server_updates'][entity]], rows)
+        self.assertEqual({chunk['sync_sequence'] for chunk in chunks}, {full['sync_sequence']})
+        # A repeated token returns the same chunk
+        self.assertEqual(
+            self.pull(continuation=chunks[1]['continuation'], max_rows=2)['server_updates'],
+            chunks[2]['server_updates'],
+        )
+
+    def test_continuation_token_is_bound_to_its_user(self):
+        token = self.pull(last_sync_sequence=0, max_rows=1)['continuation']
+        other = APIClient()
+        other.force_authenticate(User.objects.create_user(
+            'other@example.com', 'other', 'other-password', organisation=self.organisation,
+        ))
+
+        response = other.post('/api/v1/sync/', {'continuation': token}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_farmer_changing_organisation_leaves_tombstones(self):
+        since = self.pull(last_sync_sequence=0)['sync_sequence']
+        new_changes = SyncChange.objects.filter(organisation=self.other_organisation).count()
+
+        self.farmer.organisation = self.other_organisation
+        self.farmer.save()
+
+        delta = self.pull(last_sync_sequence=since)
+        self.assertEqual(delta['deleted']['farmers'], [self.farmer.pk])
+        self.assertEqual(delta['deleted']['farms'], [self.farm.pk])
+        self.assertEqual(delta['deleted']['quotations'], [self.quotation.pk])
+        moved = SyncChange.objects.filter(
+            organisation=self.other_organisation
+        ).order_by('sequence')[new_changes:]
+        self.assertEqual(
+            sorted((change.entity, change.operation) for change in moved),
+            [
+                ('farmers', SyncChange.UPSERT),
+                ('farms', SyncChange.UPSERT),
+                ('quotations', SyncChange.UPSERT),
+            ],
+        )
+
+
+class SyncUploadTests(OrganisationTestCase):
+    """Bulk application of sync uploads (insurance.utils.sync.upsert_entity)."""
+
+    def upload(self, pending_data):
+        response = self.client.post(
+            '/api/v1/sync/', {'pending_data': pending_data, 'max_rows': 1}, format='json'
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()['upload_results']
+
+    def new_farmer(self, id_number, **fields):
+        return {
+            'first_name': 'New', 'last_name': 'Farmer', 'id_number': id_number,
+            'phone_number': '0733000000', **fields,
+        }
+
+    def test_invalid_continuation_applies_no_uploads(self):
+        response = self.client.post('/api/v1/sync/', {
+            'pending_data': {'farmers': [self.new_farmer('6001')]},
+            'continuation': 'not-a-token',
+        }, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Farmer.objects.filter(id_number='6001').exists())
+
+    def test_creates_and_updates_by_id_or_primary_key_name(self):
+        second = Farmer.objects.create(
+            organisation=self.organisation, first_name='Amina', last_name='Ali',
+            id_number='1002', phone_number='0744000000',
+        )
+
+        result = self.upload({'farmers': [
+            self.new_farmer('3001'),
+            {'farmer_id': self.farmer.pk, 'status': 'INACTIVE'},
+            {'id': second.pk, 'phone_number': '0755000000'},
+        ]})['farmers']
+
+        self.assertEqual((result['created'], result['updated'], result['errors']), (1, 2, []))
+        created = Farmer.objects.get(pk=result['created_ids'][0])
+        self.assertEqual(created.id_number, '3001')
+        self.assertEqual(created.organisation_id, self.organisation.pk)
+        self.farmer.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(self.farmer.status, 'INACTIVE')
+        self.assertEqual(second.phone_number, '0755000000')
+
+    def test_rejects_foreign_keys_of_another_organisation(self):
+        result = self.upload({'farms': [
+            {'farmer': self.other_farmer.pk, 'farm_name': 'Foreign', 'farm_size': 1, 'unit_of_measure': 'ha'},
+            {'farmer': self.farmer.pk, 'farm_name': 'Own', 'farm_size': 1, 'unit_of_measure': 'ha'},
+        ]})['farms']
+
+        self.assertEqual(result['created'], 1)
+        self.assertEqual([error['index'] for error in result['errors']], [0])
+        self.assertFalse(Farm.objects.filter(farm_name='Foreign').exists())
+
+    def test_rejects_records_of_another_organisation(self):
+        result = self.upload({'farmers': [{'id': self.other_farmer.pk, 'status': 'INACTIVE'}]})['farmers']
+
+        self.assertEqual(result['updated'], 0)
+        self.assertEqual(result['errors'][0]['error'], 'Record not found on server')
+
+    def test_reports_duplicate_unique_values_within_a_batch(self):
+        result = self.upload({'farmers': [
+            self.new_farmer('4001'),
+            self.new_farmer('4001'),
+            self.new_farmer(self.farmer.id_number),
+        ]})['farmers']
+
+        self.assertEqual(result['created'], 1)
+        self.assertEqual([error['index'] for error in result['errors']], [1, 2])
+        self.assertEqual(Farmer.objects.filter(id_number='4001').count(), 1)
+
+    def test_bulk_upload_keeps_ledger_and_change_log_in_step(self):
+        leaving = Farmer.objects.create(
+            organisation=self.organisation, first_name='Peter', last_name='Otieno',
+            id_number='1003', phone_number='0766000000', gender='M',
+        )
+        changes_before = SyncChange.objects.filter(organisation=self.organisation).count()
+
+        results = self.upload({
+            'farmers': [self.new_farmer(f'5{index:03d}', gender='F') for index in range(50)]
+            + [{'id': leaving.pk, 'status': 'INACTIVE'}],
+            'farms': [
+                {'farmer': self.farmer.pk, 'farm_name': f'Plot {index}', 'farm_size': '1.5', 'unit_of_measure': 'ha'}
+                for index in range(20)
+            ],
+            'quotations': [{
+                'farmer': self.farmer.pk, 'farm': self.farm.pk, 'insurance_product': self.product.pk,
+                'premium_amount': '25', 'sum_insured': '500', 'status': 'WRITTEN',
+            }],
+            'claims': [
+                {'farmer': self.farmer.pk, 'quotation': self.quotation.pk, 'estimated_loss_amount': '10'}
+                for _ in range(3)
+            ],
+        })
+
+        for entity, result in results.items():
+            self.assertEqual(result['errors'], [], entity)
+        out = io.StringIO()
+        call_command('reconcile_counters', dry_run=True, stdout=out)
+        self.assertIn('in sync', out.getvalue())
+        # One change per created or updated row: 51 farmers, 20 farms, 1 quotation, 3 claims
+        self.assertEqual(
+            SyncChange.objects.filter(organisation=self.organisation).count() - changes_before, 75
+        )
+        quotation = Quotation.objects.get(pk=results['quotations']['created_ids'][0])
+        self.assertEqual(quotation.policy_number.split('-')[-1], str(quotation.pk))
+        numbers = Claim.objects.filter(pk__in=results['claims']['created_ids']).values_list('claim_number', flat=True)
+        self.assertEqual(len(set(numbers)), 3)
+
+    def test_replayed_operations_return_the_stored_result(self):
+        create, update = str(uuid.uuid4()), str(uuid.uuid4())
+        first = self.upload({'farmers': [
+            {'operation_id': create, **self.new_farmer('7001')},
+            {'operation_id': update, 'id': self.farmer.pk, 'status': 'INACTIVE'},
+        ]})['farmers']
+        farmers = Farmer.objects.count()
+        changes = SyncChange.objects.count()
+
+        replay = self.upload({'farmers': [
+            {'operation_id': create, **self.new_farmer('7002')},
+            {'operation_id': update, 'id': self.farmer.pk, 'status': 'ACTIVE'},
+        ]})['farmers']
+
+        self.assertEqual((replay['created'], replay['updated'], replay['errors']), (0, 0, []))
+        self.assertEqual(
+            [(operation['id'], operation['action'], operation['replayed']) for operation in replay['operations']],
+            [(operation['id'], operation['action'], True) for operation in first['operations']],
+        )
+        self.assertEqual(Farmer.objects.count(), farmers)
+        self.assertEqual(SyncChange.objects.count(), changes)
+        self.assertEqual(SyncOperation.objects.count(), 2)
+        self.farmer.refresh_from_db()
+        self.assertEqual(self.farmer.status, 'INACTIVE')
+
+    def test_claim_numbers_taken_concurrently_are_retried(self):
+        number_claims = sync._number_claims
+        attempts = []
+
+        def number_then_clash(claims):
+            number_claims(claims)
+            attempts.append([claim.claim_number for claim in claims])
+            if len(attempts) == 1:
+                # Another upload commits the same number first
+                Claim.objects.create(
+                    farmer=self.farmer, quotation=self.quotation,
+                    claim_number=claims[0].claim_number, estimated_loss_amount=Decimal('1'),
+                )
+
+        with mock.patch.object(sync, '_number_claims', side_effect=number_then_clash):
+            result = self.upload({'claims': [
+                {'farmer': self.farmer.pk, 'quotation': self.quotation.pk, 'estimated_loss_amount': '10'}
+                for _ in range(2)
+            ]})['claims']
+
+        self.assertEqual((result['created'], result['errors']), (2, []))
+        self.assertEqual(len(attempts), 2)
+        self.assertEqual(
+            sorted(Claim.objects.filter(pk__in=result['created_ids']).values_list('claim_number', flat=True)),
+            attempts[1],
+        )
+
+
+class UploadSessionTests(OrganisationTestCase):
+    """Resumable photo uploads (insurance.views.upload.UploadSessionViewSet)."""
+
+    body = b'\xff\xd8\xff' + bytes(range(256)) * 40
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.parts = os.path.join(directory, 'parts')
+        settings = self.settings(MEDIA_ROOT=directory, UPLOAD_SESSION_ROOT=self.parts)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        claim = Claim.objects.create(
+            farmer=self.farmer, quotation=self.quotation, claim_number='CLM-1',
+            estimated_loss_amount=Decimal('100'),
+        )
+        response = self.client.post('/api/v1/upload_sessions/', {
+            'target': 'claim', 'object_id': claim.pk, 'file_size': len(self.body),
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        self.session_url = f"/api/v1/upload_sessions/{response.json()['upload_id']}/"
+
+    def put(self, start, end=None):
+        return self.client.generic(
+            'PUT', self.session_url + 'chunk/', self.body[start:end],
+            content_type='application/octet-stream', HTTP_UPLOAD_OFFSET=str(start),
+        )
+
+    def finalize(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(self.session_url + 'finalize/')
+
+    def test_offset_past_the_received_size_conflicts(self):
+        self.assertEqual(self.put(0, 1000).status_code, 200)
+
+        response = self.put(2000)
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['received_size'], 1000)
+        self.assertEqual(self.client.get(self.session_url).json()['received_size'], 1000)
+
+    def test_resent_bytes_are_accepted_and_the_upload_completes(self):
+        self.assertEqual(self.put(0, 1000).status_code, 200)
+        self.assertEqual(self.finalize().status_code, 400)
+
+        # The client lost the response and resends from an earlier offset
+        self.assertEqual(self.put(500, 3000).json()['received_size'], 3000)
+        self.assertEqual(self.put(3000).json()['received_size'], len(self.body))
+
+        response = self.finalize()
+        self.assertEqual(response.status_code, 201, response.content)
+        photo = ClaimPhoto.objects.get(pk=response.json()['photo_id'])
+        with photo.photo.open('rb') as stored:
+            self.assertEqual(stored.read(), self.body)
+        self.assertEqual(os.listdir(self.parts), [])
+
+    def test_finalize_is_idempotent(self):
+        self.put(0)
+        first = self.finalize()
+        second = self.finalize()
+
+        self.assertEqual((first.status_code, second.status_code), (201, 200))
+        self.assertEqual(first.json()['photo_id'], second.json()['photo_id'])
+        self.assertEqual(ClaimPhoto.objects.count(), 1)
+        self.assertEqual(self.put(0).status_code, 409)
+
+    def test_expired_sessions_are_purged(self):
+        self.put(0)
+        self.finalize()
+        UploadSession.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        call_command('purge_upload_sessions', stdout=io.StringIO())
 
-# Create your tests here.
+        self.assertFalse(UploadSession.objects.exists())
+        self.assertEqual(ClaimPhoto.objects.count(), 1)
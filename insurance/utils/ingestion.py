@@ -0,0 +1,333 @@
+"""
+Bulk ingestion of weather readings from station feeds.
+
+Input is read as JSON lines or CSV, one reading per line, and processed in
+chunks so memory stays flat regardless of the feed size. Each chunk is
+validated column by column (every value of ``location``, then every value of
+``value``, ...) instead of running a serializer per row, and the valid rows
+are written with COPY on PostgreSQL or ``bulk_create`` elsewhere. Invalid
+rows are reported with their row number and skipped; they never abort the
+rest of the batch.
+"""
+import csv
+import io
+import json
+from decimal import Decimal, InvalidOperation
+
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from insurance.models import WeatherData, WeatherRollup
+
+INGEST_FORMATS = ('ndjson', 'csv')
+
+DEFAULT_CHUNK_SIZE = 5000
+
+# Largest chunk accepted from clients; a chunk is held in memory while it
+# is validated
+MAX_CHUNK_SIZE = 20000
+
+# Only the first errors are returned; the failed count is always exact
+MAX_REPORTED_ERRORS = 1000
+
+INGEST_COLUMNS = (
+    'location', 'data_type', 'value', 'recorded_at',
+    'start_date', 'end_date', 'status',
+)
+
+# WeatherData.value is DECIMAL(10, 2)
+MAX_VALUE = Decimal('99999999.99')
+TWO_PLACES = Decimal('0.01')
+
+
+def detect_format(hint):
+    """
+    Work out the input format from a format name, content type or filename.
+
+    Returns:
+        str: 'ndjson' or 'csv', or None if the hint is not recognised
+    """
+    hint = (hint or '').lower().split(';')[0].strip()
+    if hint in INGEST_FORMATS:
+        return hint
+    if hint in ('text/csv', 'application/csv') or hint.endswith('.csv'):
+        return 'csv'
+    if hint in (
+        'application/x-ndjson', 'application/ndjson', 'application/jsonl',
+        'application/x-jsonlines', 'jsonl',
+    ) or hint.endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    return None
+
+
+def _decoded(lines):
+    for line in lines:
+        yield line.decode('utf-8-sig') if isinstance(line, bytes) else line
+
+
+def iter_records(lines, ingest_format):
+    """
+    Yield (row_number, record) pairs from an iterable of lines.
+
+    ``record`` is a dict of raw values, or an error message when the line
+    itself could not be parsed. Row numbers are 1-based and exclude the CSV
+    header and blank NDJSON lines.
+    """
+    lines = _decoded(lines)
+
+    if ingest_format == 'csv':
+        reader = csv.DictReader(lines)
+        for row_number, row in enumerate(reader, start=1):
+            if None in row:
+                yield row_number, 'Row has more fields than the header'
+            else:
+                yield row_number, row
+        return
+
+    row_number = 0
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        row_number += 1
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield row_number, 'Invalid JSON'
+            continue
+        if not isinstance(record, dict):
+            yield row_number, 'Each line must be a JSON object'
+        else:
+            yield row_number, record
+
+
+def _text(value):
+    if value is None:
+        return ''
+    return str(value).strip()
+
+
+def _clean_location(values):
+    cleaned, errors = [], {}
+    for index, value in enumerate(values):
+        value = _text(value)
+        if not value:
+            errors[index] = 'This field is required.'
+        elif len(value) > 200:
+            errors[index] = 'Ensure this field has no more than 200 characters.'
+        cleaned.append(value)
+    return cleaned, errors
+
+
+def _clean_data_type(values):
+    allowed = {choice for choice, _ in WeatherData.DATA_TYPE_CHOICES}
+    cleaned, errors = [], {}
+    for index, value in enumerate(values):
+        value = _text(value).upper()
+        if value not in allowed:
+            errors[index] = f'Must be one of {", ".join(sorted(allowed))}.'
+        cleaned.append(value)
+    return cleaned, errors
+
+
+def _clean_value(values):
+    cleaned, errors = [], {}
+    for index, value in enumerate(values):
+        try:
+            value = Decimal(_text(value)).quantize(TWO_PLACES)
+        except (InvalidOperation, ValueError):
+            errors[index] = 'A valid number is required.'
+            value = None
+        else:
+            if not value.is_finite() or abs(value) > MAX_VALUE:
+                errors[index] = 'Ensure the value has no more than 8 digits before the decimal point.'
+        cleaned.append(value)
+    return cleaned, errors
+
+
+def _clean_datetime(values):
+    cleaned, errors = [], {}
+    parsed_cache = {}
+    for index, value in enumerate(values):
+        value = _text(value)
+        if value not in parsed_cache:
+            try:
+                parsed = parse_datetime(value) if value else None
+            except ValueError:
+                parsed = None
+            if parsed is not None and timezone.is_naive(parsed):
+                parsed = timezone.make_aware(parsed)
+            parsed_cache[value] = parsed
+        parsed = parsed_cache[value]
+        if parsed is None:
+            errors[index] = 'A valid ISO 8601 datetime is required.'
+        cleaned.append(parsed)
+    return cleaned, errors
+
+
+def _clean_optional_date(values):
+    cleaned, errors = [], {}
+    for index, value in enumerate(values):
+        value = _text(value)
+        parsed = None
+        if value:
+            try:
+                parsed = parse_date(value)
+            except ValueError:
+                parsed = None
+            if parsed is None:
+                errors[index] = 'Date has wrong format. Use YYYY-MM-DD.'
+        cleaned.append(parsed)
+    return cleaned, errors
+
+
+def _clean_status(values):
+    cleaned, errors = [], {}
+    for index, value in enumerate(values):
+        value = _text(value) or 'ACTIVE'
+        if len(value) > 20:
+            errors[index] = 'Ensure this field has no more than 20 characters.'
+        cleaned.append(value)
+    return cleaned, errors
+
+
+COLUMN_CLEANERS = {
+    'location': _clean_location,
+    'data_type': _clean_data_type,
+    'value': _clean_value,
+    'recorded_at': _clean_datetime,
+    'start_date': _clean_optional_date,
+    'end_date': _clean_optional_date,
+    'status': _clean_status,
+}
+
+
+def validate_chunk(records):
+    """
+    Validate a chunk of raw records one column at a time.
+
+    Args:
+        records: List of (row_number, dict) pairs
+
+    Returns:
+        tuple: (list of WeatherData instances, {row_number: {field: message}})
+    """
+    columns = {
+        name: [record.get(name) for _, record in records]
+        for name in INGEST_COLUMNS
+    }
+
+    cleaned = {}
+    errors = {}
+    for name, cleaner in COLUMN_CLEANERS.items():
+        cleaned[name], column_errors = cleaner(columns[name])
+        for index, message in column_errors.items():
+            errors.setdefault(index, {})[name] = message
+
+    for index, (start, end) in enumerate(zip(cleaned['start_date'], cleaned['end_date'])):
+        if start and end and start > end:
+            errors.setdefault(index, {})['non_field_errors'] = 'End date must be after start date'
+
+    now = timezone.now()
+    readings = [
+        WeatherData(
+            date_time_added=now,
+            **{name: cleaned[name][index] for name in INGEST_COLUMNS}
+        )
+        for index in range(len(records))
+        if index not in errors
+    ]
+    row_errors = {records[index][0]: fields for index, fields in errors.items()}
+    return readings, row_errors
+
+
+def _copy_readings(readings):
+    """Load readings with PostgreSQL COPY, much faster than multi-row INSERTs."""
+    columns = INGEST_COLUMNS + ('date_time_added',)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for reading in readings:
+        writer.writerow([
+            '' if getattr(reading, name) is None else getattr(reading, name)
+            for name in columns
+        ])
+    buffer.seek(0)
+
+    sql = (
+        f'COPY {WeatherData._meta.db_table} ({", ".join(columns)}) '
+        f'FROM STDIN WITH (FORMAT csv)'
+    )
+    with connection.cursor() as cursor:
+        if hasattr(cursor.cursor, 'copy_expert'):
+            # psycopg2
+            cursor.copy_expert(sql, buffer)
+        else:
+            # psycopg 3
+            with cursor.cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+
+
+def _insert_readings(readings):
+    if connection.vendor == 'postgresql':
+        _copy_readings(readings)
+    else:
+        WeatherData.objects.bulk_create(readings, batch_size=1000)
+
+
+def ingest_weather(lines, ingest_format, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Validate and insert weather readings from NDJSON or CSV lines.
+
+    Each chunk is inserted, together with its WeatherRollup update, in its
+    own transaction, so a large feed is never held in one long transaction.
+    Input that is not valid UTF-8 stops the ingest: the rows read before it
+    are still inserted and ``error`` is set in the result.
+
+    Args:
+        lines: Iterable of str or bytes lines (a file, request stream, ...)
+        ingest_format: 'ndjson' or 'csv'
+        chunk_size: Number of rows validated and inserted at a time
+
+    Returns:
+        dict: received, created and failed counts, the first errors and,
+            if the input could not be decoded, ``error``
+    """
+    if ingest_format not in INGEST_FORMATS:
+        raise ValueError(f'ingest_format must be one of {", ".join(INGEST_FORMATS)}')
+
+    result = {'received': 0, 'created': 0, 'failed': 0, 'errors': []}
+
+    def report(row_number, message):
+        result['failed'] += 1
+        if len(result['errors']) < MAX_REPORTED_ERRORS:
+            result['errors'].append({'row': row_number, 'errors': message})
+
+    def flush(chunk):
+        readings, row_errors = validate_chunk(chunk)
+        for row_number, fields in sorted(row_errors.items()):
+            report(row_number, fields)
+        if readings:
+            with transaction.atomic():
+                _insert_readings(readings)
+                WeatherRollup.objects.add_readings(readings)
+            result['created'] += len(readings)
+
+    chunk = []
+    try:
+        for row_number, record in iter_records(lines, ingest_format):
+            result['received'] += 1
+            if isinstance(record, str):
+                report(row_number, {'non_field_errors': record})
+                continue
+            chunk.append((row_number, record))
+            if len(chunk) >= chunk_size:
+                flush(chunk)
+                chunk = []
+    except UnicodeDecodeError:
+        result['error'] = 'Input must be UTF-8 encoded'
+    if chunk:
+        flush(chunk)
+
+    result['errors_truncated'] = result['failed'] > len(result['errors'])
+    return result
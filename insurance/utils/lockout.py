@@ -0,0 +1,132 @@
+"""
+Failed-login throttling and account lockout.
+
+Failures on a known account are counted in its ``failed_logins`` column by
+a single conditional UPDATE, which also sets ``locked_till_date_time`` and
+restarts the count once the organisation's ``failed_login_threshold`` is
+reached. The count is shared by every worker and replica, and is reset by
+a successful login or a lock. The login view checks the lock before running
+the password hasher, so a locked account costs no hashing at all.
+
+Attempts on unknown usernames are counted per identifier with the default
+thresholds in the ``LOGIN_THROTTLE_CACHE`` cache (the shared cache; see
+CACHES in settings) and are rejected the same way once locked. Redis counts
+them atomically; with the database cache, concurrent increments can lose a
+count, but counters and locks are still shared and survive restarts.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from insurance.authentication import forget_account_state
+from insurance.models import Organization, User
+
+DEFAULT_THRESHOLD = Organization._meta.get_field('failed_login_threshold').default
+DEFAULT_BACKOFF = Organization._meta.get_field('failed_login_backoff').default
+
+
+def _policy(user):
+    """(threshold, backoff timedelta) for ``user``'s organisation."""
+    if user is None:
+        return DEFAULT_THRESHOLD, timedelta(minutes=DEFAULT_BACKOFF)
+    organisation = user.organisation
+    return (
+        organisation.failed_login_threshold,
+        timedelta(minutes=max(organisation.failed_login_backoff, 0)),
+    )
+
+
+def _cache():
+    return caches[getattr(settings, 'LOGIN_THROTTLE_CACHE', 'default')]
+
+
+def _counter_key(identifier):
+    return f'login_failures:name:{identifier.strip().lower()}'
+
+
+def _lock_key(identifier):
+    return f'login_locked:name:{identifier.strip().lower()}'
+
+
+def locked_until(user, identifier):
+    """
+    End of the current lock, or None if login attempts are allowed.
+
+    Args:
+        user: Resolved User (with organisation loaded), or None if unknown
+        identifier: The username or email that was submitted
+    """
+    now = timezone.now()
+    if user is None:
+        until = _cache().get(_lock_key(identifier))
+    else:
+        until = user.locked_till_date_time
+    if until and until > now:
+        return until
+    return None
+
+
+def _increment(key, timeout):
+    cache = _cache()
+    try:
+        return cache.incr(key)
+    except ValueError:
+        if cache.add(key, 1, timeout):
+            return 1
+        return cache.incr(key)
+
+
+def record_failure(user, identifier):
+    """
+    Count a failed attempt and lock the account once the threshold is hit.
+
+    Returns:
+        datetime: End of the lock if this attempt caused one, else None
+    """
+    threshold, backoff = _policy(user)
+    if threshold <= 0:
+        return None
+
+    until = timezone.now() + backoff
+    if user is None:
+        key = _counter_key(identifier)
+        # Failures older than one backoff period are forgotten
+        timeout = int(backoff.total_seconds()) or None
+        if _increment(key, timeout) < threshold:
+            return None
+        _cache().delete(key)
+        _cache().set(_lock_key(identifier), until, timeout)
+        return until
+
+    # One statement, so concurrent failures are all counted
+    User.objects.filter(pk=user.pk).update(
+        failed_logins=Case(
+            When(failed_logins__gte=threshold - 1, then=Value(0)),
+            default=F('failed_logins') + 1,
+        ),
+        locked_till_date_time=Case(
+            When(failed_logins__gte=threshold - 1, then=Value(until)),
+            default=F('locked_till_date_time'),
+        ),
+    )
+    stored = User.objects.filter(pk=user.pk).values_list('locked_till_date_time', flat=True).first()
+    if stored != until:
+        return None
+    forget_account_state(user.pk)
+    return until
+
+
+def clear_failures(user, update_fields):
+    """
+    Reset the failure count after a successful login.
+
+    Stale lock columns are cleared on the instance and added to
+    ``update_fields`` so they are written by the login's single save.
+    """
+    if user.failed_logins or user.locked_till_date_time:
+        user.failed_logins = 0
+        user.locked_till_date_time = None
+        update_fields.extend(['failed_logins', 'locked_till_date_time'])
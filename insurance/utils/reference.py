@@ -0,0 +1,89 @@
+"""
+Versioned reference-data bundle.
+
+The bundle is every lookup table the frontends load on start-up, rendered
+with the same serializers as the individual endpoints. Its ETag is derived
+from ``TableVersion`` counters, which signals bump on every save/delete of
+the bundled models. A conditional request is therefore answered from the
+small ``table_versions`` table alone, and a rendered bundle can be cached
+indefinitely under its ETag.
+"""
+import hashlib
+
+from django.core.cache import cache
+
+from insurance.models import (
+    Country, OrganizationType, Organization, Crop, CropVariety, Season,
+    CoverType, ProductCategory, InsuranceProduct, RoleType, TableVersion,
+)
+from insurance.serializers import (
+    CountrySerializer, OrganizationTypeSerializer, OrganizationSerializer,
+    CropSerializer, CropVarietySerializer, SeasonSerializer,
+    CoverTypeSerializer, ProductCategorySerializer, InsuranceProductSerializer,
+    RoleTypeSerializer,
+)
+from insurance.serializers.mixins import field_requirements
+
+# Bump when the bundle's shape changes so clients cannot keep a stale copy
+BUNDLE_FORMAT = 1
+
+BUNDLE_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Bundle key -> (model, queryset filter, serializer, fields left out)
+REFERENCE_TABLES = {
+    'countries': (Country, {'country_is_deleted': False}, CountrySerializer, ()),
+    'organisation_types': (OrganizationType, {}, OrganizationTypeSerializer, ()),
+    'organisations': (Organization, {'organisation_is_deleted': False}, OrganizationSerializer, ()),
+    'crops': (Crop, {'deleted': False}, CropSerializer, ()),
+    'crop_varieties': (CropVariety, {'deleted': False}, CropVarietySerializer, ()),
+    'seasons': (Season, {'deleted': False}, SeasonSerializer, ()),
+    'cover_types': (CoverType, {'deleted': False}, CoverTypeSerializer, ()),
+    'product_categories': (ProductCategory, {'deleted': False}, ProductCategorySerializer, ()),
+    'insurance_products': (InsuranceProduct, {'status': 'ACTIVE'}, InsuranceProductSerializer, ()),
+    # user_count depends on the users table, which changes too often to bundle
+    'roles': (RoleType, {'role_status': 'ACTIVE'}, RoleTypeSerializer, ('user_count',)),
+}
+
+REFERENCE_MODELS = [model for model, _, _, _ in REFERENCE_TABLES.values()]
+
+
+def reference_etag():
+    """Strong ETag for the current bundle (one query on table_versions)."""
+    versions = TableVersion.objects.versions(
+        sorted(model._meta.db_table for model in REFERENCE_MODELS)
+    )
+    state = ';'.join(f'{table}={version}' for table, version in sorted(versions.items()))
+    digest = hashlib.sha1(f'{BUNDLE_FORMAT}:{state}'.encode()).hexdigest()
+    return f'"ref-{digest}"'
+
+
+def _serialize_table(model, filters, serializer_class, omit):
+    serializer = serializer_class(many=True)
+    for name in omit:
+        serializer.child.fields.pop(name)
+
+    select, prefetch, _ = field_requirements(serializer.child)
+    queryset = model.objects.filter(**filters).select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    queryset = queryset.order_by(model._meta.pk.name)
+
+    serializer.instance = queryset
+    return list(serializer.data)
+
+
+def reference_bundle(etag):
+    """
+    The bundle for ``etag``, rendered once and then served from the cache.
+
+    Returns:
+        dict: {'version': etag, <table key>: [rows], ...}
+    """
+    cache_key = f'reference_data:{etag}'
+    bundle = cache.get(cache_key)
+    if bundle is None:
+        bundle = {'version': etag}
+        for key, table in REFERENCE_TABLES.items():
+            bundle[key] = _serialize_table(*table)
+        cache.set(cache_key, bundle, BUNDLE_CACHE_TIMEOUT)
+    return bundle
@@ -0,0 +1,416 @@
+"""
+Aggregation helpers for the statistics endpoints.
+
+Lifetime totals are read from the ``StatusCounter`` ledger. Anything the
+ledger cannot answer (date windows, ad-hoc filters) is computed with
+conditional aggregation (``COUNT``/``SUM`` with a ``FILTER`` clause) so each
+table is read at most once per call.
+"""
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db.models import Count, DateField, Q, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from insurance.models import Farmer, Quotation, Claim, StatusCounter
+
+
+def parse_date_range(params):
+    """
+    Read the optional ``start_date``/``end_date`` query parameters.
+
+    Args:
+        params: Request query parameters
+
+    Returns:
+        tuple: (start_date, end_date) as dates, either of which may be None
+
+    Raises:
+        ValueError: If a supplied value is not a YYYY-MM-DD date
+    """
+    dates = []
+    for name in ('start_date', 'end_date'):
+        value = params.get(name)
+        if not value:
+            dates.append(None)
+            continue
+        try:
+            parsed = parse_date(value)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise ValueError(f'{name} must be a date in YYYY-MM-DD format')
+        dates.append(parsed)
+
+    start_date, end_date = dates
+    if start_date and end_date and start_date > end_date:
+        raise ValueError('end_date must be on or after start_date')
+    return start_date, end_date
+
+
+def date_range_q(field, start_date=None, end_date=None):
+    """
+    Build a Q object limiting a datetime field to whole local days.
+
+    Both bounds are inclusive. The bounds are converted to aware datetimes so
+    the filter can use an index on ``field`` instead of a ``__date`` cast.
+    """
+    q = Q()
+    if start_date:
+        start = timezone.make_aware(datetime.combine(start_date, time.min))
+        q &= Q(**{f'{field}__gte': start})
+    if end_date:
+        end = timezone.make_aware(
+            datetime.combine(end_date + timedelta(days=1), time.min)
+        )
+        q &= Q(**{f'{field}__lt': end})
+    return q
+
+
+TREND_BUCKETS = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+# Number of buckets returned when no start_date is given
+DEFAULT_TREND_LENGTH = {
+    'day': 30,
+    'week': 12,
+    'month': 12,
+}
+
+MAX_TREND_POINTS = 366
+
+
+def bucket_start(value, bucket):
+    """Return the first day of the bucket containing ``value``."""
+    if bucket == 'week':
+        return value - timedelta(days=value.weekday())
+    if bucket == 'month':
+        return value.replace(day=1)
+    return value
+
+
+def next_bucket(value, bucket):
+    """Return the first day of the bucket after the one starting at ``value``."""
+    if bucket == 'week':
+        return value + timedelta(days=7)
+    if bucket == 'month':
+        return (value.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return value + timedelta(days=1)
+
+
+def trend_periods(bucket, start_date=None, end_date=None):
+    """
+    List the bucket start dates covering ``start_date``..``end_date``.
+
+    Without ``end_date`` the window ends today; without ``start_date`` it
+    spans ``DEFAULT_TREND_LENGTH`` buckets.
+
+    Raises:
+        ValueError: If the bucket is unknown or the window is too long
+    """
+    if bucket not in TREND_BUCKETS:
+        raise ValueError(
+            f'bucket must be one of: {", ".join(TREND_BUCKETS)}'
+        )
+
+    last = bucket_start(end_date or timezone.localdate(), bucket)
+    if start_date:
+        first = bucket_start(start_date, bucket)
+    else:
+        first = last
+        for _ in range(DEFAULT_TREND_LENGTH[bucket] - 1):
+            first = bucket_start(first - timedelta(days=1), bucket)
+
+    periods = []
+    current = first
+    while current <= last:
+        periods.append(current)
+        if len(periods) > MAX_TREND_POINTS:
+            raise ValueError(
+                f'Date range is too long for {bucket} buckets '
+                f'(max {MAX_TREND_POINTS} points)'
+            )
+        current = next_bucket(current, bucket)
+    return periods
+
+
+def time_series(queryset, field, bucket, aggregates, start_date=None, end_date=None):
+    """
+    Aggregate ``queryset`` into gap-filled time buckets with one grouped query.
+
+    Args:
+        queryset: Rows to aggregate
+        field: Datetime field to bucket on
+        bucket: 'day', 'week' or 'month'
+        aggregates: {output name: aggregate expression}
+        start_date: Optional first day of the window
+        end_date: Optional last day of the window
+
+    Returns:
+        list: One dict per bucket with ``period`` and every aggregate; empty
+        buckets are filled with zeros
+
+    Raises:
+        ValueError: If the bucket is unknown or the window is too long
+    """
+    periods = trend_periods(bucket, start_date, end_date)
+    window = date_range_q(field, periods[0], next_bucket(periods[-1], bucket) - timedelta(days=1))
+
+    rows = queryset.filter(window).annotate(
+        period=TREND_BUCKETS[bucket](field, output_field=DateField())
+    ).values('period').annotate(**aggregates).order_by('period')
+    by_period = {row['period']: row for row in rows}
+
+    series = []
+    for period in periods:
+        row = by_period.get(period, {})
+        point = {'period': period.isoformat()}
+        for name in aggregates:
+            value = row.get(name) or 0
+            point[name] = value if isinstance(value, int) else float(value)
+        series.append(point)
+    return series
+
+
+# Ageing buckets in days: (label, older than, at most)
+AGEING_BUCKETS = [
+    ('0_30', 0, 30),
+    ('31_60', 30, 60),
+    ('61_90', 60, 90),
+    ('over_90', 90, None),
+]
+
+# Status -> field the age of an open invoice is measured from
+INVOICE_AGEING_FIELDS = {
+    'PENDING': 'date_time_added',
+    'APPROVED': 'approved_date',
+}
+
+
+def _ageing_q(now, older_than, at_most):
+    q = Q()
+    for status, field in INVOICE_AGEING_FIELDS.items():
+        bucket = Q(status=status, **{f'{field}__lte': now - timedelta(days=older_than)})
+        if at_most is not None:
+            bucket &= Q(**{f'{field}__gt': now - timedelta(days=at_most)})
+        q |= bucket
+    return q
+
+
+def invoice_summary(queryset):
+    """
+    Summarise invoices per status, organisation and subsidy in one query.
+
+    Rows are grouped by (status, organisation, subsidy) with the ageing
+    buckets computed as conditional aggregates, then rolled up in Python.
+
+    Args:
+        queryset: Invoices to summarise
+
+    Returns:
+        dict: Totals, by_status, by_organisation, by_subsidy and ageing
+    """
+    now = timezone.now()
+    ageing = {}
+    for label, older_than, at_most in AGEING_BUCKETS:
+        bucket_q = _ageing_q(now, older_than, at_most)
+        ageing[f'age_{label}_count'] = Count('invoice_id', filter=bucket_q)
+        ageing[f'age_{label}_amount'] = Sum('amount', filter=bucket_q)
+
+    rows = queryset.order_by().values(
+        'status',
+        'organisation_id',
+        'organisation__organisation_name',
+        'subsidy_id',
+        'subsidy__subsidy_name',
+    ).annotate(
+        invoice_count=Count('invoice_id'),
+        total_amount=Sum('amount'),
+        **ageing
+    )
+
+    def empty():
+        return {'count': 0, 'amount': 0.0, 'by_status': {}}
+
+    def add(target, row):
+        amount = float(row['total_amount'] or 0)
+        target['count'] += row['invoice_count']
+        target['amount'] += amount
+        status_totals = target['by_status'].setdefault(
+            row['status'], {'count': 0, 'amount': 0.0}
+        )
+        status_totals['count'] += row['invoice_count']
+        status_totals['amount'] += amount
+
+    totals = empty()
+    organisations = {}
+    subsidies = {}
+    ageing_totals = {
+        status: {label: {'count': 0, 'amount': 0.0} for label, _, _ in AGEING_BUCKETS}
+        for status in INVOICE_AGEING_FIELDS
+    }
+
+    for row in rows:
+        add(totals, row)
+
+        organisation = organisations.setdefault(row['organisation_id'], {
+            'organisation_id': row['organisation_id'],
+            'organisation_name': row['organisation__organisation_name'],
+            **empty()
+        })
+        add(organisation, row)
+
+        subsidy = subsidies.setdefault(row['subsidy_id'], {
+            'subsidy_id': row['subsidy_id'],
+            'subsidy_name': row['subsidy__subsidy_name'],
+            **empty()
+        })
+        add(subsidy, row)
+
+        if row['status'] in ageing_totals:
+            for label, _, _ in AGEING_BUCKETS:
+                bucket = ageing_totals[row['status']][label]
+                bucket['count'] += row[f'age_{label}_count']
+                bucket['amount'] += float(row[f'age_{label}_amount'] or 0)
+
+    return {
+        'total_invoices': totals['count'],
+        'total_amount': totals['amount'],
+        'by_status': totals['by_status'],
+        'by_organisation': sorted(
+            organisations.values(), key=lambda o: o['organisation_id']
+        ),
+        'by_subsidy': sorted(subsidies.values(), key=lambda s: s['subsidy_id']),
+        'ageing': ageing_totals,
+    }
+
+
+def ledger_count(statuses, status=None):
+    """Total count from a ``StatusCounter.objects.totals()`` entry."""
+    if status is not None:
+        return statuses.get(status, {}).get('count', 0)
+    return sum(row['count'] for row in statuses.values())
+
+
+def ledger_sum(statuses, column, status=None):
+    """Total of an amount column from a ``StatusCounter.objects.totals()`` entry."""
+    if status is not None:
+        return statuses.get(status, {}).get(column, Decimal('0'))
+    return sum((row[column] for row in statuses.values()), Decimal('0'))
+
+
+def ledger_breakdown(statuses, key='status'):
+    """``values(key).annotate(count=...)``-style list from a ledger entry."""
+    return [
+        {key: value or None, 'count': row['count']}
+        for value, row in sorted(statuses.items())
+    ]
+
+
+def dashboard_statistics(organisation_id=None, start_date=None, end_date=None):
+    """
+    Compute the dashboard figures.
+
+    Without a date window the figures come straight from the counter ledger;
+    otherwise they are aggregated with one query per table.
+
+    Args:
+        organisation_id: Optional organisation to scope the figures to
+        start_date: Optional first day (inclusive) of the reporting window
+        end_date: Optional last day (inclusive) of the reporting window
+
+    Returns:
+        dict: Farmer, quotation, claim and financial figures
+    """
+    if start_date is None and end_date is None:
+        return _dashboard_from_ledger(organisation_id)
+
+    farmer_filter = date_range_q('date_time_added', start_date, end_date)
+    quotation_filter = date_range_q('quotation_date', start_date, end_date)
+    claim_filter = date_range_q('claim_date', start_date, end_date)
+
+    if organisation_id:
+        farmer_filter &= Q(organisation_id=organisation_id)
+        quotation_filter &= Q(farmer__organisation_id=organisation_id)
+        claim_filter &= Q(farmer__organisation_id=organisation_id)
+
+    farmers = Farmer.objects.filter(farmer_filter).aggregate(
+        total=Count('farmer_id'),
+        active=Count('farmer_id', filter=Q(status='ACTIVE')),
+    )
+
+    quotations = Quotation.objects.filter(quotation_filter).aggregate(
+        total=Count('quotation_id'),
+        open=Count('quotation_id', filter=Q(status='OPEN')),
+        paid=Count('quotation_id', filter=Q(status='PAID')),
+        written=Count('quotation_id', filter=Q(status='WRITTEN')),
+        total_premium=Sum('premium_amount'),
+    )
+
+    claims = Claim.objects.filter(claim_filter).aggregate(
+        total=Count('claim_id'),
+        open=Count('claim_id', filter=Q(status='OPEN')),
+        pending_payment=Count('claim_id', filter=Q(status='PENDING_PAYMENT')),
+        paid=Count('claim_id', filter=Q(status='PAID')),
+        total_claims_value=Sum('approved_amount'),
+    )
+
+    return {
+        'farmers': {
+            'total': farmers['total'],
+            'active': farmers['active']
+        },
+        'quotations': {
+            'total': quotations['total'],
+            'open': quotations['open'],
+            'paid': quotations['paid'],
+            'written': quotations['written']
+        },
+        'claims': {
+            'total': claims['total'],
+            'open': claims['open'],
+            'pending_payment': claims['pending_payment'],
+            'paid': claims['paid']
+        },
+        'financials': {
+            'total_premium': float(quotations['total_premium'] or 0),
+            'total_claims_value': float(claims['total_claims_value'] or 0)
+        }
+    }
+
+
+def _dashboard_from_ledger(organisation_id=None):
+    totals = StatusCounter.objects.totals(
+        ['farmer', 'quotation', 'claim'], organisation_id=organisation_id
+    )
+    farmers, quotations, claims = (
+        totals['farmer'], totals['quotation'], totals['claim']
+    )
+
+    return {
+        'farmers': {
+            'total': ledger_count(farmers),
+            'active': ledger_count(farmers, 'ACTIVE')
+        },
+        'quotations': {
+            'total': ledger_count(quotations),
+            'open': ledger_count(quotations, 'OPEN'),
+            'paid': ledger_count(quotations, 'PAID'),
+            'written': ledger_count(quotations, 'WRITTEN')
+        },
+        'claims': {
+            'total': ledger_count(claims),
+            'open': ledger_count(claims, 'OPEN'),
+            'pending_payment': ledger_count(claims, 'PENDING_PAYMENT'),
+            'paid': ledger_count(claims, 'PAID')
+        },
+        'financials': {
+            'total_premium': float(ledger_sum(quotations, 'amount')),
+            'total_claims_value': float(ledger_sum(claims, 'approved_amount'))
+        }
+    }
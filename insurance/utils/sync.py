@@ -0,0 +1,553 @@
+"""
+Sync uploads and chunked, resumable sync downloads.
+
+Uploads are applied per entity in bulk: the rows being updated are loaded
+with one query, related ids are resolved with one query per relation,
+items are validated against those preloaded objects, and the results are
+written with ``bulk_create`` / ``bulk_update``. The status counter ledger
+and the sync change log, normally maintained by ``save()``, are updated
+in the same transaction.
+
+A pull is a walk over the sync entities in a fixed order and, within each
+entity, over primary keys in ascending order. Each response carries at most
+one chunk, bounded by a row budget and a byte budget, and an opaque signed
+continuation token recording where the walk stopped. The app sends the
+token back to get the next chunk, and can resend it after a dropped
+connection to get the same chunk again.
+
+The walk is pinned to the organisation's sync sequence at the time the pull
+started. A first pull walks the live tables; later pulls walk the change
+log between the client's last sequence and that pinned sequence. Anything
+that changes during the pull is numbered after the pinned sequence and is
+picked up by the next sync.
+"""
+import json
+import uuid
+from functools import partial
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import DatabaseError, IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.validators import UniqueValidator
+
+from insurance.models import Claim, Quotation, StatusCounter, SyncChange, SyncOperation
+from insurance.models.counters import CounterLedgerMixin
+
+DEFAULT_MAX_ROWS = 500
+MAX_ROWS_LIMIT = 5000
+DEFAULT_MAX_BYTES = 1024 * 1024
+MAX_BYTES_LIMIT = 8 * 1024 * 1024
+
+# Rows fetched and serialized at a time while filling a chunk
+FETCH_SIZE = 100
+
+# Rows per INSERT / UPDATE statement when applying uploads
+WRITE_BATCH_SIZE = 500
+
+# Inserts of a claims batch tried before a claim number clash is reported
+CLAIM_NUMBER_ATTEMPTS = 5
+
+CONTINUATION_SALT = 'insurance.sync.continuation'
+
+
+class InvalidContinuation(ValueError):
+    pass
+
+
+# Uploads
+
+def _preloaded_value(field, objects, pk_field, data):
+    """PrimaryKeyRelatedField.to_internal_value against preloaded objects."""
+    if isinstance(data, bool):
+        field.fail('incorrect_type', data_type=type(data).__name__)
+    try:
+        pk = pk_field.to_python(data)
+    except (TypeError, ValueError, DjangoValidationError):
+        field.fail('incorrect_type', data_type=type(data).__name__)
+    if pk not in objects:
+        field.fail('does_not_exist', pk_value=data)
+    return objects[pk]
+
+
+def _preload_relations(serializer, items, organisation_id):
+    """
+    Resolve every related id used by ``items`` with one query per relation.
+
+    Related sync entities (farmers, farms, quotations) are looked up within
+    the organisation only, so uploads cannot point at another
+    organisation's rows.
+    """
+    for name, field in serializer.fields.items():
+        if field.read_only or not isinstance(field, serializers.PrimaryKeyRelatedField):
+            continue
+        queryset = field.get_queryset()
+        related = queryset.model
+        if getattr(related, 'sync_entity', None):
+            queryset = queryset.filter(**{related.sync_organisation: organisation_id})
+
+        pk_field = related._meta.pk
+        keys = set()
+        for item in items:
+            value = item.get(name)
+            if value in (None, '') or isinstance(value, bool):
+                continue
+            try:
+                keys.add(pk_field.to_python(value))
+            except (TypeError, ValueError, DjangoValidationError):
+                continue
+        objects = queryset.in_bulk(keys) if keys else {}
+        field.to_internal_value = partial(_preloaded_value, field, objects, pk_field)
+
+
+def _take_unique_fields(serializer):
+    """Remove per-item UniqueValidators; returns {field name: model field}."""
+    unique = {}
+    for name, field in serializer.fields.items():
+        validators = [v for v in field.validators if not isinstance(v, UniqueValidator)]
+        if len(validators) != len(field.validators):
+            field.validators = validators
+            unique[name] = serializer.Meta.model._meta.get_field(field.source)
+    return unique
+
+
+def _unique_errors(model, unique_fields, valid):
+    """
+    Check unique fields for a whole batch with one query per field.
+
+    Args:
+        valid: List of (index, server id, instance or None, validated data)
+
+    Returns:
+        dict: {index: {field: [message]}}
+    """
+    errors = {}
+    for name, model_field in unique_fields.items():
+        claimed = {}
+        for index, _, instance, data in valid:
+            if model_field.name not in data:
+                continue
+            value = data[model_field.name]
+            if value in claimed:
+                errors.setdefault(index, {})[name] = [
+                    f'Duplicate {model_field.verbose_name} in this upload.'
+                ]
+            else:
+                claimed[value] = (index, instance.pk if instance else None)
+        if not claimed:
+            continue
+        taken = model._base_manager.filter(
+            **{f'{model_field.name}__in': list(claimed)}
+        ).values_list(model_field.name, 'pk')
+        for value, pk in taken:
+            index, own_pk = claimed[value]
+            if pk != own_pk:
+                errors.setdefault(index, {})[name] = [
+                    f'{model._meta.verbose_name} with this {model_field.verbose_name} already exists.'
+                ]
+    return errors
+
+
+def _prepare_claims(claims):
+    """Fill in new claims the way ClaimSerializer.create does."""
+    for claim in claims:
+        if claim.loss_details is None:
+            claim.loss_details = {}
+
+
+def _number_claims(claims):
+    """Number claims CLM-<date>-<n>, continuing from the last number issued today."""
+    prefix = f"CLM-{timezone.now().strftime('%Y%m%d')}"
+    last = Claim.objects.filter(
+        claim_number__startswith=prefix
+    ).order_by('-claim_id').values_list('claim_number', flat=True).first()
+    try:
+        number = int(last.split('-')[-1]) if last else 0
+    except (ValueError, IndexError):
+        number = 0
+    for claim in claims:
+        number += 1
+        claim.claim_number = f'{prefix}-{number:06d}'
+
+
+def _create_claims(claims):
+    """
+    Insert new claims, numbering the ones without a claim number.
+
+    A concurrent upload can take the same numbers between reading the last
+    one and inserting; the insert is then retried with fresh numbers in a
+    savepoint instead of failing the whole batch.
+    """
+    _prepare_claims(claims)
+    pending = [claim for claim in claims if not claim.claim_number]
+    for attempt in range(CLAIM_NUMBER_ATTEMPTS):
+        _number_claims(pending)
+        try:
+            with transaction.atomic():
+                Claim.objects.bulk_create(claims, batch_size=WRITE_BATCH_SIZE)
+            return
+        except IntegrityError:
+            if not pending or attempt == CLAIM_NUMBER_ATTEMPTS - 1:
+                raise
+
+
+def _assign_policy_numbers(quotations):
+    """Number newly written quotations like QuotationSerializer.create."""
+    written = [q for q in quotations if q.status == 'WRITTEN' and not q.policy_number]
+    date_str = timezone.now().strftime('%Y%m%d')
+    for quotation in written:
+        quotation.policy_number = f'POL-{date_str}-{quotation.quotation_id}'
+    if written:
+        Quotation.objects.bulk_update(written, ['policy_number'], batch_size=WRITE_BATCH_SIZE)
+
+
+def _write(model, creates, updates, update_fields):
+    """Bulk write validated rows and keep the ledger and change log in step."""
+    previous = []
+    if issubclass(model, CounterLedgerMixin):
+        previous = [instance._ledger_row() for instance, _ in updates]
+
+    for instance, data in updates:
+        for name, value in data.items():
+            setattr(instance, name, value)
+    if model is Claim:
+        _create_claims(creates)
+    else:
+        model.objects.bulk_create(creates, batch_size=WRITE_BATCH_SIZE)
+    if updates and update_fields:
+        model.objects.bulk_update(
+            [instance for instance, _ in updates], sorted(update_fields),
+            batch_size=WRITE_BATCH_SIZE,
+        )
+    if model is Quotation:
+        _assign_policy_numbers(creates)
+
+    written = creates + [instance for instance, _ in updates]
+    if issubclass(model, CounterLedgerMixin):
+        StatusCounter.objects.record(
+            model, removed=previous, added=[instance._ledger_row() for instance in written]
+        )
+    SyncChange.objects.record(model, [
+        (instance._sync_organisation_id(), instance.pk, SyncChange.UPSERT)
+        for instance in written
+    ])
+
+
+def upsert_entity(model, serializer_class, items, user):
+    """
+    Apply one entity's uploaded items in bulk.
+
+    Items with an ``id`` (or the model's primary key name) update that row,
+    the rest are created. Invalid items are reported and skipped; the valid
+    ones are written together in one savepoint, so a database error rolls
+    back this entity only.
+
+    Items may carry a client-generated ``operation_id`` (UUID). Applied
+    operations are recorded with their result in the same savepoint, and an
+    item whose operation was already applied is not written again; its
+    original result is returned with ``replayed`` set.
+
+    Returns:
+        dict: created/updated counts, ids of created rows in upload order,
+            per-operation results and per-item errors
+    """
+    result = {'created': 0, 'updated': 0, 'created_ids': [], 'operations': [], 'errors': []}
+    if not isinstance(items, list):
+        result['errors'].append({'error': 'Expected a list of records'})
+        return result
+
+    organisation_id = user.organisation_id
+    pk_field = model._meta.pk
+    scope = model.objects.filter(**{model.sync_organisation: organisation_id})
+    if '__' in model.sync_organisation:
+        scope = scope.select_related(model.sync_organisation.split('__')[0])
+
+    entries = []
+    seen_operations = set()
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            result['errors'].append({'index': index, 'error': 'Expected an object'})
+            continue
+        data = dict(item)
+        server_id = data.pop('id', None)
+        server_id = data.pop(pk_field.name, None) or server_id
+        if server_id is not None:
+            try:
+                server_id = pk_field.to_python(server_id)
+            except DjangoValidationError:
+                result['errors'].append({'index': index, 'id': server_id, 'error': 'Invalid id'})
+                continue
+        operation_id = data.pop('operation_id', None)
+        if operation_id is not None:
+            try:
+                operation_id = uuid.UUID(str(operation_id))
+            except ValueError:
+                result['errors'].append({'index': index, 'id': server_id, 'error': 'Invalid operation_id'})
+                continue
+            if operation_id in seen_operations:
+                result['errors'].append({
+                    'index': index, 'id': server_id, 'error': 'Duplicate operation_id in this upload'
+                })
+                continue
+            seen_operations.add(operation_id)
+        # Farmers always belong to the uploading user's organisation
+        if model.sync_organisation == 'organisation_id':
+            data.pop('organisation', None)
+            if server_id is None:
+                data['organisation'] = organisation_id
+        entries.append((index, server_id, operation_id, data))
+
+    # Replayed operations are answered from the log, not written again
+    applied = SyncOperation.objects.applied(user, seen_operations)
+    if applied:
+        pending = []
+        for entry in entries:
+            index, _, operation_id, _ = entry
+            if operation_id in applied:
+                result['operations'].append({
+                    'index': index, 'operation_id': str(operation_id),
+                    **applied[operation_id], 'replayed': True,
+                })
+            else:
+                pending.append(entry)
+        entries = pending
+
+    ids = {server_id for _, server_id, _, _ in entries if server_id is not None}
+    existing = scope.select_for_update(of=('self',)).in_bulk(ids) if ids else {}
+
+    serializer = serializer_class(context={'user': user})
+    _preload_relations(serializer, [data for _, _, _, data in entries], organisation_id)
+    unique_fields = _take_unique_fields(serializer)
+
+    valid = []
+    for index, server_id, operation_id, data in entries:
+        instance = None
+        if server_id is not None:
+            instance = existing.get(server_id)
+            if instance is None:
+                result['errors'].append({
+                    'index': index, 'id': server_id, 'error': 'Record not found on server'
+                })
+                continue
+        serializer.instance = instance
+        serializer.partial = instance is not None
+        try:
+            validated = serializer.run_validation(data)
+        except serializers.ValidationError as e:
+            result['errors'].append({'index': index, 'id': server_id, 'error': e.detail})
+            continue
+        valid.append((index, server_id, operation_id, instance, validated))
+
+    unique_errors = _unique_errors(model, unique_fields, [
+        (index, server_id, instance, validated)
+        for index, server_id, _, instance, validated in valid
+    ])
+    creates, updates, update_fields, operations = [], [], set(), []
+    for index, server_id, operation_id, instance, validated in valid:
+        if index in unique_errors:
+            result['errors'].append({'index': index, 'id': server_id, 'error': unique_errors[index]})
+            continue
+        if instance is None:
+            instance = model(**validated)
+            creates.append(instance)
+            action = 'created'
+        else:
+            updates.append((instance, validated))
+            update_fields.update(validated)
+            action = 'updated'
+        if operation_id is not None:
+            operations.append((index, operation_id, instance, action))
+
+    result['errors'].sort(key=lambda error: error.get('index', -1))
+    if not creates and not updates:
+        return result
+    try:
+        with transaction.atomic():
+            _write(model, creates, updates, update_fields)
+            outcomes = {
+                operation_id: {'id': instance.pk, 'action': action}
+                for _, operation_id, instance, action in operations
+            }
+            SyncOperation.objects.record(user, model.sync_entity, outcomes)
+    except DatabaseError as e:
+        # Includes a concurrent retry recording the same operation first
+        result['errors'].append({'error': f'Could not save {model._meta.verbose_name_plural}: {e}'})
+        return result
+
+    result['created'] = len(creates)
+    result['updated'] = len(updates)
+    result['created_ids'] = [instance.pk for instance in creates]
+    result['operations'].extend(
+        {'index': index, 'operation_id': str(operation_id), **outcomes[operation_id], 'replayed': False}
+        for index, operation_id, _, _ in operations
+    )
+    result['operations'].sort(key=lambda operation: operation['index'])
+    return result
+
+
+def encode_continuation(state):
+    return signing.dumps(state, salt=CONTINUATION_SALT, compress=True)
+
+
+def decode_continuation(token, user):
+    """
+    Validate a continuation token issued to ``user``.
+
+    Raises:
+        InvalidContinuation: If the token is malformed, expired, or was
+            issued to another user
+    """
+    max_age = getattr(settings, 'SYNC_CONTINUATION_MAX_AGE', 24 * 60 * 60)
+    try:
+        state = signing.loads(token, salt=CONTINUATION_SALT, max_age=max_age)
+    except signing.BadSignature:
+        raise InvalidContinuation('Invalid or expired continuation token')
+    if not isinstance(state, dict) or state.get('user') != user.pk:
+        raise InvalidContinuation('Invalid or expired continuation token')
+    return state
+
+
+def _bounded(value, default, limit):
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(value, limit))
+
+
+class SyncPull:
+    """
+    One chunk of a sync download.
+
+    Args:
+        entities: {entity: (model, serializer_class)} in walk order
+        user: The requesting user
+        since: Last sequence the client has (0 for a first sync)
+        until: Organisation sequence the pull is pinned to
+        max_rows / max_bytes: Chunk budgets (clamped to the module limits)
+    """
+
+    def __init__(self, entities, user, since, until, max_rows=None, max_bytes=None,
+                 entity_index=0, after=0):
+        self.entities = list(entities.items())
+        self.user = user
+        self.organisation_id = user.organisation_id
+        self.since = since
+        self.until = until
+        self.max_rows = _bounded(max_rows, DEFAULT_MAX_ROWS, MAX_ROWS_LIMIT)
+        self.max_bytes = _bounded(max_bytes, DEFAULT_MAX_BYTES, MAX_BYTES_LIMIT)
+        self.entity_index = entity_index
+        self.after = after
+
+    @classmethod
+    def resume(cls, entities, user, token, max_rows=None, max_bytes=None):
+        state = decode_continuation(token, user)
+        return cls(
+            entities, user,
+            since=state['since'], until=state['until'],
+            max_rows=max_rows, max_bytes=max_bytes,
+            entity_index=state['entity'], after=state['after'],
+        )
+
+    def continuation(self):
+        if self.entity_index >= len(self.entities):
+            return None
+        return encode_continuation({
+            'user': self.user.pk,
+            'since': self.since,
+            'until': self.until,
+            'entity': self.entity_index,
+            'after': self.after,
+        })
+
+    # Walk
+
+    def _base_queryset(self, model, serializer_class):
+        queryset = model.objects.filter(**{model.sync_organisation: self.organisation_id})
+        if hasattr(serializer_class, 'setup_eager_loading'):
+            queryset = serializer_class.setup_eager_loading(queryset)
+        return queryset
+
+    def _batches(self, model, serializer_class):
+        """
+        Yield (upserted instances, deleted ids) in primary key order.
+
+        Instances are fetched FETCH_SIZE at a time, never the whole entity.
+        """
+        pk_name = model._meta.pk.name
+        queryset = self._base_queryset(model, serializer_class)
+
+        if not self.since:
+            after = self.after
+            while True:
+                rows = list(
+                    queryset.filter(**{f'{pk_name}__gt': after}).order_by(pk_name)[:FETCH_SIZE]
+                )
+                if not rows:
+                    return
+                yield rows, []
+                after = rows[-1].pk
+
+        changes = SyncChange.objects.latest_since(
+            self.organisation_id, self.since, self.until
+        ).filter(entity=model.sync_entity).order_by('object_id')
+        after = self.after
+        while True:
+            batch = list(
+                changes.filter(object_id__gt=after).values_list('object_id', 'operation')[:FETCH_SIZE]
+            )
+            if not batch:
+                return
+            upserts = [object_id for object_id, operation in batch if operation == SyncChange.UPSERT]
+            deletes = [object_id for object_id, operation in batch if operation == SyncChange.DELETE]
+            rows = list(queryset.filter(pk__in=upserts).order_by(pk_name)) if upserts else []
+            # Rows deleted after the pinned sequence come back as a tombstone next sync
+            yield rows, deletes
+            after = batch[-1][0]
+
+    def chunk(self):
+        """
+        Collect the next chunk and advance the cursor past it.
+
+        Returns:
+            tuple: ({entity: [rows]}, {entity: [deleted ids]})
+        """
+        updates = {entity: [] for entity, _ in self.entities}
+        deleted = {entity: [] for entity, _ in self.entities}
+        rows_left = self.max_rows
+        bytes_left = self.max_bytes
+
+        while self.entity_index < len(self.entities):
+            entity, (model, serializer_class) = self.entities[self.entity_index]
+            for instances, deleted_ids in self._batches(model, serializer_class):
+                # Emit rows and tombstones together in primary key order so
+                # the cursor can stop between any two of them
+                items = [(instance.pk, instance) for instance in instances]
+                items += [(object_id, None) for object_id in deleted_ids]
+                items.sort(key=lambda item: item[0])
+
+                data = iter(serializer_class(instances, many=True).data)
+                for pk, instance in items:
+                    if instance is None:
+                        value, size = pk, len(str(pk)) + 1
+                    else:
+                        value = next(data)
+                        size = len(json.dumps(value, cls=JSONEncoder)) + 1
+                    # Always send at least one item so a huge row cannot stall the pull
+                    if rows_left <= 0 or (size > bytes_left and rows_left < self.max_rows):
+                        return updates, deleted
+                    if instance is None:
+                        deleted[entity].append(value)
+                    else:
+                        updates[entity].append(value)
+                    rows_left -= 1
+                    bytes_left -= size
+                    self.after = pk
+
+            self.entity_index += 1
+            self.after = 0
+
+        return updates, deleted
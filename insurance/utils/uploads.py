@@ -0,0 +1,264 @@
+"""
+Streaming validation of uploaded images, and resumable upload sessions.
+
+``ImageUploadHandler`` runs ahead of Django's ``TemporaryFileUploadHandler``
+and sees every chunk of an uploaded file as it is read from the request.
+It checks the file type from the magic bytes of the first chunk and stops
+writing once the file crosses the size limit. The file is never held in
+memory as a whole: chunks go to a temporary file, which
+``default_storage.save`` moves (or streams) to storage.
+
+Resumable uploads (``UploadSession``) write each offset-addressed chunk
+straight into a part file on local disk under ``UPLOAD_SESSION_ROOT``.
+Finalizing streams the part file to storage and creates the photo row in
+one transaction.
+"""
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile
+from django.db import transaction
+from django.http import QueryDict
+from django.utils import timezone
+from django.utils.datastructures import MultiValueDict
+
+from insurance.models import UploadSession
+from insurance.models.inspection import ClaimPhoto, InspectionPhoto
+
+MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+
+# Allowance for the multipart boundaries and form fields around the file
+FORM_OVERHEAD = 64 * 1024
+
+IMAGE_SIGNATURES = (
+    (b'\xff\xd8\xff', 'image/jpeg', '.jpg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png', '.png'),
+)
+
+SIGNATURE_LENGTH = max(len(signature) for signature, _, _ in IMAGE_SIGNATURES)
+
+# Largest chunk accepted by one request of a resumable upload
+MAX_CHUNK_SIZE = 5 * 1024 * 1024
+
+# Bytes copied per read when writing a chunk
+COPY_BUFFER_SIZE = 64 * 1024
+
+# Photo model and foreign key of each upload session target
+SESSION_TARGETS = {
+    UploadSession.CLAIM: (ClaimPhoto, 'claim_id'),
+    UploadSession.INSPECTION: (InspectionPhoto, 'inspection_id'),
+}
+
+
+class UploadRejected(ValueError):
+    """A chunk or finalize request that cannot be applied to the session."""
+
+
+class OffsetMismatch(UploadRejected):
+    """A chunk that does not start within the bytes received so far."""
+
+
+def sniff_image_type(head):
+    """
+    Detect an allowed image type from the first bytes of a file.
+
+    Args:
+        head: At least the first SIGNATURE_LENGTH bytes (fewer for short files)
+
+    Returns:
+        tuple: (content_type, extension), or None if the type is not allowed
+    """
+    for signature, content_type, extension in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return content_type, extension
+    return None
+
+
+class ImageUploadHandler(FileUploadHandler):
+    """
+    Rejects uploads that are not JPEG/PNG or exceed ``max_size`` bytes.
+
+    A request whose Content-Length is already too large is answered without
+    reading its body. Otherwise a rejected file is skipped as soon as the
+    problem shows: its remaining bytes are read and discarded, not stored.
+    The reason is left in ``error`` and detected types in ``detected``
+    ({field_name: (content_type, extension)}).
+    """
+
+    def __init__(self, request=None, max_size=MAX_UPLOAD_SIZE):
+        super().__init__(request)
+        self.max_size = max_size
+        self.error = None
+        self.detected = {}
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        if content_length > self.max_size + FORM_OVERHEAD:
+            self.error = self.too_large_message()
+            # Handled: empty form, body left unread
+            return QueryDict(encoding=encoding), MultiValueDict()
+        return None
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.head = b''
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > self.max_size:
+            self.error = self.too_large_message()
+            raise SkipFile()
+
+        if self.field_name not in self.detected:
+            self.head += raw_data[:SIGNATURE_LENGTH - len(self.head)]
+            if len(self.head) >= SIGNATURE_LENGTH:
+                self._check_type()
+        return raw_data
+
+    def file_complete(self, file_size):
+        if self.field_name not in self.detected:
+            # Shorter than a signature; too late to skip, so it is only
+            # left out of ``detected``
+            self._check_type(skip=False)
+        return None
+
+    def _check_type(self, skip=True):
+        detected = sniff_image_type(self.head)
+        if detected is None:
+            self.error = 'Invalid file type (JPEG/PNG only)'
+            if skip:
+                raise SkipFile()
+            return
+        self.detected[self.field_name] = detected
+
+    def too_large_message(self):
+        return f'File too large (max {self.max_size // (1024 * 1024)}MB)'
+
+
+def session_expiry():
+    """Expiry time of a session created now."""
+    return timezone.now() + timedelta(
+        seconds=getattr(settings, 'UPLOAD_SESSION_TTL', 24 * 60 * 60)
+    )
+
+
+def part_path(session):
+    """Path of the part file holding the bytes received for ``session``."""
+    root = getattr(settings, 'UPLOAD_SESSION_ROOT', os.path.join(settings.BASE_DIR, 'upload_sessions'))
+    return os.path.join(root, f'{session.upload_id}.part')
+
+
+def discard_part(session):
+    """Delete the part file of ``session``, if any."""
+    try:
+        os.remove(part_path(session))
+    except FileNotFoundError:
+        pass
+
+
+def write_chunk(session, offset, stream, length):
+    """
+    Write a chunk read from ``stream`` into the session's part file.
+
+    The chunk is copied COPY_BUFFER_SIZE bytes at a time. It may start
+    anywhere up to the bytes received so far, so a client that lost the
+    response to a chunk can resend it. The caller holds a lock on the
+    session row and saves it afterwards.
+
+    Args:
+        session: Active UploadSession
+        offset: Position of the chunk's first byte in the file
+        stream: Readable request body
+        length: Chunk size from Content-Length
+
+    Raises:
+        OffsetMismatch: If the chunk starts past the bytes received so far
+        UploadRejected: If the chunk is too large, runs past the declared
+            file size, is cut short or does not start like a JPEG/PNG
+    """
+    if offset < 0 or offset > session.received_size:
+        raise OffsetMismatch(f'Expected a chunk at offset {session.received_size} or earlier')
+    if length < 1 or length > MAX_CHUNK_SIZE:
+        raise UploadRejected(f'Chunk size must be between 1 and {MAX_CHUNK_SIZE} bytes')
+    if offset + length > session.file_size:
+        raise UploadRejected('Chunk extends past the declared file size')
+
+    head = b''
+    if offset == 0:
+        head = stream.read(min(SIGNATURE_LENGTH, length))
+        detected = sniff_image_type(head)
+        if detected is None:
+            raise UploadRejected('Invalid file type (JPEG/PNG only)')
+        session.content_type = detected[0]
+
+    path = part_path(session)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    written = 0
+    # Opened without truncating: earlier chunks stay in place
+    with os.fdopen(os.open(path, os.O_RDWR | os.O_CREAT, 0o600), 'r+b') as part:
+        part.seek(offset)
+        part.write(head)
+        written = len(head)
+        while written < length:
+            data = stream.read(min(COPY_BUFFER_SIZE, length - written))
+            if not data:
+                break
+            part.write(data)
+            written += len(data)
+
+    if written < length:
+        # Keep only what is contiguous with the earlier chunks
+        session.received_size = max(session.received_size, offset + written)
+        raise UploadRejected('Chunk ended before Content-Length bytes were received')
+    session.received_size = max(session.received_size, offset + length)
+
+
+def finalize_session(session):
+    """
+    Create the photo of a fully received session.
+
+    The part file is streamed to storage, then the photo row is created and
+    the session completed in one transaction. On failure the stored copy is
+    deleted and the part file kept, so finalizing can be retried; on commit
+    the part file is removed.
+
+    Args:
+        session: Locked, active UploadSession
+
+    Returns:
+        ClaimPhoto or InspectionPhoto
+
+    Raises:
+        UploadRejected: If bytes are still missing
+    """
+    if session.received_size < session.file_size:
+        raise UploadRejected(
+            f'Upload incomplete: {session.received_size} of {session.file_size} bytes received'
+        )
+
+    model, foreign_key = SESSION_TARGETS[session.target]
+    extension = next(
+        extension for _, content_type, extension in IMAGE_SIGNATURES
+        if content_type == session.content_type
+    )
+    photo = model(
+        caption=session.caption,
+        latitude=session.latitude,
+        longitude=session.longitude,
+        **{foreign_key: session.object_id},
+    )
+    with open(part_path(session), 'rb') as part:
+        photo.photo.save(f'{session.target}_{session.upload_id.hex}{extension}', File(part), save=False)
+
+    try:
+        with transaction.atomic():
+            photo.save()
+            session.status = UploadSession.COMPLETED
+            session.photo_id = photo.pk
+            session.save(update_fields=['status', 'photo_id'])
+    except Exception:
+        photo.photo.delete(save=False)
+        raise
+
+    transaction.on_commit(lambda: discard_part(session))
+    return photo
@@ -44,7 +44,7 @@ def get_user_permissions(user):
     Returns:
         dict: Permission dictionary
     """
-    from insurance.models import RoleType
+    from insurance.permissions.cache import get_role_permissions
     
     if not user or not user.is_authenticated:
         return {}
@@ -52,14 +52,7 @@ def get_user_permissions(user):
     if hasattr(user, 'user_role') and user.user_role == 'SUPERUSER':
         return {'all': True}
     
-    try:
-        role = RoleType.objects.get(
-            role_name=user.user_role,
-            role_status='ACTIVE'
-        )
-        return role.permissions or {}
-    except RoleType.DoesNotExist:
-        return {}
+    return get_role_permissions(user.user_role) or {}
 
 
 def check_permission(user, resource, action):
@@ -1,19 +1,27 @@
 # ============================================
 # insurance/views/advisory.py
 # ============================================
-from datetime import datetime, timedelta
+from datetime import datetime, time, timedelta
 from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.utils.encoders import JSONEncoder
+from django.http import StreamingHttpResponse
 from django.utils import timezone
-from django.db.models import Count, Avg, Max, Min
+from django.utils.dateparse import parse_date, parse_datetime
+from django.db import transaction
+from django.db.models import Count, Avg, Max, Min, Q, Sum
 
-from insurance.models import Advisory, WeatherData, Farmer
+from insurance.models import Advisory, WeatherData, WeatherRollup, Farmer
 from insurance.serializers import AdvisorySerializer, WeatherDataSerializer
+from insurance.utils.ingestion import (
+    DEFAULT_CHUNK_SIZE, MAX_CHUNK_SIZE, detect_format, ingest_weather
+)
+from insurance.views.mixins import DynamicFieldsViewMixin
 
 
-class AdvisoryViewSet(viewsets.ModelViewSet):
+class AdvisoryViewSet(DynamicFieldsViewMixin, viewsets.ModelViewSet):
     queryset = Advisory.objects.all()
     serializer_class = AdvisorySerializer
 
@@ -62,10 +70,15 @@ class AdvisoryViewSet(viewsets.ModelViewSet):
         return Response({'count': count})
 
 
-class WeatherDataViewSet(viewsets.ModelViewSet):
+class WeatherDataViewSet(DynamicFieldsViewMixin, viewsets.ModelViewSet):
     """ViewSet for managing weather data (historical and forecast)"""
     queryset = WeatherData.objects.all()
     serializer_class = WeatherDataSerializer
+    # Keyset used by ?pagination=cursor
+    cursor_ordering = '-recorded_at'
+
+    # Batch comparisons with more locations than this are always streamed
+    COMPARE_STREAM_THRESHOLD = 500
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -123,15 +136,131 @@ class WeatherDataViewSet(viewsets.ModelViewSet):
 
         return Response(serializer.data)
 
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            instances = serializer.save()
+            if not isinstance(instances, list):
+                instances = [instances]
+            WeatherRollup.objects.add_readings(instances)
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            scopes = WeatherRollup.objects.scopes_for([serializer.instance])
+            instance = serializer.save()
+            WeatherRollup.objects.rebuild(
+                scopes | WeatherRollup.objects.scopes_for([instance])
+            )
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            scopes = WeatherRollup.objects.scopes_for([instance])
+            instance.delete()
+            WeatherRollup.objects.rebuild(scopes)
+
+    @staticmethod
+    def _aggregate_window(params):
+        """
+        Read start_date/end_date as a half-open [start, end) window.
+
+        Dates cover whole local days (end_date inclusive); ISO datetimes are
+        used as given, with end_date exclusive.
+
+        Raises:
+            ValueError: If a bound cannot be parsed or the window is empty
+        """
+        bounds = []
+        for name in ('start_date', 'end_date'):
+            value = params.get(name)
+            if not value:
+                bounds.append(None)
+                continue
+            try:
+                day = parse_date(value)
+                parsed = None if day else parse_datetime(value)
+            except ValueError:
+                day = parsed = None
+            if day:
+                if name == 'end_date':
+                    day += timedelta(days=1)
+                parsed = datetime.combine(day, time.min)
+            if parsed is None:
+                raise ValueError(
+                    f'{name} must be a date (YYYY-MM-DD) or an ISO 8601 datetime'
+                )
+            if timezone.is_naive(parsed):
+                parsed = timezone.make_aware(parsed)
+            bounds.append(parsed)
+
+        start, end = bounds
+        if start and end and start >= end:
+            raise ValueError('end_date must be after start_date')
+        return start, end
+
     @action(detail=False, methods=['get'])
     def statistics(self, request):
-        """Get weather data statistics"""
+        """
+        Get weather data statistics
+
+        Windows bounded by whole hours are answered from WeatherRollup, whole
+        months and days at their coarsest; anything else reads the raw
+        readings.
+        """
         data_type = request.query_params.get('type', 'HISTORICAL')
         location = request.query_params.get('location')
 
-        queryset = self.get_queryset().filter(data_type=data_type.upper())
+        try:
+            start, end = self._aggregate_window(request.query_params)
+        except ValueError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        rollups = WeatherRollup.objects.covering(start, end)
+        if rollups is not None:
+            rollups = rollups.filter(data_type=data_type.upper())
+            if location:
+                rollups = rollups.filter(location=location)
+
+            totals = rollups.aggregate(
+                total_records=Sum('reading_count'),
+                value_total=Sum('value_sum'),
+                max_value=Max('value_max'),
+                min_value=Min('value_min'),
+            )
+            total_records = totals['total_records'] or 0
+            stats = {
+                'total_records': total_records,
+                'avg_value': totals['value_total'] / total_records if total_records else None,
+                'max_value': totals['max_value'],
+                'min_value': totals['min_value'],
+            }
+
+            locations = [
+                {
+                    'location': row['location'],
+                    'count': row['count'],
+                    'avg_value': row['value_total'] / row['count'],
+                }
+                for row in rollups.values('location').annotate(
+                    count=Sum('reading_count'),
+                    value_total=Sum('value_sum'),
+                ).order_by('-count')
+            ]
+
+            return Response({
+                'statistics': stats,
+                'by_location': locations,
+                'data_type': data_type
+            })
+
+        queryset = WeatherData.objects.filter(data_type=data_type.upper())
         if location:
             queryset = queryset.filter(location=location)
+        if start:
+            queryset = queryset.filter(recorded_at__gte=start)
+        if end:
+            queryset = queryset.filter(recorded_at__lt=end)
 
         stats = queryset.aggregate(
             total_records=Count('weather_id'),
@@ -178,44 +307,159 @@ class WeatherDataViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
-    @action(detail=False, methods=['get'])
+    @staticmethod
+    def _compare_aggregates(rollups=False):
+        """
+        Historical and forecast aggregates as one set of conditional aggregates
+
+        With ``rollups`` the aggregates read WeatherRollup columns instead of
+        raw readings; averages are derived from the sums in _compare_result.
+        """
+        aggregates = {}
+        for prefix, data_type in (('historical', 'HISTORICAL'), ('forecast', 'FORECAST')):
+            condition = Q(data_type=data_type)
+            if rollups:
+                aggregates.update({
+                    f'{prefix}_sum': Sum('value_sum', filter=condition),
+                    f'{prefix}_max_value': Max('value_max', filter=condition),
+                    f'{prefix}_min_value': Min('value_min', filter=condition),
+                    f'{prefix}_count': Sum('reading_count', filter=condition),
+                })
+            else:
+                aggregates.update({
+                    f'{prefix}_avg_value': Avg('value', filter=condition),
+                    f'{prefix}_max_value': Max('value', filter=condition),
+                    f'{prefix}_min_value': Min('value', filter=condition),
+                    f'{prefix}_count': Count('weather_id', filter=condition),
+                })
+        return aggregates
+
+    @staticmethod
+    def _compare_result(location, row):
+        result = {'location': location}
+        for prefix in ('historical', 'forecast'):
+            count = row.get(f'{prefix}_count') or 0
+            avg_value = row.get(f'{prefix}_avg_value')
+            if f'{prefix}_sum' in row and count:
+                avg_value = row[f'{prefix}_sum'] / count
+            result[prefix] = {
+                'avg_value': avg_value,
+                'max_value': row.get(f'{prefix}_max_value'),
+                'min_value': row.get(f'{prefix}_min_value'),
+                'count': count,
+            }
+        return result
+
+    @action(detail=False, methods=['get', 'post'])
     def compare(self, request):
-        """Compare historical and forecast data"""
-        location = request.query_params.get('location')
-        if not location:
+        """
+        Compare historical and forecast data
+
+        Single location:  ?location=Nairobi
+        Batch:            ?locations=Nairobi,Kisumu or POST {"locations": [...]}
+        Prefix:           ?location_prefix=Nakuru
+
+        Batch and prefix comparisons are answered from one grouped query.
+        Optional start_date/end_date restrict the window; windows bounded by
+        whole hours (and no window at all) are read from WeatherRollup.
+        Pass stream=true (or more than COMPARE_STREAM_THRESHOLD locations) to
+        receive newline-delimited JSON, one location per line.
+        """
+        params = request.data if request.method == 'POST' else request.query_params
+        if not isinstance(params, dict):
             return Response(
-                {'error': 'Location parameter is required'},
+                {'error': 'Expected a JSON object'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Get historical data
-        historical = WeatherData.objects.filter(
-            location=location,
-            data_type='HISTORICAL'
-        ).aggregate(
-            avg_value=Avg('value'),
-            max_value=Max('value'),
-            min_value=Min('value'),
-            count=Count('weather_id')
-        )
+        try:
+            start, end = self._aggregate_window(params)
+        except ValueError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-        # Get forecast data
-        forecast = WeatherData.objects.filter(
-            location=location,
-            data_type='FORECAST'
-        ).aggregate(
-            avg_value=Avg('value'),
-            max_value=Max('value'),
-            min_value=Min('value'),
-            count=Count('weather_id')
-        )
+        queryset = WeatherRollup.objects.covering(start, end)
+        aggregates = self._compare_aggregates(rollups=queryset is not None)
+        if queryset is None:
+            queryset = WeatherData.objects.all()
+            if start:
+                queryset = queryset.filter(recorded_at__gte=start)
+            if end:
+                queryset = queryset.filter(recorded_at__lt=end)
+
+        location = params.get('location')
+        locations = params.get('locations')
+        prefix = params.get('location_prefix')
+        if isinstance(locations, str):
+            locations = [loc.strip() for loc in locations.split(',') if loc.strip()]
+        if not isinstance(location or '', str) or not isinstance(prefix or '', str):
+            return Response(
+                {'error': 'location and location_prefix must be strings'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not isinstance(locations or [], list) or not all(
+            isinstance(loc, str) and loc.strip() for loc in locations or []
+        ):
+            return Response(
+                {'error': 'locations must be a list of non-empty strings'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if location:
+            row = queryset.filter(location=location).aggregate(**aggregates)
+            return Response(self._compare_result(location, row))
+
+        if not locations and not prefix:
+            return Response(
+                {'error': 'Location parameter is required (location, locations or location_prefix)'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if locations:
+            locations = list(dict.fromkeys(locations))
+            queryset = queryset.filter(location__in=locations)
+        if prefix:
+            queryset = queryset.filter(location__startswith=prefix)
+
+        rows = queryset.values('location').annotate(
+            **aggregates
+        ).order_by('location')
+
+        stream = str(params.get('stream', '')).lower() == 'true'
+        if stream or (locations and len(locations) > self.COMPARE_STREAM_THRESHOLD):
+            response = StreamingHttpResponse(
+                self._stream_compare(rows, locations),
+                content_type='application/x-ndjson'
+            )
+            response['X-Accel-Buffering'] = 'no'
+            return response
+
+        results = {row['location']: self._compare_result(row['location'], row) for row in rows}
+        if locations:
+            # Requested locations without any readings are reported as empty
+            results = {
+                loc: results.get(loc) or self._compare_result(loc, {})
+                for loc in locations
+            }
 
         return Response({
-            'location': location,
-            'historical': historical,
-            'forecast': forecast
+            'count': len(results),
+            'results': list(results.values())
         })
 
+    def _stream_compare(self, rows, locations=None):
+        encoder = JSONEncoder()
+        seen = set()
+        for row in rows.iterator(chunk_size=500):
+            seen.add(row['location'])
+            yield encoder.encode(self._compare_result(row['location'], row)) + '\n'
+
+        for location in locations or []:
+            if location not in seen:
+                yield encoder.encode(self._compare_result(location, {})) + '\n'
+
     @action(detail=False, methods=['get'])
     def recent(self, request):
         """Get recent weather data (last 7 days)"""
@@ -241,9 +485,11 @@ class WeatherDataViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        deleted_count = WeatherData.objects.filter(
-            weather_id__in=ids
-        ).delete()[0]
+        with transaction.atomic():
+            queryset = WeatherData.objects.filter(weather_id__in=ids)
+            scopes = WeatherRollup.objects.scopes_for_queryset(queryset)
+            deleted_count = queryset.delete()[0]
+            WeatherRollup.objects.rebuild(scopes)
 
         return Response({
             'message': f'Successfully deleted {deleted_count} records',
@@ -274,4 +520,52 @@ class WeatherDataViewSet(viewsets.ModelViewSet):
             'data': serializer.data
         }, status=status.HTTP_201_CREATED)
 
+    @action(detail=False, methods=['post'])
+    def ingest(self, request):
+        """
+        High-throughput ingestion of station feeds
+
+        Send the readings as the request body (Content-Type
+        application/x-ndjson or text/csv) or as a multipart ``file``.
+        ?ingest_format=ndjson|csv overrides the detected format. Rows are
+        validated column by column and inserted in chunks; invalid rows are
+        reported and skipped. Only counts and errors are returned.
+        """
+        upload = request.FILES.get('file') if request.content_type.startswith('multipart/') else None
+
+        ingest_format = detect_format(
+            request.query_params.get('ingest_format')
+            or (upload.name if upload else request.content_type)
+        )
+        if ingest_format is None:
+            return Response(
+                {'error': 'Unsupported format, send NDJSON or CSV'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        lines = upload if upload else request.stream
+        if lines is None:
+            return Response(
+                {'error': 'No data provided'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            chunk_size = int(request.query_params.get('chunk_size', DEFAULT_CHUNK_SIZE))
+        except ValueError:
+            chunk_size = 0
+        if chunk_size < 1:
+            return Response(
+                {'error': 'chunk_size must be a positive integer'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        chunk_size = min(chunk_size, MAX_CHUNK_SIZE)
+
+        # Rows inserted before a decoding error stay; the counts say how many
+        result = ingest_weather(lines, ingest_format, chunk_size=chunk_size)
 
+        if result.get('error') or not result['created']:
+            response_status = status.HTTP_400_BAD_REQUEST
+        else:
+            response_status = status.HTTP_201_CREATED
+        return Response(result, status=response_status)
@@ -9,9 +9,10 @@ from insurance.serializers import (
     CropSerializer, CropVarietySerializer, CoverTypeSerializer,
     ProductCategorySerializer, SeasonSerializer, OrganizationSerializer,
 )
+from insurance.views.mixins import DynamicFieldsViewMixin
 
 
-class CropViewSet(viewsets.ModelViewSet):
+class CropViewSet(DynamicFieldsViewMixin, viewsets.ModelViewSet):
     queryset = Crop.objects.filter(deleted=False)
     serializer_class = CropSerializer
 
@@ -30,7 +31,7 @@ class CropViewSet(viewsets.ModelViewSet):
         })
 
 
-class CropVarietyViewSet(viewsets.ModelViewSet):
+class CropVarietyViewSet(DynamicFieldsViewMixin, viewsets.ModelViewSet):
     queryset = CropVariety.objects.filter(deleted=False)
     serializer_class = CropVarietySerializer
 
@@ -51,12 +52,12 @@ class CropVarietyViewSet(viewsets.ModelViewSet):
         })
 
 
-class CoverTypeViewSet(viewsets.ModelViewSet):
+class CoverTypeViewSet(DynamicFieldsViewMixin, viewsets.ModelViewSet):
     queryset = CoverType.objects.filter(deleted=False)
     serializer_class = CoverTypeSerializer
 
 
-class ProductCategoryViewSet(viewsets.ModelViewSet):
+class ProductCategoryViewSet(DynamicFieldsViewMixin, viewsets.ModelViewSet):
     queryset = ProductCategory.objects.filter(deleted=False)
     serializer_class = ProductCategorySerializer
 
@@ -80,6 +81,6 @@ class ProductCategoryViewSet(viewsets.ModelViewSet):
         })
 
 
-class SeasonViewSet(viewsets.ModelViewSet):
+class SeasonViewSet(DynamicFieldsViewMixin, viewsets.ModelViewSet):
     queryset = Season.objects.filter(deleted=False)
     serializer_class = SeasonSerializer
\ No newline at end of file
@@ -3,11 +3,16 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework_simplejwt.tokens import RefreshToken
+from django.contrib.auth.hashers import check_password, identify_hasher, make_password
+from django.db.models import Case, Q, Value, When
 from django.utils import timezone
+from django.utils.crypto import constant_time_compare
 
+from insurance.authentication import AccountRefreshToken, refresh_access_token
 from insurance.models import User, RoleType
 from insurance.serializers import UserSerializer
 from insurance.serializers.auth import RegistrationSerializer
+from insurance.utils import lockout
 
 
 class LoginView(APIView):
@@ -24,56 +29,104 @@ class LoginView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        try:
-            # Try to get user by email OR username
-            try:
-                user = User.objects.get(user_email=username)
-            except User.DoesNotExist:
-                user = User.objects.get(user_name=username)
-
-            # Check if password is hashed or plain text
-            password_valid = False
-
-            if user.check_password(password):
-                password_valid = True
-            elif user.password == password:
-                password_valid = True
-                user.set_password(password)
-                user.save(update_fields=['password'])
-
-            if password_valid:
-                if user.user_status != 'ACTIVE':
-                    return Response(
-                        {'error': 'User account is inactive'},
-                        status=status.HTTP_403_FORBIDDEN
-                    )
-
-                refresh = RefreshToken.for_user(user)
-                user.last_login = timezone.now()
-                user.save(update_fields=['last_login'])
+        user = self.resolve_user(username)
 
-                return Response({
-                    'token': str(refresh.access_token),
-                    'refresh': str(refresh),
-                    'user': UserSerializer(user).data,
-                    'expires_in': 3600
-                }, status=status.HTTP_200_OK)
-            else:
-                return Response(
-                    {'error': 'Invalid credentials'},
-                    status=status.HTTP_401_UNAUTHORIZED
-                )
-        except User.DoesNotExist:
+        # Locked accounts are turned away before any password hashing
+        until = lockout.locked_until(user, username)
+        if until:
+            return self.locked_response(until)
+
+        if user is None:
+            # Spend the same hashing time as a real check so response times
+            # do not reveal which accounts exist
+            make_password(password)
+            until = lockout.record_failure(None, username)
+            if until:
+                return self.locked_response(until)
             return Response(
                 {'error': 'Invalid credentials'},
                 status=status.HTTP_401_UNAUTHORIZED
             )
+
+        try:
+            update_fields = ['last_login']
+            if not self.verify_password(user, password, update_fields):
+                until = lockout.record_failure(user, username)
+                if until:
+                    return self.locked_response(until)
+                return Response(
+                    {'error': 'Invalid credentials'},
+                    status=status.HTTP_401_UNAUTHORIZED
+                )
+            lockout.clear_failures(user, update_fields)
+
+            if user.user_status != 'ACTIVE':
+                return Response(
+                    {'error': 'User account is inactive'},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+
+            user.last_login = timezone.now()
+            user.save(update_fields=update_fields)
+            refresh = AccountRefreshToken.for_user(user)
+
+            return Response({
+                'token': str(refresh.access_token),
+                'refresh': str(refresh),
+                'user': UserSerializer(user).data,
+                'expires_in': 3600
+            }, status=status.HTTP_200_OK)
         except Exception as e:
             return Response(
                 {'error': f'Login failed: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    @staticmethod
+    def locked_response(until):
+        return Response(
+            {
+                'error': 'Your account is temporarily locked due to multiple failed login attempts.',
+                'locked_until': until.isoformat()
+            },
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    @staticmethod
+    def resolve_user(username):
+        """Find the user by email or user name in one query, email first."""
+        return (
+            User.objects.select_related('organisation', 'country')
+            .filter(Q(user_email=username) | Q(user_name=username))
+            .annotate(email_match=Case(When(user_email=username, then=Value(0)), default=Value(1)))
+            .order_by('email_match', 'user_id')
+            .first()
+        )
+
+    @staticmethod
+    def verify_password(user, password, update_fields):
+        """
+        Check ``password`` without writing anything.
+
+        Legacy plain-text passwords, and hashes made with another hasher or
+        work factor, are re-hashed in memory and 'password' is added to
+        ``update_fields`` so the login's single save stores the new hash.
+        """
+        def rehash(raw_password):
+            # Same password, so tokens stay valid (no set_password bump)
+            user.password = make_password(raw_password)
+            update_fields.append('password')
+
+        try:
+            identify_hasher(user.password)
+        except ValueError:
+            # Stored in plain text by an old import
+            if user.password and constant_time_compare(user.password, password):
+                rehash(password)
+                return True
+            return False
+        return check_password(password, user.password, setter=rehash)
+
 
 class RegisterView(APIView):
     """User registration endpoint with role support"""
@@ -104,7 +157,7 @@ class RegisterView(APIView):
                 user = serializer.save()
                 
                 # Generate JWT tokens
-                refresh = RefreshToken.for_user(user)
+                refresh = AccountRefreshToken.for_user(user)
 
                 return Response({
                     'message': 'User registered successfully',
@@ -188,7 +241,7 @@ class RefreshTokenView(APIView):
 
         try:
             refresh = RefreshToken(refresh_token)
-            access_token = str(refresh.access_token)
+            access_token = str(refresh_access_token(refresh))
 
             return Response({
                 'token': access_token,
@@ -9,9 +9,10 @@ from insurance.serializers import (
     OrganizationTypeSerializer,
     OrganizationSerializer,
 )
+from insurance.views.mixins import DynamicFieldsViewMixin
 
 
-class CountryViewSet(viewsets.ModelViewSet):
+class CountryViewSet(DynamicFieldsViewMixin, viewsets.ModelViewSet):
     queryset = Country.objects.filter(country_is_deleted=False)
     serializer_class = CountrySerializer
 
@@ -22,7 +23,7 @@ class CountryViewSet(viewsets.ModelViewSet):
         return queryset[:10]
 
 
-class OrganizationTypeViewSet(viewsets.ModelViewSet):
+class OrganizationTypeViewSet(DynamicFieldsViewMixin, viewsets.ModelViewSet):
     queryset = OrganizationType.objects.all().order_by('-organisation_type_id')
     serializer_class = OrganizationTypeSerializer
 
@@ -33,7 +34,7 @@ class OrganizationTypeViewSet(viewsets.ModelViewSet):
         return queryset[:10]
 
 
-class OrganizationViewSet(viewsets.ModelViewSet):
+class OrganizationViewSet(DynamicFieldsViewMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing organizations.
     Provides CRUD operations: list, retrieve, create, update, partial_update, destroy
@@ -9,15 +9,22 @@ from django.utils import timezone
 from django.db.models import Count, Sum
 from django.db import transaction
 
-from insurance.models import Claim, LossAssessor, ClaimAssignment, Farmer, Quotation
+from insurance.models import (
+    Claim, LossAssessor, ClaimAssignment, Farmer, Quotation, StatusCounter
+)
 from insurance.serializers import (
     ClaimSerializer, LossAssessorSerializer, ClaimAssignmentSerializer
 )
+from insurance.utils.export import CLAIM_EXPORT_COLUMNS, export_response
+from insurance.utils.statistics import (
+    ledger_count, ledger_sum, ledger_breakdown, parse_date_range, time_series
+)
+from insurance.views.mixins import DynamicFieldsViewMixin
 
 logger = logging.getLogger(__name__)
 
 
-class LossAssessorViewSet(viewsets.ModelViewSet):
+class LossAssessorViewSet(DynamicFieldsViewMixin, viewsets.ModelViewSet):
     queryset = LossAssessor.objects.all()
     serializer_class = LossAssessorSerializer
 
@@ -29,9 +36,11 @@ class LossAssessorViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-class ClaimViewSet(viewsets.ModelViewSet):
+class ClaimViewSet(DynamicFieldsViewMixin, viewsets.ModelViewSet):
     queryset = Claim.objects.all().order_by('-claim_date')
     serializer_class = ClaimSerializer
+    # Keyset used by ?pagination=cursor
+    cursor_ordering = '-claim_date'
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
@@ -203,25 +212,97 @@ class ClaimViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'])
     def statistics(self, request):
-        """Get claim statistics"""
-        total = self.get_queryset().count()
-        by_status = self.get_queryset().values('status').annotate(
-            count=Count('claim_id')
-        )
-        total_claimed = self.get_queryset().aggregate(
-            total=Sum('estimated_loss_amount')
-        )['total'] or 0
-        total_approved = self.get_queryset().aggregate(
-            total=Sum('approved_amount')
-        )['total'] or 0
+        """
+        Get claim statistics
+
+        With ?mode=trend, returns claim counts, estimated loss and approved
+        amount bucketed by ?bucket=day|week|month over claim_date between
+        ?start_date and ?end_date (YYYY-MM-DD).
+        """
+        params = request.query_params
+        if params.get('mode') == 'trend':
+            return self._trend(request)
+
+        if not (params.get('status') or params.get('farmer_id')):
+            claims = StatusCounter.objects.totals(['claim'])['claim']
+            return Response({
+                'total_claims': ledger_count(claims),
+                'by_status': ledger_breakdown(claims),
+                'total_claimed': float(ledger_sum(claims, 'amount')),
+                'total_approved': float(ledger_sum(claims, 'approved_amount'))
+            })
+
+        by_status = list(self.get_queryset().values('status').annotate(
+            count=Count('claim_id'),
+            claimed=Sum('estimated_loss_amount'),
+            approved=Sum('approved_amount'),
+        ).order_by('status'))
+
+        return Response({
+            'total_claims': sum(row['count'] for row in by_status),
+            'by_status': [
+                {'status': row['status'], 'count': row['count']}
+                for row in by_status
+            ],
+            'total_claimed': float(sum(row['claimed'] or 0 for row in by_status)),
+            'total_approved': float(sum(row['approved'] or 0 for row in by_status))
+        })
+
+    def _trend(self, request):
+        """Claim totals per time bucket, computed in one grouped query"""
+        bucket = request.query_params.get('bucket', 'week')
+        try:
+            start_date, end_date = parse_date_range(request.query_params)
+            series = time_series(
+                self.get_queryset(),
+                'claim_date',
+                bucket,
+                {
+                    'claims': Count('claim_id'),
+                    'estimated_loss': Sum('estimated_loss_amount'),
+                    'approved_amount': Sum('approved_amount'),
+                },
+                start_date=start_date,
+                end_date=end_date,
+            )
+        except ValueError as e:
+            return Response(
+                {'error': str(e)},
+                status=http_status.HTTP_400_BAD_REQUEST
+            )
 
         return Response({
-            'total_claims': total,
-            'by_status': list(by_status),
-            'total_claimed': float(total_claimed),
-            'total_approved': float(total_approved)
+            'bucket': bucket,
+            'start_date': series[0]['period'],
+            'end_date': end_date.isoformat() if end_date else timezone.localdate().isoformat(),
+            'series': series,
+            'totals': {
+                'claims': sum(point['claims'] for point in series),
+                'estimated_loss': sum(point['estimated_loss'] for point in series),
+                'approved_amount': sum(point['approved_amount'] for point in series),
+            }
         })
 
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Stream claims as CSV or NDJSON (?export_format=csv|ndjson)
+
+        Applies the same filters as the list endpoint but is not paginated.
+        """
+        try:
+            return export_response(
+                self.filter_queryset(self.get_queryset()),
+                CLAIM_EXPORT_COLUMNS,
+                request.query_params.get('export_format', 'csv'),
+                'claims',
+            )
+        except ValueError as e:
+            return Response(
+                {'error': str(e)},
+                status=http_status.HTTP_400_BAD_REQUEST
+            )
+
     @action(detail=True, methods=['post'])
     def assign_assessor(self, request, pk=None):
         """Assign loss assessor to claim"""
@@ -246,6 +327,8 @@ class ClaimViewSet(viewsets.ModelViewSet):
         claim.loss_assessor_id = assessor_id
         claim.save()
 
+        # Reload so the new assessor and its user come back in one query
+        claim = self.get_queryset().get(pk=claim.pk)
         return Response(self.get_serializer(claim).data)
 
     @action(detail=True, methods=['post'])
@@ -1,10 +1,9 @@
 from rest_framework import viewsets
+from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.utils import timezone
-from django.db.models import Sum
 
-from insurance.models import Farmer, Quotation, Claim
+from insurance.utils.statistics import dashboard_statistics, parse_date_range
 
 
 class DashboardViewSet(viewsets.ViewSet):
@@ -12,54 +11,30 @@ class DashboardViewSet(viewsets.ViewSet):
 
     @action(detail=False, methods=['get'])
     def statistics(self, request):
-        """Get overall dashboard statistics"""
-        today = timezone.now().date()
-
-        # Farmer statistics
-        total_farmers = Farmer.objects.count()
-        active_farmers = Farmer.objects.filter(status='ACTIVE').count()
-
-        # Quotation statistics
-        total_quotations = Quotation.objects.count()
-        open_quotations = Quotation.objects.filter(status='OPEN').count()
-        paid_quotations = Quotation.objects.filter(status='PAID').count()
-        written_policies = Quotation.objects.filter(status='WRITTEN').count()
-
-        # Claim statistics
-        total_claims = Claim.objects.count()
-        open_claims = Claim.objects.filter(status='OPEN').count()
-        pending_payment_claims = Claim.objects.filter(
-            status='PENDING_PAYMENT'
-        ).count()
-        paid_claims = Claim.objects.filter(status='PAID').count()
-
-        # Financial statistics
-        total_premium = Quotation.objects.aggregate(
-            total=Sum('premium_amount')
-        )['total'] or 0
-        total_claims_value = Claim.objects.aggregate(
-            total=Sum('approved_amount')
-        )['total'] or 0
-
-        return Response({
-            'farmers': {
-                'total': total_farmers,
-                'active': active_farmers
-            },
-            'quotations': {
-                'total': total_quotations,
-                'open': open_quotations,
-                'paid': paid_quotations,
-                'written': written_policies
-            },
-            'claims': {
-                'total': total_claims,
-                'open': open_claims,
-                'pending_payment': pending_payment_claims,
-                'paid': paid_claims
-            },
-            'financials': {
-                'total_premium': float(total_premium),
-                'total_claims_value': float(total_claims_value)
-            }
-        })
\ No newline at end of file
+        """
+        Get overall dashboard statistics
+
+        Optional query parameters:
+        - organisation_id: restrict the figures to one organisation
+        - start_date / end_date: restrict to records added in that window
+        """
+        organisation_id = request.query_params.get('organisation_id')
+        if organisation_id and not organisation_id.isdigit():
+            return Response(
+                {'error': 'organisation_id must be an integer'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            start_date, end_date = parse_date_range(request.query_params)
+        except ValueError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response(dashboard_statistics(
+            organisation_id=organisation_id,
+            start_date=start_date,
+            end_date=end_date,
+        ))
@@ -1,17 +1,23 @@
 from rest_framework import viewsets
+from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.db.models import Q, Count
 
-from insurance.models import Farmer, Farm
+from insurance.models import Farmer, Farm, StatusCounter
 from insurance.serializers import FarmerSerializer, FarmSerializer
+from insurance.utils.export import FARMER_EXPORT_COLUMNS, export_response
+from insurance.utils.statistics import ledger_count, ledger_breakdown
+from insurance.views.mixins import DynamicFieldsViewMixin
 
 
-class FarmerViewSet(viewsets.ModelViewSet):
+class FarmerViewSet(DynamicFieldsViewMixin, viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     queryset = Farmer.objects.all()
     serializer_class = FarmerSerializer
+    # Keyset used by ?pagination=cursor
+    cursor_ordering = '-farmer_id'
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -28,6 +34,14 @@ class FarmerViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def statistics(self, request):
         """Get farmer statistics"""
+        if not request.query_params.get('search'):
+            totals = StatusCounter.objects.totals(['farmer', 'farmer_gender'])
+            return Response({
+                'total_farmers': ledger_count(totals['farmer']),
+                'active_farmers': ledger_count(totals['farmer'], 'ACTIVE'),
+                'by_gender': ledger_breakdown(totals['farmer_gender'], 'gender')
+            })
+
         total = self.get_queryset().count()
         active = self.get_queryset().filter(status='ACTIVE').count()
         by_gender = self.get_queryset().values('gender').annotate(
@@ -40,8 +54,28 @@ class FarmerViewSet(viewsets.ModelViewSet):
             'by_gender': list(by_gender)
         })
 
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Stream farmers as CSV or NDJSON (?export_format=csv|ndjson)
+
+        Applies the same filters as the list endpoint but is not paginated.
+        """
+        try:
+            return export_response(
+                self.filter_queryset(self.get_queryset()),
+                FARMER_EXPORT_COLUMNS,
+                request.query_params.get('export_format', 'csv'),
+                'farmers',
+            )
+        except ValueError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
 
-class FarmViewSet(viewsets.ModelViewSet):
+class FarmViewSet(DynamicFieldsViewMixin, viewsets.ModelViewSet):
     queryset = Farm.objects.all().order_by('-farm_id')
     serializer_class = FarmSerializer
 
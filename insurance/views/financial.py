@@ -9,16 +9,21 @@ from rest_framework import status
 from django.utils import timezone
 from django.db.models import Count, Sum
 
-from insurance.models import Subsidy, Invoice
+from insurance.models import Subsidy, Invoice, StatusCounter
+from insurance.models.counters import update_with_ledger
 from insurance.serializers import SubsidySerializer, InvoiceSerializer
+from insurance.utils.statistics import (
+    ledger_count, ledger_sum, ledger_breakdown, invoice_summary
+)
+from insurance.views.mixins import DynamicFieldsViewMixin
 
 
-class SubsidyViewSet(viewsets.ModelViewSet):
+class SubsidyViewSet(DynamicFieldsViewMixin, viewsets.ModelViewSet):
     queryset = Subsidy.objects.all().order_by('-subsidy_id')
     serializer_class = SubsidySerializer
 
 
-class InvoiceViewSet(viewsets.ModelViewSet):
+class InvoiceViewSet(DynamicFieldsViewMixin, viewsets.ModelViewSet):
     queryset = Invoice.objects.all().order_by('-invoice_id')
     serializer_class = InvoiceSerializer
 
@@ -37,36 +42,50 @@ class InvoiceViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def statistics(self, request):
         """Get invoice statistics by status"""
-        total = self.get_queryset().count()
-        by_status = self.get_queryset().values('status').annotate(
-            count=Count('invoice_id')
-        )
+        organisation_id = request.query_params.get('organisation_id')
+        if not request.query_params.get('status'):
+            invoices = StatusCounter.objects.totals(
+                ['invoice'], organisation_id=organisation_id
+            )['invoice']
+            return Response({
+                'total_invoices': ledger_count(invoices),
+                'by_status': ledger_breakdown(invoices),
+                'total_amount': float(ledger_sum(invoices, 'amount')),
+                'approved_amount': float(ledger_sum(invoices, 'amount', 'APPROVED')),
+                'settled_amount': float(ledger_sum(invoices, 'amount', 'SETTLED')),
+                'pending_amount': float(ledger_sum(invoices, 'amount', 'PENDING'))
+            })
 
-        total_amount = self.get_queryset().aggregate(
+        by_status = list(self.get_queryset().order_by('status').values('status').annotate(
+            count=Count('invoice_id'),
             total=Sum('amount')
-        )['total'] or 0
-
-        approved_amount = self.get_queryset().filter(
-            status='APPROVED'
-        ).aggregate(total=Sum('amount'))['total'] or 0
-
-        settled_amount = self.get_queryset().filter(
-            status='SETTLED'
-        ).aggregate(total=Sum('amount'))['total'] or 0
-
-        pending_amount = self.get_queryset().filter(
-            status='PENDING'
-        ).aggregate(total=Sum('amount'))['total'] or 0
+        ))
+        amounts = {row['status']: float(row['total'] or 0) for row in by_status}
 
         return Response({
-            'total_invoices': total,
-            'by_status': list(by_status),
-            'total_amount': float(total_amount),
-            'approved_amount': float(approved_amount),
-            'settled_amount': float(settled_amount),
-            'pending_amount': float(pending_amount)
+            'total_invoices': sum(row['count'] for row in by_status),
+            'by_status': [
+                {'status': row['status'], 'count': row['count']}
+                for row in by_status
+            ],
+            'total_amount': sum(amounts.values()),
+            'approved_amount': amounts.get('APPROVED', 0.0),
+            'settled_amount': amounts.get('SETTLED', 0.0),
+            'pending_amount': amounts.get('PENDING', 0.0)
         })
 
+    @action(detail=False, methods=['get'])
+    def summary(self, request):
+        """
+        Invoice ledger summary in a single grouped query
+
+        Returns totals and amounts per status, per organisation and per
+        subsidy, plus ageing buckets for PENDING (from date added) and
+        APPROVED (from approval date) invoices. Honours the status and
+        organisation_id filters.
+        """
+        return Response(invoice_summary(self.get_queryset()))
+
     @action(detail=True, methods=['post'])
     def approve(self, request, pk=None):
         """Approve invoice - moves from PENDING to APPROVED"""
@@ -192,7 +211,8 @@ class InvoiceViewSet(viewsets.ModelViewSet):
             status='PENDING'
         )
 
-        count = invoices.update(
+        count = update_with_ledger(
+            invoices,
             status='APPROVED',
             approved_date=timezone.now()
         )
@@ -225,7 +245,8 @@ class InvoiceViewSet(viewsets.ModelViewSet):
             status='APPROVED'
         )
 
-        count = invoices.update(
+        count = update_with_ledger(
+            invoices,
             status='SETTLED',
             settlement_date=timezone.now(),
             payment_reference=payment_reference
@@ -8,10 +8,11 @@ from insurance.models.inspection import Inspection, InspectionPhoto, ClaimPhoto
 from insurance.serializers.inspection import (
     InspectionSerializer, InspectionPhotoSerializer, ClaimPhotoSerializer
 )
+from insurance.views.mixins import DynamicFieldsViewMixin
 
 
-class InspectionViewSet(viewsets.ModelViewSet):
-    queryset = Inspection.objects.all()
+class InspectionViewSet(DynamicFieldsViewMixin, viewsets.ModelViewSet):
+    queryset = Inspection.objects.select_related('farm', 'inspector')
     serializer_class = InspectionSerializer
 
     def get_queryset(self):
@@ -27,7 +28,7 @@ class InspectionViewSet(viewsets.ModelViewSet):
         if farm_id:
             queryset = queryset.filter(farm_id=farm_id)
 
-        return queryset.select_related('farm', 'inspector')
+        return queryset
 
     @action(detail=True, methods=['post'])
     def check_in(self, request, pk=None):
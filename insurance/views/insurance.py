@@ -1,9 +1,10 @@
 from rest_framework import viewsets
 from insurance.models import InsuranceProduct
 from insurance.serializers import InsuranceProductSerializer
+from insurance.views.mixins import DynamicFieldsViewMixin
 
 
-class InsuranceProductViewSet(viewsets.ModelViewSet):
+class InsuranceProductViewSet(DynamicFieldsViewMixin, viewsets.ModelViewSet):
     queryset = InsuranceProduct.objects.all().order_by('-product_id')
     serializer_class = InsuranceProductSerializer
 
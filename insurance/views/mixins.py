@@ -0,0 +1,115 @@
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+from insurance.serializers.mixins import expanded_field, field_requirements
+
+
+class EagerLoadingViewMixin:
+    """
+    Loads the relations declared by the serializer (see
+    ``insurance.serializers.mixins.EagerLoadingMixin``) for every queryset
+    the view builds, so list, detail and custom actions share them.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        serializer_class = self.get_serializer_class()
+        if hasattr(serializer_class, 'setup_eager_loading'):
+            queryset = serializer_class.setup_eager_loading(queryset)
+        return queryset
+
+
+class DynamicFieldsViewMixin(EagerLoadingViewMixin):
+    """
+    Sparse fieldsets for read requests.
+
+    ?fields=a,b    render only these top-level fields
+    ?omit=a,b      render everything except these
+    ?expand=fk     render a foreign key as the related object instead of its id
+
+    The queryset follows the trimmed serializer: unused columns are deferred
+    and only the joins and prefetches the remaining fields need are made.
+    When a remaining field cannot be traced (an undeclared
+    SerializerMethodField, ``source='*'``), nothing is deferred and the
+    view's own joins and prefetches are kept.
+    """
+    fields_query_param = 'fields'
+    omit_query_param = 'omit'
+    expand_query_param = 'expand'
+
+    def _query_list(self, name):
+        value = self.request.query_params.get(name, '')
+        return [item.strip() for item in value.split(',') if item.strip()]
+
+    def get_sparse_fieldset(self):
+        """
+        (fields, omit, expand) requested for this read request, or None when
+        the full representation is wanted.
+        """
+        if not hasattr(self, '_sparse_fieldset'):
+            sparse = None
+            request = getattr(self, 'request', None)
+            if request is not None and request.method in SAFE_METHODS:
+                sparse = tuple(
+                    self._query_list(param) for param in (
+                        self.fields_query_param,
+                        self.omit_query_param,
+                        self.expand_query_param,
+                    )
+                )
+                if not any(sparse):
+                    sparse = None
+            self._sparse_fieldset = sparse
+        return self._sparse_fieldset
+
+    def shape_serializer(self, serializer):
+        """Drop unrequested fields and swap expanded relations into ``serializer``."""
+        fields, omit, expand = self.get_sparse_fieldset()
+        for name in list(serializer.fields):
+            if name in omit or (fields and name not in fields and name not in expand):
+                serializer.fields.pop(name)
+
+        for name in expand:
+            nested = expanded_field(serializer, name)
+            if nested is not None:
+                serializer.fields[name] = nested
+        return serializer
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if self.get_sparse_fieldset() is not None:
+            target = serializer.child if isinstance(serializer, serializers.ListSerializer) else serializer
+            if isinstance(target, serializers.ModelSerializer):
+                self.shape_serializer(target)
+        return serializer
+
+    def get_queryset(self):
+        if self.get_sparse_fieldset() is None:
+            return super().get_queryset()
+
+        # Skip the serializer's full eager loading, it is rebuilt below
+        queryset = super(EagerLoadingViewMixin, self).get_queryset()
+        serializer_class = self.get_serializer_class()
+        if not (
+            issubclass(serializer_class, serializers.ModelSerializer)
+            and serializer_class.Meta.model is queryset.model
+        ):
+            return super().get_queryset()
+
+        serializer = self.shape_serializer(
+            serializer_class(context=self.get_serializer_context())
+        )
+        select, prefetch, columns = field_requirements(serializer)
+
+        if columns is None:
+            # Untraced fields may read any relation the view loads
+            queryset = super().get_queryset()
+        else:
+            queryset = queryset.select_related(None).prefetch_related(None)
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        if columns is not None:
+            queryset = queryset.only(*columns)
+        return queryset
@@ -6,16 +6,20 @@ from django.db.models import Q
 
 from insurance.models import Notification, Message
 from insurance.serializers import NotificationSerializer, MessageSerializer
+from insurance.views.mixins import DynamicFieldsViewMixin
 
 
-class NotificationViewSet(viewsets.ModelViewSet):
+class NotificationViewSet(DynamicFieldsViewMixin, viewsets.ModelViewSet):
     """ViewSet for managing user notifications"""
+    queryset = Notification.objects.all()
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
+    # Keyset used by ?pagination=cursor
+    cursor_ordering = '-created_at'
 
     def get_queryset(self):
         """Filter notifications for current user"""
-        return Notification.objects.filter(user=self.request.user)
+        return super().get_queryset().filter(user=self.request.user)
 
     @action(detail=False, methods=['get'])
     def unread(self, request):
@@ -38,35 +42,36 @@ class NotificationViewSet(viewsets.ModelViewSet):
         return Response({'marked_read': count})
 
 
-class MessageViewSet(viewsets.ModelViewSet):
+class MessageViewSet(DynamicFieldsViewMixin, viewsets.ModelViewSet):
     """ViewSet for managing user messages"""
+    queryset = Message.objects.all()
     serializer_class = MessageSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         """Get messages for current user (sent or received)"""
-        return Message.objects.filter(
+        return super().get_queryset().filter(
             Q(sender=self.request.user) | Q(recipient=self.request.user)
         )
 
     @action(detail=False, methods=['get'])
     def inbox(self, request):
         """Get received messages"""
-        messages = Message.objects.filter(recipient=request.user)
+        messages = self.get_queryset().filter(recipient=request.user)
         serializer = self.get_serializer(messages, many=True)
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
     def sent(self, request):
         """Get sent messages"""
-        messages = Message.objects.filter(sender=request.user)
+        messages = self.get_queryset().filter(sender=request.user)
         serializer = self.get_serializer(messages, many=True)
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
     def unread(self, request):
         """Get unread messages"""
-        messages = Message.objects.filter(
+        messages = self.get_queryset().filter(
             recipient=request.user,
             is_read=False
         )
@@ -5,17 +5,22 @@ from rest_framework import status
 from django.utils import timezone
 from django.db.models import Count, Sum
 
-from insurance.models import Quotation, Farmer, InsuranceProduct
+from insurance.models import Quotation, Farmer, InsuranceProduct, StatusCounter
 from insurance.serializers import (
     QuotationSerializer, FarmerSerializer, InsuranceProductSerializer
 )
+from insurance.utils.export import QUOTATION_EXPORT_COLUMNS, export_response
+from insurance.utils.statistics import ledger_count, ledger_sum, ledger_breakdown
+from insurance.views.mixins import DynamicFieldsViewMixin
 
 
-class QuotationViewSet(viewsets.ModelViewSet):
+class QuotationViewSet(DynamicFieldsViewMixin, viewsets.ModelViewSet):
     queryset = Quotation.objects.select_related(
         'farmer', 'farm', 'insurance_product'
     ).all().order_by('-quotation_id')
     serializer_class = QuotationSerializer
+    # Keyset used by ?pagination=cursor
+    cursor_ordering = '-quotation_id'
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -79,6 +84,15 @@ class QuotationViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def statistics(self, request):
         """Get quotation statistics"""
+        params = request.query_params
+        if not (params.get('status') or params.get('farmer_id')):
+            quotations = StatusCounter.objects.totals(['quotation'])['quotation']
+            return Response({
+                'total_quotations': ledger_count(quotations),
+                'by_status': ledger_breakdown(quotations),
+                'total_premium': float(ledger_sum(quotations, 'amount'))
+            })
+
         total = self.get_queryset().count()
         by_status = self.get_queryset().values('status').annotate(
             count=Count('quotation_id')
@@ -93,6 +107,26 @@ class QuotationViewSet(viewsets.ModelViewSet):
             'total_premium': float(total_premium)
         })
 
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Stream quotations as CSV or NDJSON (?export_format=csv|ndjson)
+
+        Applies the same filters as the list endpoint but is not paginated.
+        """
+        try:
+            return export_response(
+                self.filter_queryset(self.get_queryset()),
+                QUOTATION_EXPORT_COLUMNS,
+                request.query_params.get('export_format', 'csv'),
+                'quotations',
+            )
+        except ValueError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
     @action(detail=True, methods=['post'])
     def mark_paid(self, request, pk=None):
         """Mark quotation as paid"""
@@ -166,7 +200,10 @@ class QuotationViewSet(viewsets.ModelViewSet):
     def with_details(self, request):
         """Return quotations with related data for frontend"""
         quotations = self.get_serializer(self.get_queryset(), many=True).data
-        farmers = FarmerSerializer(Farmer.objects.all(), many=True).data
+        farmers = FarmerSerializer(
+            FarmerSerializer.setup_eager_loading(Farmer.objects.all()),
+            many=True
+        ).data
         products = InsuranceProductSerializer(
             InsuranceProduct.objects.filter(status='ACTIVE'),
             many=True
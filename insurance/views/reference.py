@@ -0,0 +1,33 @@
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from insurance.utils.reference import reference_bundle, reference_etag
+
+
+class ReferenceDataView(APIView):
+    """
+    All lookup tables in one versioned bundle
+
+    Send the last ETag back in If-None-Match to get 304 Not Modified while
+    nothing in the bundle has changed.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @staticmethod
+    def _matches(etag, header):
+        if not header:
+            return False
+        candidates = {tag.removeprefix('W/') for tag in parse_etags(header)}
+        return '*' in candidates or etag in candidates
+
+    def get(self, request):
+        etag = reference_etag()
+        headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+
+        if self._matches(etag, request.headers.get('If-None-Match')):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        return Response(reference_bundle(etag), headers=headers)
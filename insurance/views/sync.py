@@ -3,15 +3,15 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.utils import timezone
 from django.db import transaction
-from datetime import datetime
 
-from insurance.models import Farmer, Farm, Quotation, Claim
+from insurance.models import Farmer, Farm, Quotation, Claim, SyncSequence
 from insurance.serializers import (
     FarmerSerializer,
     FarmSerializer,
     QuotationSerializer,
     ClaimSerializer,
 )
+from insurance.utils.sync import InvalidContinuation, SyncPull, upsert_entity
 
 ENTITY_MAP = {
     "farmers": (Farmer, FarmerSerializer),
@@ -25,121 +25,81 @@ class SyncAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
+        """
+        Upload pending changes and download the next chunk of server changes.
+
+        Downloads are chunked by ``max_rows`` / ``max_bytes``. While the
+        response carries a ``continuation`` token, post it back (with the
+        same budgets, no pending data needed) for the next chunk; a request
+        repeated with the same token returns the same chunk. Store
+        ``sync_sequence`` as ``last_sync_sequence`` once ``continuation``
+        is null.
+        """
         user = request.user
         payload = request.data
 
-        last_sync = payload.get("last_sync_timestamp")
+        try:
+            since = int(payload.get("last_sync_sequence") or 0)
+        except (TypeError, ValueError):
+            return Response(
+                {"error": "last_sync_sequence must be an integer"},
+                status=400
+            )
         pending_data = payload.get("pending_data", {})
-
-        last_sync_dt = self._parse_timestamp(last_sync)
+        token = payload.get("continuation")
+
+        # Reject a bad token before anything is written, a 400 must not
+        # leave the uploads applied behind the client's back
+        pull = None
+        if token:
+            try:
+                pull = SyncPull.resume(
+                    ENTITY_MAP, user, token,
+                    payload.get("max_rows"), payload.get("max_bytes"),
+                )
+            except InvalidContinuation as e:
+                return Response({"error": str(e)}, status=400)
 
         with transaction.atomic():
             upload_results = self._process_uploads(pending_data, user)
-            server_updates = self._get_server_updates(last_sync_dt, user)
+            if pull is None:
+                pull = SyncPull(
+                    ENTITY_MAP, user, since,
+                    SyncSequence.objects.current(user.organisation_id),
+                    payload.get("max_rows"), payload.get("max_bytes"),
+                )
+            server_updates, deleted = pull.chunk()
             conflicts = []  # server-wins strategy for now
 
         return Response({
             "upload_results": upload_results,
             "server_updates": server_updates,
+            "deleted": deleted,
             "conflicts": conflicts,
+            "continuation": pull.continuation(),
+            "sync_sequence": pull.until,
             "sync_timestamp": timezone.now().isoformat(),
             "status": "success",
         })
 
     # ================= HELPERS =================
 
-    def _parse_timestamp(self, ts):
-        if not ts:
-            return datetime.min.replace(tzinfo=timezone.utc)
-        try:
-            return datetime.fromisoformat(ts.replace("Z", "+00:00"))
-        except ValueError:
-            return datetime.min.replace(tzinfo=timezone.utc)
-
-    @transaction.atomic
     def _process_uploads(self, pending_data, user):
-        results = {}
-
-        for entity, items in pending_data.items():
-            model, serializer_class = ENTITY_MAP[entity]
-            created = updated = 0
-            errors = []
-
-            for item in items:
-                local_id = item.pop("id", None)
-
-                try:
-                    if local_id:
-                        obj = model.objects.filter(
-                            id=local_id,
-                            organisation=user.organisation
-                        ).first()
-
-                        if obj:
-                            serializer = serializer_class(
-                                obj, data=item, partial=True
-                            )
-                            serializer.is_valid(raise_exception=True)
-                            serializer.save()
-                            updated += 1
-                        else:
-                            errors.append({
-                                "id": local_id,
-                                "error": "Record not found on server"
-                            })
-                    else:
-                        serializer = serializer_class(data=item)
-                        serializer.is_valid(raise_exception=True)
-                        serializer.save(organisation=user.organisation)
-                        created += 1
-
-                except Exception as e:
-                    errors.append({
-                        "data": item,
-                        "error": str(e)
-                    })
-
-            results[entity] = {
-                "created": created,
-                "updated": updated,
-                "errors": errors,
-            }
+        """Apply uploaded records in bulk, parents before children."""
+        if not isinstance(pending_data, dict):
+            return {"errors": [{"error": "pending_data must be an object"}]}
 
+        results = {}
+        for entity in pending_data:
+            if entity not in ENTITY_MAP:
+                results[entity] = {
+                    "created": 0,
+                    "updated": 0,
+                    "errors": [{"error": f'Unknown entity "{entity}"'}],
+                }
+        for entity, (model, serializer_class) in ENTITY_MAP.items():
+            if entity in pending_data:
+                results[entity] = upsert_entity(
+                    model, serializer_class, pending_data[entity], user
+                )
         return results
-
-    def _get_server_updates(self, since, user):
-        org = user.organisation
-
-        return {
-            "farmers": FarmerSerializer(
-                Farmer.objects.filter(
-                    organisation=org,
-                    updated_at__gt=since
-                ),
-                many=True
-            ).data,
-
-            "farms": FarmSerializer(
-                Farm.objects.filter(
-                    farmer__organisation=org,
-                    updated_at__gt=since
-                ),
-                many=True
-            ).data,
-
-            "quotations": QuotationSerializer(
-                Quotation.objects.filter(
-                    farmer__organisation=org,
-                    updated_at__gt=since
-                ),
-                many=True
-            ).data,
-
-            "claims": ClaimSerializer(
-                Claim.objects.filter(
-                    farmer__organisation=org,
-                    updated_at__gt=since
-                ),
-                many=True
-            ).data,
-        }
@@ -1,13 +1,23 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser
 from django.core.files.storage import default_storage
-from django.core.files.base import ContentFile
-import os
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.db import transaction
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from datetime import datetime
 
+from insurance.models import UploadSession
+from insurance.serializers import UploadSessionSerializer
+from insurance.utils.uploads import (
+    SESSION_TARGETS, ImageUploadHandler, OffsetMismatch, UploadRejected,
+    discard_part, finalize_session, session_expiry, write_chunk,
+)
+
 
 class MediaUploadView(APIView):
     """
@@ -17,6 +27,14 @@ class MediaUploadView(APIView):
     permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
 
+    def initialize_request(self, request, *args, **kwargs):
+        # Upload handlers must be in place before the body is parsed. Files
+        # are validated while they stream in and spooled to disk, never
+        # held in memory whole.
+        self.upload_guard = ImageUploadHandler(request)
+        request.upload_handlers = [self.upload_guard, TemporaryFileUploadHandler(request)]
+        return super().initialize_request(request, *args, **kwargs)
+
     def post(self, request):
         """
         Upload media file with metadata
@@ -30,38 +48,31 @@ class MediaUploadView(APIView):
         - longitude: Optional GPS longitude
         """
         try:
+            # Parsing the body runs the upload handlers, which check size
+            # and type while the file streams in
+            file = request.FILES.get('file')
+            if self.upload_guard.error:
+                return Response(
+                    {'error': self.upload_guard.error},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
             # Validate required fields
-            if 'file' not in request.FILES:
+            if file is None or 'file' not in self.upload_guard.detected:
                 return Response(
                     {'error': 'No file provided'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-            file = request.FILES['file']
             entity_type = request.data.get('entity_type', 'general')
             entity_id = request.data.get('entity_id')
             caption = request.data.get('caption', '')
             latitude = request.data.get('latitude')
             longitude = request.data.get('longitude')
 
-            # Validate file size (max 10MB)
-            if file.size > 10 * 1024 * 1024:
-                return Response(
-                    {'error': 'File too large (max 10MB)'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-
-            # Validate file type
-            allowed_types = ['image/jpeg', 'image/jpg', 'image/png']
-            if file.content_type not in allowed_types:
-                return Response(
-                    {'error': 'Invalid file type (JPEG/PNG only)'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-
-            # Generate unique filename
+            # Generate unique filename, with the extension of the detected type
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            ext = os.path.splitext(file.name)[1]
+            ext = self.upload_guard.detected['file'][1]
             filename = f"{entity_type}_{timestamp}_{request.user.user_id}{ext}"
 
             # Determine upload path based on entity type
@@ -74,8 +85,8 @@ class MediaUploadView(APIView):
             else:
                 upload_path = f'mobile_uploads/general/{filename}'
 
-            # Save file
-            file_path = default_storage.save(upload_path, ContentFile(file.read()))
+            # Save file (moves or streams the temporary file, no copy in memory)
+            file_path = default_storage.save(upload_path, file)
             file_url = default_storage.url(file_path)
 
             # Build response
@@ -130,4 +141,112 @@ class MediaUploadView(APIView):
             return Response(
                 {'error': str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
\ No newline at end of file
+            )
+
+
+class UploadSessionViewSet(mixins.CreateModelMixin,
+                           mixins.RetrieveModelMixin,
+                           mixins.DestroyModelMixin,
+                           viewsets.GenericViewSet):
+    """
+    Resumable photo uploads for claims and inspections.
+
+    1. POST /upload_sessions/ with target ('claim' | 'inspection'),
+       object_id, file_size and optional caption, latitude, longitude
+    2. PUT /upload_sessions/{id}/chunk/ with the raw bytes as the body and
+       the chunk's position in the ``Upload-Offset`` header (or ``?offset=``)
+    3. POST /upload_sessions/{id}/finalize/ once every byte is received
+
+    After a dropped connection, GET /upload_sessions/{id}/ and continue from
+    ``received_size``. Finalizing twice returns the same photo.
+    """
+    serializer_class = UploadSessionSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return UploadSession.objects.filter(user=self.request.user)
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user, expires_at=session_expiry())
+
+    def perform_destroy(self, instance):
+        instance.delete()
+        if instance.status == UploadSession.ACTIVE:
+            transaction.on_commit(lambda: discard_part(instance))
+
+    def get_locked_session(self, pk):
+        return get_object_or_404(self.get_queryset().select_for_update(), pk=pk)
+
+    @action(detail=True, methods=['put'])
+    def chunk(self, request, pk=None):
+        """Write one chunk of the file at its offset"""
+        try:
+            offset = int(request.headers.get('Upload-Offset', request.query_params.get('offset', '')))
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            return Response(
+                {'error': 'Upload-Offset and Content-Length must be integers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        with transaction.atomic():
+            session = self.get_locked_session(pk)
+            if session.status != UploadSession.ACTIVE:
+                return Response(
+                    {'error': 'Upload already finalized'},
+                    status=status.HTTP_409_CONFLICT
+                )
+            if session.expires_at <= timezone.now():
+                return Response(
+                    {'error': 'Upload session expired'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            try:
+                # The body is read from the stream, never parsed into request.data
+                write_chunk(session, offset, request.stream, length)
+            except OffsetMismatch as e:
+                return Response(
+                    {'error': str(e), 'received_size': session.received_size},
+                    status=status.HTTP_409_CONFLICT
+                )
+            except UploadRejected as e:
+                session.save(update_fields=['received_size', 'content_type'])
+                return Response(
+                    {'error': str(e), 'received_size': session.received_size},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            session.save(update_fields=['received_size', 'content_type'])
+
+        return Response({
+            'upload_id': session.upload_id,
+            'received_size': session.received_size,
+            'file_size': session.file_size,
+        })
+
+    @action(detail=True, methods=['post'])
+    def finalize(self, request, pk=None):
+        """Create the claim or inspection photo from the received file"""
+        with transaction.atomic():
+            session = self.get_locked_session(pk)
+            if session.status == UploadSession.ACTIVE:
+                try:
+                    photo = finalize_session(session)
+                except UploadRejected as e:
+                    return Response(
+                        {'error': str(e), 'received_size': session.received_size},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                response_status = status.HTTP_201_CREATED
+            else:
+                # Retried finalize: answer with the photo created the first time
+                model = SESSION_TARGETS[session.target][0]
+                photo = get_object_or_404(model, pk=session.photo_id)
+                response_status = status.HTTP_200_OK
+
+        return Response({
+            'upload_id': session.upload_id,
+            'photo_id': photo.pk,
+            'photo_url': request.build_absolute_uri(photo.photo.url),
+            'message': 'Photo uploaded successfully',
+        }, status=response_status)
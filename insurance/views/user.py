@@ -2,7 +2,7 @@
 from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
+from insurance.authentication import AccountRefreshToken
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 
@@ -17,9 +17,10 @@ from insurance.serializers import (
 from insurance.models import Notification, Message
 from insurance.serializers import NotificationSerializer, MessageSerializer
 from insurance.permissions import CanManageUsers
+from insurance.views.mixins import DynamicFieldsViewMixin
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(DynamicFieldsViewMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated, CanManageUsers]
@@ -53,7 +54,7 @@ class UserViewSet(viewsets.ModelViewSet):
             user = User.objects.get(user_email=username)
             if user.check_password(password):
                 if user.user_status == 'ACTIVE':
-                    refresh = RefreshToken.for_user(user)
+                    refresh = AccountRefreshToken.for_user(user)
                     return Response({
                         'token': str(refresh.access_token),
                         'refresh': str(refresh),
@@ -76,7 +77,7 @@ class UserViewSet(viewsets.ModelViewSet):
             )
 
 
-class RoleTypeViewSet(viewsets.ModelViewSet):
+class RoleTypeViewSet(DynamicFieldsViewMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing role types
     - SUPERUSER and ADMIN can manage roles
@@ -218,22 +219,22 @@ class RoleTypeViewSet(viewsets.ModelViewSet):
         return Response(list(role_names))
 
 
-class NotificationViewSet(viewsets.ModelViewSet):
+class NotificationViewSet(DynamicFieldsViewMixin, viewsets.ModelViewSet):
     queryset = Notification.objects.all()
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Notification.objects.filter(user=self.request.user)
+        return super().get_queryset().filter(user=self.request.user)
 
 
-class MessageViewSet(viewsets.ModelViewSet):
+class MessageViewSet(DynamicFieldsViewMixin, viewsets.ModelViewSet):
     queryset = Message.objects.all()
     serializer_class = MessageSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         from django.db.models import Q
-        return Message.objects.filter(
+        return super().get_queryset().filter(
             Q(sender=self.request.user) | Q(recipient=self.request.user)
         )
\ No newline at end of file
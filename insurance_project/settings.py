@@ -1,4 +1,5 @@
 import os
+from importlib.util import find_spec
 from pathlib import Path
 from datetime import timedelta
 import dj_database_url
@@ -44,6 +45,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'django.middleware.gzip.GZipMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'corsheaders.middleware.CorsMiddleware',  # Must be at the top after security
     'django.middleware.common.CommonMiddleware',
@@ -105,6 +107,18 @@ AUTH_PASSWORD_VALIDATORS = [
 
 AUTH_USER_MODEL = 'insurance.User'
 
+# PBKDF2 work factor; unset keeps Django's default. Measure the effect on
+# login throughput with `manage.py benchmark_login`.
+PASSWORD_HASH_ITERATIONS = int(os.environ.get('PASSWORD_HASH_ITERATIONS', '0')) or None
+
+PASSWORD_HASHERS = [
+    'insurance.hashers.TunablePBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'Africa/Nairobi'
 USE_I18N = True
@@ -168,12 +182,24 @@ CORS_ALLOW_ALL_HEADERS = True
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'insurance.authentication.StatelessJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    # JSON through orjson when installed; compact formats for mobile clients
+    # (see insurance.renderers)
+    'DEFAULT_RENDERER_CLASSES': [
+        'insurance.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        'insurance.renderers.ColumnarJSONRenderer',
+    ] + (['insurance.renderers.MessagePackRenderer'] if find_spec('msgpack') else []),
+    'DEFAULT_PARSER_CLASSES': [
+        'insurance.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'insurance.pagination.OptionalCursorPagination',
     'PAGE_SIZE': 100,
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
@@ -198,6 +224,53 @@ SIMPLE_JWT = {
     'USER_ID_CLAIM': 'user_id',
 }
 
+# The default cache is per process. The shared cache holds state that must
+# be consistent across gunicorn workers and replicas (login throttling):
+# Redis when REDIS_URL is set, otherwise a database table created by
+# `manage.py createcachetable`.
+REDIS_URL = os.environ.get('REDIS_URL')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+    } if REDIS_URL else {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'django_cache',
+    },
+}
+
+# Cache alias counting failed logins on unknown usernames (insurance.utils.lockout)
+LOGIN_THROTTLE_CACHE = 'shared'
+
+# Cache alias holding account states for the stateless JWT authentication
+# (insurance.authentication); shared so a lockout or deactivation reaches
+# every worker
+ACCOUNT_STATE_CACHE = 'shared'
+
+# Seconds the stateless JWT authentication trusts a cached account state
+ACCOUNT_STATE_CACHE_TIMEOUT = int(os.environ.get('ACCOUNT_STATE_CACHE_TIMEOUT', '30'))
+
+# Role permission cache (insurance.permissions.cache). ALIAS names the shared
+# Django cache tier; set it to None to keep only the in-process LRU.
+ROLE_PERMISSION_CACHE = {
+    'ALIAS': os.environ.get('ROLE_PERMISSION_CACHE_ALIAS', 'default') or None,
+    'TIMEOUT': int(os.environ.get('ROLE_PERMISSION_CACHE_TIMEOUT', '60')),
+    'LOCAL_TIMEOUT': 30,
+    'LOCAL_MAXSIZE': 256,
+}
+
+# Seconds an applied sync operation id is remembered for retried uploads
+# (expired rows are removed by `manage.py purge_sync_operations`)
+SYNC_OPERATION_TTL = int(os.environ.get('SYNC_OPERATION_TTL', str(7 * 24 * 60 * 60)))
+
+# Resumable photo uploads: part files are kept on local disk (outside
+# MEDIA_ROOT) and unfinished sessions expire after UPLOAD_SESSION_TTL seconds
+UPLOAD_SESSION_ROOT = os.environ.get('UPLOAD_SESSION_ROOT', str(BASE_DIR / 'upload_sessions'))
+UPLOAD_SESSION_TTL = int(os.environ.get('UPLOAD_SESSION_TTL', str(24 * 60 * 60)))
+
 # Email
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = os.environ.get('EMAIL_HOST', 'smtp.gmail.com')
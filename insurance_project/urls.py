@@ -9,8 +9,9 @@ from rest_framework.routers import DefaultRouter
 from django.conf import settings
 from django.conf.urls.static import static
 from insurance.views.notifications import NotificationViewSet, MessageViewSet
-from insurance.views.upload import MediaUploadView
+from insurance.views.upload import MediaUploadView, UploadSessionViewSet
 from insurance.views.sync import SyncAPIView
+from insurance.views.reference import ReferenceDataView
 
 
 # Import all ViewSets
@@ -103,6 +104,8 @@ def api_root(request):
                 '/api/v1/weather_data/',
                 '/api/v1/dashboard/statistics/',
                 '/api/v1/sync/',
+                '/api/v1/reference_data/',
+                '/api/v1/upload_sessions/',
             ]
         }
     })
@@ -135,6 +138,7 @@ router.register(r'inspections', InspectionViewSet)
 router.register(r'notifications', NotificationViewSet, basename='notification')
 router.register(r'messages', MessageViewSet, basename='message')
 router.register(r'roles', RoleTypeViewSet, basename='role')
+router.register(r'upload_sessions', UploadSessionViewSet, basename='upload-session')
 
 urlpatterns = [
     # Root endpoint
@@ -147,6 +151,7 @@ urlpatterns = [
     path('api/v1/', include(router.urls)),
 
     path('api/v1/sync/', SyncAPIView.as_view(), name='sync'),
+    path('api/v1/reference_data/', ReferenceDataView.as_view(), name='reference-data'),
     # Authentication endpoints
     path('api/v1/auth/login/', LoginView.as_view(), name='auth-login'),
     path('api/v1/auth/register/', RegisterView.as_view(), name='auth-register'),